@@ -0,0 +1,112 @@
+import sys
+import asyncio
+import threading
+from pathlib import Path
+from xml.sax.saxutils import escape
+import pytest
+from aiohttp import web
+
+benchmark_file = Path(__file__).resolve()
+parent_dir = benchmark_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from benchmarks.synthetic import etag
+
+class LocalServer(object):
+    """
+    serves files from memory over http in a background thread, standing in for the
+    usgs-lidar-public bucket: GET requests honour If-None-Match, and a request for the
+    bucket itself with list-type=2 answers like s3's ListObjectsV2 with the bucket's folders
+    """
+    def __init__(self, files: dict, bucket: str = "usgs-lidar-public") -> None:
+        # {path relative to the bucket: content}
+        self.files = files
+        self.bucket = bucket
+        self.requests = 0
+        self.loop = asyncio.new_event_loop()
+        self.thread = None
+        self.runner = None
+        self.url = None
+
+    async def handler(self, request):
+        self.requests += 1
+        path = request.match_info["path"]
+        if path == self.bucket and request.query.get("list-type") == "2":
+            return self.list_folders()
+
+        content = self.files.get(path[len(self.bucket) + 1:])
+        if content is None:
+            return web.Response(status=404)
+        tag = etag(content)
+        if request.headers.get("If-None-Match") == tag:
+            return web.Response(status=304, headers={"ETag": tag})
+        if isinstance(content, str):
+            content = content.encode()
+        return web.Response(body=content, headers={"ETag": tag})
+
+    def list_folders(self):
+        folders = sorted({path.split("/")[0] + "/" for path in self.files if "/" in path})
+        prefixes = "".join(f"<CommonPrefixes><Prefix>{escape(folder)}</Prefix></CommonPrefixes>"
+                           for folder in folders)
+        body = ('<?xml version="1.0" encoding="UTF-8"?>'
+                '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+                f"<Name>{self.bucket}</Name><Prefix></Prefix><KeyCount>{len(folders)}</KeyCount>"
+                "<MaxKeys>1000</MaxKeys><Delimiter>/</Delimiter><IsTruncated>false</IsTruncated>"
+                f"{prefixes}</ListBucketResult>")
+        return web.Response(text=body, content_type="application/xml")
+
+    def start(self):
+        async def start():
+            app = web.Application()
+            app.router.add_get("/{path:.*}", self.handler)
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            return runner, site._server.sockets[0].getsockname()[1]
+
+        self.runner, port = self.loop.run_until_complete(start())
+        self.url = f"http://127.0.0.1:{port}"
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.run_until_complete(self.runner.cleanup())
+        self.loop.close()
+
+    def bucket_url(self) -> str:
+        return f"{self.url}/{self.bucket}/"
+
+    def s3_client(self):
+        """
+        returns a boto3 client that lists the bucket of this server
+        """
+        import boto3
+        from botocore.config import Config
+
+        return boto3.client("s3", endpoint_url=self.url, region_name="us-east-1",
+                            aws_access_key_id="benchmark", aws_secret_access_key="benchmark",
+                            config=Config(s3={"addressing_style": "path"}))
+
+@pytest.fixture
+def local_server():
+    """
+    starts a LocalServer, add the files to server.files before the first request
+    """
+    server = LocalServer({}).start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def local_bucket(local_server, monkeypatch):
+    """
+    points load_data at the local server instead of the usgs-lidar-public bucket
+    """
+    import src.lidarToGeo.load_data as load_data
+
+    monkeypatch.setattr(load_data, "bucket_url", local_server.bucket_url())
+    monkeypatch.setattr(load_data, "_s3", local_server.s3_client())
+    return local_server
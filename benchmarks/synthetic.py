@@ -0,0 +1,205 @@
+import json
+import hashlib
+import numpy as np
+from src.lidarToGeo.ept_info import Info
+
+# web mercator extent of the conterminous united states, where the bucket's regions lie
+EXTENT = (-13900000.0, 2800000.0, -7400000.0, 6300000.0)
+
+SCHEMA = [
+    {"name": "X", "type": "signed", "size": 4, "scale": 0.01, "offset": 0},
+    {"name": "Y", "type": "signed", "size": 4, "scale": 0.01, "offset": 0},
+    {"name": "Z", "type": "signed", "size": 4, "scale": 0.01, "offset": 0},
+    {"name": "Intensity", "type": "unsigned", "size": 2},
+    {"name": "Classification", "type": "unsigned", "size": 1},
+]
+
+def ept_json(bounds: list, points: int, span: int = 128, data_type: str = "binary") -> str:
+    """
+    returns an ept.json with the fields the package reads
+    """
+    return json.dumps({
+        "bounds": bounds,
+        "boundsConforming": bounds,
+        "points": points,
+        "span": span,
+        "dataType": data_type,
+        "hierarchyType": "json",
+        "schema": SCHEMA,
+        "srs": {"authority": "EPSG", "horizontal": "3857", "wkt": ""},
+        "version": "1.0.0"
+    })
+
+def synthetic_catalog(regions: int, seed: int = 0) -> dict:
+    """
+    creates the ept.json of regions of random sizes spread over EXTENT
+
+    Parameters
+    ----------
+    regions: int : number of regions
+
+    seed: int : seed of the random generator
+         (Default value = 0)
+
+    Returns: a dictionary of form {region: ept.json string}
+    -------
+
+    """
+    rng = np.random.default_rng(seed)
+    xmin, ymin, xmax, ymax = EXTENT
+    sizes = rng.uniform(5000, 200000, regions)
+    x = rng.uniform(xmin, xmax, regions)
+    y = rng.uniform(ymin, ymax, regions)
+    catalog = {}
+    for i in range(regions):
+        bounds = [x[i], y[i], 0.0, x[i] + sizes[i], y[i] + sizes[i], sizes[i]]
+        catalog[f"REGION_{i:05d}_{2000 + i % 20}/"] = ept_json(bounds, int(rng.integers(1e6, 1e9)))
+    return catalog
+
+def catalog_infos(catalog: dict) -> dict:
+    """
+    returns the Info of every ept.json of a synthetic catalog
+    """
+    return {region: Info(data) for region, data in catalog.items()}
+
+def random_boxes(count: int, size: float = 2000, seed: int = 1) -> np.ndarray:
+    """
+    returns an (count, 4) array of square (xmin, ymin, xmax, ymax) boxes inside EXTENT
+    """
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(EXTENT[0], EXTENT[2] - size, count)
+    y = rng.uniform(EXTENT[1], EXTENT[3] - size, count)
+    return np.column_stack([x, y, x + size, y + size])
+
+def synthetic_ept(points: int, depth: int = 4, size: float = 1000.0, seed: int = 0) -> tuple:
+    """
+    creates a binary ept dataset of random points over a terrain, the points are spread over
+    the octree levels so that every level doubles the density of the one above it
+
+    Parameters
+    ----------
+    points: int : number of points
+
+    depth: int : deepest level of the octree
+         (Default value = 4)
+
+    size: float : width of the dataset's cube
+         (Default value = 1000.0)
+
+    seed: int : seed of the random generator
+         (Default value = 0)
+
+    Returns: a tuple of form (Info, {path: file content}) with the ept.json, the hierarchy
+            and the node files relative to the dataset's folder
+    -------
+
+    """
+    rng = np.random.default_rng(seed)
+    data = ept_json([0.0, 0.0, 0.0, size, size, size], points)
+    info = Info(data)
+    x = rng.uniform(0, size, points)
+    y = rng.uniform(0, size, points)
+    z = terrain(x / size, y / size) * size / 10 + size / 2
+    # a level holds 4 times the points of the level above it
+    weights = 4.0 ** np.arange(depth + 1)
+    levels = rng.choice(depth + 1, size=points, p=weights / weights.sum())
+
+    raw = np.zeros(points, dtype=info.dtype)
+    raw["X"] = np.round(x * 100)
+    raw["Y"] = np.round(y * 100)
+    raw["Z"] = np.round(z * 100)
+    raw["Intensity"] = rng.integers(0, 65535, points)
+    raw["Classification"] = rng.choice([1, 2, 7], size=points, p=[0.3, 0.65, 0.05])
+
+    files = {"ept.json": data}
+    hierarchy = {}
+    for level in range(depth + 1):
+        cells = 2 ** level
+        in_level = levels == level
+        cx = np.minimum((x[in_level] / size * cells).astype(int), cells - 1)
+        cy = np.minimum((y[in_level] / size * cells).astype(int), cells - 1)
+        cz = np.minimum((z[in_level] / size * cells).astype(int), cells - 1)
+        node_points = raw[in_level]
+        keys = np.stack([cx, cy, cz], axis=1)
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+        for node, (nx, ny, nz) in enumerate(unique):
+            key = f"{level}-{nx}-{ny}-{nz}"
+            content = node_points[inverse.ravel() == node]
+            hierarchy[key] = len(content)
+            files[f"ept-data/{key}.bin"] = content.tobytes()
+
+    files["ept-hierarchy/0-0-0-0.json"] = json.dumps(hierarchy)
+    return info, files
+
+def terrain(u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """
+    a smooth terrain of hills and valleys over the unit square, values in about [-1, 1]
+    """
+    return 0.5 * np.sin(3 * np.pi * u) * np.cos(2 * np.pi * v) + 0.3 * np.sin(7 * u + 5 * v) + 0.2 * u
+
+def synthetic_dem(rows: int, columns: int, nodata: float = -9999, missing: float = 0.02,
+                  seed: int = 0) -> np.ndarray:
+    """
+    creates an elevation grid with a fraction of cells without data
+
+    Parameters
+    ----------
+    rows: int : number of rows
+
+    columns: int : number of columns
+
+    nodata: float : value of the cells without data
+         (Default value = -9999)
+
+    missing: float : fraction of the cells without data
+         (Default value = 0.02)
+
+    seed: int : seed of the random generator
+         (Default value = 0)
+
+    Returns: a 2d float64 array
+    -------
+
+    """
+    rng = np.random.default_rng(seed)
+    v, u = np.mgrid[0:1:rows * 1j, 0:1:columns * 1j]
+    grid = 300 + 50 * terrain(u, v) + rng.normal(0, 0.2, (rows, columns))
+    grid[rng.random((rows, columns)) < missing] = nodata
+    return grid
+
+def synthetic_points(points: int, box: tuple, seed: int = 0) -> tuple:
+    """
+    returns (x, y, z) arrays of random points over the terrain inside box
+    """
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(box[0], box[2], points)
+    y = rng.uniform(box[1], box[3], points)
+    z = 300 + 50 * terrain((x - box[0]) / (box[2] - box[0]), (y - box[1]) / (box[3] - box[1]))
+    return x, y, z
+
+def write_tif(grid: np.ndarray, filename: str, transform: tuple, nodata: float = -9999,
+              epsg: int = 3857) -> None:
+    """
+    writes a grid as a single band float32 GeoTIFF like pdal's writers.gdal creates
+    """
+    from osgeo import gdal, osr
+
+    rows, columns = grid.shape
+    dataset = gdal.GetDriverByName("GTiff").Create(filename, columns, rows, 1, gdal.GDT_Float32,
+                                                   ["TILED=YES", "COMPRESS=DEFLATE"])
+    dataset.SetGeoTransform(transform)
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(epsg)
+    dataset.SetProjection(srs.ExportToWkt())
+    band = dataset.GetRasterBand(1)
+    band.SetNoDataValue(nodata)
+    band.WriteArray(grid.astype(np.float32))
+    dataset.FlushCache()
+
+def etag(content) -> str:
+    """
+    returns the ETag the local server sends for a file
+    """
+    if isinstance(content, str):
+        content = content.encode()
+    return '"' + hashlib.md5(content).hexdigest() + '"'
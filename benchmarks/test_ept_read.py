@@ -0,0 +1,35 @@
+import pytest
+from src.lidarToGeo.ept_reader import EptReader
+from src.lidarToGeo.load_data import FetchConfig
+from src.lidarToGeo.tile_cache import TileCache
+from benchmarks.synthetic import synthetic_ept
+
+POINTS = 500000
+
+@pytest.fixture(scope="module")
+def dataset():
+    return synthetic_ept(POINTS, depth=4)
+
+@pytest.fixture
+def dataset_url(local_server, dataset):
+    _, files = dataset
+    for path, content in files.items():
+        local_server.files["dataset/" + path] = content
+    return local_server.bucket_url() + "dataset/"
+
+@pytest.mark.parametrize("resolution", [None, 10])
+def test_ept_read(benchmark, dataset, dataset_url, resolution):
+    info, _ = dataset
+    reader = EptReader(info, dataset_url, FetchConfig(concurrency=32))
+    benchmark.group = "ept read"
+    points = benchmark(reader.read, (200.0, 200.0, 700.0, 700.0), resolution)
+    assert len(points) > 0
+
+def test_ept_read_tile_cache(benchmark, dataset, dataset_url, tmp_path):
+    info, _ = dataset
+    reader = EptReader(info, dataset_url, FetchConfig(concurrency=32),
+                       cache=TileCache(str(tmp_path)))
+    reader.read((200.0, 200.0, 700.0, 700.0))
+    benchmark.group = "ept read"
+    benchmark(reader.read, (200.0, 200.0, 700.0, 700.0))
+    assert reader.cache.hits > 0
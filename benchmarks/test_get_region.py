@@ -0,0 +1,43 @@
+import pytest
+from src.lidarToGeo.region_index import RegionIndex
+from src.lidarToGeo.catalog import Catalog
+from src.lidarToGeo.tiling import format_bounds
+from benchmarks.synthetic import synthetic_catalog, catalog_infos, random_boxes
+
+SIZES = [1000, 10000]
+
+def linear_get_region(region_ept_info: dict, box: tuple) -> list:
+    """
+    the lookup get_region made before the region index, a scan of every region's bounds
+    """
+    xmin, ymin, xmax, ymax = box
+    return [region for region, info in region_ept_info.items()
+            if info.bounds[0] <= xmin and info.bounds[1] <= ymin and
+            info.bounds[3] >= xmax and info.bounds[4] >= ymax]
+
+@pytest.fixture(scope="module", params=SIZES)
+def region_ept_info(request):
+    return catalog_infos(synthetic_catalog(request.param))
+
+def test_get_region_linear(benchmark, region_ept_info):
+    boxes = random_boxes(100)
+    benchmark.group = f"get_region {len(region_ept_info)} regions"
+    benchmark(lambda: [linear_get_region(region_ept_info, box) for box in boxes])
+
+def test_get_region_index(benchmark, region_ept_info):
+    boxes = random_boxes(100)
+    index = RegionIndex(region_ept_info)
+    benchmark.group = f"get_region {len(region_ept_info)} regions"
+    result = benchmark(lambda: [index.query(box) for box in boxes])
+    assert result == [linear_get_region(region_ept_info, box) for box in boxes]
+
+def test_get_region_query_many(benchmark, region_ept_info):
+    boxes = random_boxes(100)
+    catalog = Catalog(region_ept_info)
+    bounds = [format_bounds(box) for box in boxes]
+    benchmark.group = f"get_region {len(region_ept_info)} regions"
+    benchmark(catalog.query_many, bounds)
+
+def test_build_region_index(benchmark, region_ept_info):
+    benchmark.group = "build region index"
+    benchmark(RegionIndex, region_ept_info)
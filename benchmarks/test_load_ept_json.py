@@ -0,0 +1,36 @@
+import pytest
+from src.lidarToGeo.load_data import load_ept_json, FetchConfig
+from src.lidarToGeo.catalog_cache import CatalogCache
+from benchmarks.synthetic import synthetic_catalog
+
+REGIONS = 300
+
+@pytest.fixture
+def bucket(local_bucket):
+    for region, data in synthetic_catalog(REGIONS).items():
+        local_bucket.files[region + "ept.json"] = data
+    return local_bucket
+
+@pytest.fixture
+def cache(tmp_path):
+    return CatalogCache("usgs-lidar-public", cache_dir=str(tmp_path))
+
+def test_load_ept_json_cold(benchmark, bucket):
+    benchmark.group = "load_ept_json"
+    region_ept_info = benchmark(load_ept_json, use_cache=False, config=FetchConfig(concurrency=64))
+    assert len(region_ept_info) == REGIONS
+
+def test_load_ept_json_revalidate(benchmark, bucket, cache):
+    # every region answers 304 Not Modified
+    load_ept_json(cache=cache)
+    benchmark.group = "load_ept_json"
+    region_ept_info = benchmark(load_ept_json, refresh=True, cache=cache)
+    assert len(region_ept_info) == REGIONS
+
+def test_load_ept_json_fresh_cache(benchmark, bucket, cache):
+    load_ept_json(cache=cache)
+    requests = bucket.requests
+    benchmark.group = "load_ept_json"
+    region_ept_info = benchmark(load_ept_json, cache=cache)
+    assert len(region_ept_info) == REGIONS
+    assert bucket.requests == requests
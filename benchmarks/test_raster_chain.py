@@ -0,0 +1,46 @@
+import glob
+import os
+import pytest
+
+# the raster chain needs gdal and pdal, it is skipped where they are not installed
+pytest.importorskip("osgeo")
+pytest.importorskip("pdal")
+
+from src.lidarToGeo.catalog import Catalog
+from src.lidarToGeo.get_data import RasterGetter
+from src.lidarToGeo.gridding import geotransform
+from src.lidarToGeo.tiling import format_bounds
+from benchmarks.synthetic import synthetic_dem, write_tif, catalog_infos, ept_json
+
+REGION = "SYNTHETIC_2020/"
+RESOLUTION = 5
+
+@pytest.fixture(params=[200, 500])
+def raster(request, tmp_path):
+    size = request.param
+    box = (0.0, 0.0, size * RESOLUTION, size * RESOLUTION)
+    catalog = Catalog(catalog_infos({REGION: ept_json([0.0, 0.0, 0.0, 1e6, 1e6, 1e6], 1000)}))
+    getter = RasterGetter(format_bounds(box), 3857, catalog=catalog)
+    getter.path = str(tmp_path)
+    write_tif(synthetic_dem(size, size), getter.region_tif(REGION), geotransform(box, RESOLUTION))
+    return getter
+
+def remove_shapefiles(path: str) -> None:
+    """
+    deletes the shapefiles of a previous round, the shapefile driver does not overwrite them
+    """
+    for filename in glob.glob(os.path.join(path, "*.shp")) + glob.glob(os.path.join(path, "*.s[hb]x")) + \
+            glob.glob(os.path.join(path, "*.dbf")) + glob.glob(os.path.join(path, "*.prj")):
+        os.remove(filename)
+
+def test_tif_to_shp(benchmark, raster):
+    benchmark.group = f"tif to points {raster.bounds}"
+    benchmark.pedantic(raster.tif_to_shp, (raster.region_tif(REGION), raster.path + "/bench.shp"),
+                       setup=lambda: remove_shapefiles(raster.path), rounds=5)
+
+@pytest.mark.parametrize("vectorize", ["points", "polygons"])
+def test_get_geodataframe(benchmark, raster, vectorize):
+    benchmark.group = f"get_geodataframe {raster.bounds}"
+    gdf = benchmark.pedantic(raster.get_geodataframe, (REGION, False, RESOLUTION, vectorize),
+                             setup=lambda: remove_shapefiles(raster.path), rounds=5)
+    assert len(gdf) > 0
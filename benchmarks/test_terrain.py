@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from src.lidarToGeo.twi import twi
+from src.lidarToGeo.gridding import grid_elevation, grid_to_points
+from benchmarks.synthetic import synthetic_dem, synthetic_points
+
+GRID_SIZES = [100, 500, 1000]
+POINT_COUNTS = [100000, 1000000]
+RESOLUTION = 5
+
+def legacy_twi(grid: np.ndarray, resolution: float, nodata: float) -> np.ndarray:
+    """
+    the index get_geodataframe computed from the polygons of the tif before the flow based
+    twi, ln(area / (elevation / resolution)) with the area of a cell's polygon
+    """
+    _, _, elevation = grid_to_points(grid, (0, resolution, 0, 0, 0, -resolution), nodata)
+    return np.log(resolution * resolution / (elevation / resolution))
+
+@pytest.fixture(scope="module", params=GRID_SIZES)
+def dem(request):
+    return synthetic_dem(request.param, request.param)
+
+@pytest.mark.parametrize("method", ["d8", "dinf"])
+def test_twi(benchmark, dem, method):
+    benchmark.group = f"twi {dem.shape[0]}x{dem.shape[1]}"
+    index = benchmark(twi, dem, RESOLUTION, -9999, method)
+    assert index.shape == dem.shape
+
+def test_twi_legacy(benchmark, dem):
+    benchmark.group = f"twi {dem.shape[0]}x{dem.shape[1]}"
+    benchmark(legacy_twi, dem, RESOLUTION, -9999)
+
+@pytest.mark.parametrize("points", POINT_COUNTS)
+@pytest.mark.parametrize("output_type", ["idw", "mean"])
+def test_grid_elevation(benchmark, points, output_type):
+    box = (0.0, 0.0, 2000.0, 2000.0)
+    x, y, z = synthetic_points(points, box)
+    benchmark.group = f"grid_elevation {points} points"
+    grid, _ = benchmark(grid_elevation, x, y, z, box, RESOLUTION, output_type)
+    assert grid.shape == (400, 400)
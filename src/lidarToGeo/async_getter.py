@@ -0,0 +1,168 @@
+import asyncio
+import functools
+from concurrent.futures import Executor
+from src.lidarToGeo.catalog import Catalog, shared_catalog
+from src.lidarToGeo.get_data import RasterGetter, region_year, _process_region
+from src.lidarToGeo.logger import setup_logger
+
+logger = setup_logger("async_getter")
+
+class AsyncRasterGetter(object):
+    """
+    awaitable wrapper around RasterGetter for code running in an event loop, e.g. an
+    aiohttp or FastAPI service.
+
+    the catalog is downloaded in the caller's loop and the blocking pdal / gdal work is run
+    in an executor, so the loop keeps serving other requests meanwhile. Cancelling an
+    awaited call or letting its timeout expire cancels the regions that have not started yet,
+    a pipeline that is already executing runs to completion in its worker
+
+    create instances with: getter = await AsyncRasterGetter.create(bounds, crs)
+    """
+    def __init__(self, getter: RasterGetter, executor: Executor = None) -> None:
+        self.getter = getter
+        # None runs the work in the loop's default thread pool
+        self.executor = executor
+
+    @classmethod
+    async def create(cls, bounds: str, crs: int, executor: Executor = None,
+                     catalog: Catalog = None, **kwargs):
+        """
+        loads the catalog and finds the regions of the bounds without blocking the loop
+
+        Parameters
+        ----------
+        bounds: str : the bounds, see RasterGetter
+
+        crs: int : the crs of the bounds, see RasterGetter
+
+        executor: Executor : executor the blocking work is run in
+             (Default value = None)
+
+        catalog: Catalog : catalog to use instead of the process' shared catalog
+             (Default value = None)
+
+        kwargs : other keyword arguments of RasterGetter, e.g tile_size
+
+        Returns: an AsyncRasterGetter
+        -------
+
+        """
+        catalog = catalog if catalog is not None else shared_catalog()
+        await catalog.load_async()
+        getter = RasterGetter(bounds, crs, catalog=catalog, **kwargs)
+        # the catalog is loaded, finding the regions is only a query of its index
+        getter.regions = getter.get_region(bounds)
+        return cls(getter, executor)
+
+    @property
+    def regions(self) -> list:
+        return self.getter.regions
+
+    async def _run(self, function, *args, timeout: float = None):
+        """
+        runs a blocking function in the executor and waits at most timeout seconds for it
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, functools.partial(function, *args))
+        return await asyncio.wait_for(future, timeout)
+
+    async def get_region(self, bounds: str, predicate: str = "contains",
+                         timeout: float = None) -> list:
+        """
+        Gets all the regions the given boundaries lie in, see RasterGetter.get_region
+
+        Parameters
+        ----------
+        bounds: str : the bounds
+
+        predicate: str : "contains" or "intersects"
+             (Default value = "contains")
+
+        timeout: float : seconds to wait before raising asyncio.TimeoutError, no limit when None
+             (Default value = None)
+
+        Returns: a list with all the regions the given bounds lie in
+        -------
+
+        """
+        return await self._run(self.getter.get_region, bounds, predicate, timeout=timeout)
+
+    async def get_raster_terrain(self, region: str, timeout: float = None, resolution: float = None) -> None:
+        """
+        Generates the region's las and tif files in the executor, see
+        RasterGetter.get_raster_terrain
+
+        Parameters
+        ----------
+        region: str : region where bounds occur
+
+        resolution: float : cell size of the tif, the template's when None
+             (Default value = None)
+
+        timeout: float : seconds to wait before raising asyncio.TimeoutError, no limit when None
+             (Default value = None)
+        """
+        await self._run(self.getter.get_raster_terrain, region, resolution, timeout=timeout)
+
+    async def region_gdf_dict(self, saved_png: bool, resolution: int = 5, in_memory: bool = False,
+                              vectorize: str = "points", timeout: float = None,
+                              region_timeout: float = None) -> dict:
+        """
+        creates the geodataframe of every region the bounds fall in, the regions are
+        processed concurrently in the executor
+
+        Parameters
+        ----------
+        saved_png: bool : save the plot of the region the bounds fall in
+
+        resolution: int : resolution of the geometric points
+             (Default value = 5)
+
+        in_memory: bool : grid the points in memory, see RasterGetter.region_gdf_dict
+             (Default value = False)
+
+        vectorize: str : how the tif is turned into points, see RasterGetter.get_geodataframe
+             (Default value = "points")
+
+        timeout: float : seconds to wait for all the regions before raising
+                 asyncio.TimeoutError, no limit when None
+             (Default value = None)
+
+        region_timeout: float : seconds to wait for each region, a region that takes longer
+                        is logged and left out like a region whose pipeline fails, no limit
+                        when None
+             (Default value = None)
+
+        Returns: a dictionary of form {"year / region": geopandas.DataFrame}, in the order of
+                the regions whatever order they finish in
+        -------
+
+        """
+        regions = self.getter.regions
+        tasks = [asyncio.ensure_future(self._run(_process_region, self.getter, region,
+                                                 saved_png, resolution, in_memory, vectorize,
+                                                 timeout=region_timeout))
+                 for region in regions]
+        try:
+            results = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        region_gdf = {}
+        for region, result in zip(regions, results):
+            if isinstance(result, asyncio.TimeoutError):
+                logger.warning(f"{region} did not finish in {region_timeout}s")
+            elif isinstance(result, RuntimeError):
+                logger.warning(result)
+                logger.info(f"Pipeline Process Could not be completed for region {region}")
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                region_gdf[region_year(region)] = result
+                # the regions share the getter and each sets its gdf when it finishes, it is
+                # set again to the last region's like region_gdf_dict leaves it
+                self.getter.gdf = result
+        return region_gdf
@@ -0,0 +1,108 @@
+import geopandas as gpd
+from src.lidarToGeo.catalog import Catalog, shared_catalog
+from src.lidarToGeo.get_data import RasterGetter, region_year
+from src.lidarToGeo.tiling import bounds_to_boxes, merge_boxes, format_bounds
+from src.lidarToGeo.logger import setup_logger
+
+logger = setup_logger("batch")
+
+class BatchRasterGetter(object):
+    """
+    creates the geodataframes of many bounds in one run.
+
+    the bounds are grouped by the regions they lie in with a single query of the catalog,
+    the bounds of a region that overlap or lie within gap of each other are merged into one
+    read, and the geodataframe of every read is clipped to each of the bounds inside it. The
+    ept nodes shared by neighbouring bounds are therefore read once, and the pipeline is set
+    up once per read instead of once per bounds.
+
+    the reads are gridded in memory (see RasterGetter.get_geodataframe_in_memory) on the grid
+    of the merged bounds, so the points of a clipped geodataframe lie on that grid
+    """
+    def __init__(self, bounds, crs: int, catalog: Catalog = None, gap: float = 0,
+                 max_size: float = None, predicate: str = "contains") -> None:
+        # a list of (xmin, ymin, xmax, ymax) tuples, one per request
+        self.boxes = bounds_to_boxes(bounds)
+        if not self.boxes:
+            raise ValueError("BatchRasterGetter needs at least one bounds")
+        self.crs = crs
+        self.catalog = catalog if catalog is not None else shared_catalog()
+        self.gap = gap
+        self.max_size = max_size
+        self.predicate = predicate
+        # every read is made by a copy of this getter (see RasterGetter.for_bounds) that
+        # shares its metrics, set its pipeline_template, flow_method, point_reader and
+        # tile_cache to change how the reads are made
+        self.getter = RasterGetter(format_bounds(self.boxes[0]), crs, catalog=self.catalog)
+
+    def reads(self) -> list:
+        """
+        groups the bounds by region and merges the ones close to each other
+
+        Returns: a list of (region, merged box, indices of the bounds inside it) tuples
+        -------
+
+        """
+        boxes_regions = self.catalog.query_many([format_bounds(box) for box in self.boxes],
+                                                self.predicate)
+        region_boxes = {}
+        for i, regions in enumerate(boxes_regions):
+            if not regions:
+                logger.warning(f"no region contains the bounds {format_bounds(self.boxes[i])}")
+            for region in regions:
+                region_boxes.setdefault(region, []).append(i)
+
+        reads = []
+        for region, indices in region_boxes.items():
+            for box, members in merge_boxes([self.boxes[i] for i in indices], self.gap, self.max_size):
+                reads.append((region, box, [indices[member] for member in members]))
+        logger.info(f"{len(self.boxes)} bounds merged into {len(reads)} reads")
+        return reads
+
+    def region_gdf_dicts(self, resolution: int = 5) -> list:
+        """
+        creates a dictionary of the regions or years of every bounds, like
+        RasterGetter.region_gdf_dict does for a single bounds
+
+        Parameters
+        ----------
+        resolution: int : resolution of the geometric points
+             (Default value = 5)
+
+        Returns: a list with a dictionary of form {"year / region": geopandas.DataFrame} for
+                every bounds, in the order the bounds were given
+        -------
+
+        """
+        results = [{} for _ in self.boxes]
+        for region, box, indices in self.reads():
+            getter = self.getter.for_bounds(format_bounds(box), [region])
+            try:
+                gdf = getter.get_geodataframe_in_memory(region, False, resolution)
+            except RuntimeError as e:
+                logger.warning(e)
+                logger.info(f"Pipeline Process Could not be completed for region {region}")
+                continue
+
+            for i in indices:
+                results[i][region_year(region)] = clip_geodataframe(gdf, self.boxes[i])
+        return results
+
+def clip_geodataframe(gdf: gpd.GeoDataFrame, box: tuple) -> gpd.GeoDataFrame:
+    """
+    returns the points of a geodataframe inside a box
+
+    Parameters
+    ----------
+    gdf: gpd.GeoDataFrame : a geodataframe of points
+
+    box: tuple : a (xmin, ymin, xmax, ymax) tuple
+
+    Returns: a geopandas dataframe
+    -------
+
+    """
+    x = gdf.geometry.x.to_numpy()
+    y = gdf.geometry.y.to_numpy()
+    inside = (x >= box[0]) & (x <= box[2]) & (y >= box[1]) & (y <= box[3])
+    return gdf[inside].reset_index(drop=True)
@@ -0,0 +1,193 @@
+import asyncio
+import threading
+from src.lidarToGeo.ept_info import Info
+from src.lidarToGeo.load_data import load_ept_json, load_ept_json_async, FetchConfig
+from src.lidarToGeo.catalog_cache import CatalogCache
+from src.lidarToGeo.region_index import RegionIndex, parse_bounds
+from src.lidarToGeo.logger import setup_logger
+
+logger = setup_logger("catalog")
+
+class Catalog(object):
+    """
+    the ept.json of every region in the bucket and the index of their bounds, loaded the
+    first time they are needed.
+
+    a catalog can be shared by any number of RasterGetter objects and threads, the loading
+    holds a lock so the bucket is only read once however many threads, or tasks of an event
+    loop, ask for it at the same time. shared_catalog returns the catalog of the process
+    """
+    def __init__(self, region_ept_info: dict = None, use_cache: bool = True,
+                 cache: CatalogCache = None, config: FetchConfig = None) -> None:
+        # settings of load_ept_json, used when region_ept_info is not given
+        self.use_cache = use_cache
+        self.cache = cache
+        self.config = config
+        self._lock = threading.Lock()
+        # the lock of load_async and the event loop it belongs to, made on the first load_async
+        self._async_lock = None
+        self._async_loop = None
+        self._region_ept_info = None
+        self._index = None
+        # size of the ept.json files downloaded by the loads of this catalog
+        self.bytes_fetched = 0
+        if region_ept_info is not None:
+            self._set(region_ept_info)
+
+    def _set(self, region_ept_info: dict) -> None:
+        """
+        builds the index, the index is assigned last since it marks the catalog as loaded
+        """
+        self._region_ept_info = region_ept_info
+        self._index = RegionIndex(region_ept_info)
+
+    def loaded(self) -> bool:
+        """
+        returns whether the catalog has been loaded
+        """
+        return self._index is not None
+
+    def load(self, refresh: bool = False) -> None:
+        """
+        loads the catalog with load_ept_json unless it is already loaded
+
+        Parameters
+        ----------
+        refresh: bool : load it again, revalidating the cached catalog against the bucket
+             (Default value = False)
+        """
+        if self.loaded() and not refresh:
+            return
+        with self._lock:
+            if self.loaded() and not refresh:
+                return
+            stats = {}
+            self._set(load_ept_json(self.use_cache, refresh, self.cache, self.config, stats))
+            self.bytes_fetched += stats.get("bytes_fetched", 0)
+            logger.info(f"catalog of {self._index.length()} regions loaded")
+
+    async def load_async(self, refresh: bool = False) -> None:
+        """
+        loads the catalog in the caller's event loop with load_ept_json_async unless it is
+        already loaded
+
+        Parameters
+        ----------
+        refresh: bool : load it again, revalidating the cached catalog against the bucket
+             (Default value = False)
+        """
+        if self.loaded() and not refresh:
+            return
+        async with self._get_async_lock():
+            if self.loaded() and not refresh:
+                return
+            stats = {}
+            region_ept_info = await load_ept_json_async(self.use_cache, refresh, self.cache, self.config, stats)
+            with self._lock:
+                self.bytes_fetched += stats.get("bytes_fetched", 0)
+                if refresh or not self.loaded():
+                    self._set(region_ept_info)
+                    logger.info(f"catalog of {self._index.length()} regions loaded")
+
+    def _get_async_lock(self) -> asyncio.Lock:
+        """
+        returns the lock of load_async for the running event loop, an asyncio.Lock can only
+        be awaited in one loop so a new one is made when the catalog is loaded from another
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._async_loop is not loop:
+                self._async_lock = asyncio.Lock()
+                self._async_loop = loop
+            return self._async_lock
+
+    def get_region_ept_info(self) -> dict:
+        self.load()
+        return self._region_ept_info
+
+    def get_index(self) -> RegionIndex:
+        self.load()
+        return self._index
+
+    def info(self, region: str) -> Info:
+        """
+        returns the Info of a region's ept.json
+        """
+        return self.get_region_ept_info()[region]
+
+    def query(self, bounds: str, predicate: str = "contains") -> list:
+        """
+        returns the regions the bounds lie in, see RegionIndex.query
+
+        Parameters
+        ----------
+        bounds: str : a bounds string of form "([xmin, xmax], [ymin, ymax])"
+
+        predicate: str : "contains" or "intersects"
+             (Default value = "contains")
+
+        Returns: a list of regions
+        -------
+
+        """
+        return self.get_index().query(parse_bounds(bounds), predicate)
+
+    def query_many(self, bounds: list, predicate: str = "contains") -> list:
+        """
+        returns the regions each of many bounds lie in, see RegionIndex.query_many
+
+        Parameters
+        ----------
+        bounds: list : a list of bounds strings
+
+        predicate: str : "contains" or "intersects"
+             (Default value = "contains")
+
+        Returns: a list with a list of regions for every bounds
+        -------
+
+        """
+        return self.get_index().query_many([parse_bounds(b) for b in bounds], predicate)
+
+    def subset(self, regions: list):
+        """
+        returns a catalog with only the given regions, e.g. to send to a worker process
+
+        Parameters
+        ----------
+        regions: list : the regions to keep
+
+        Returns: a Catalog
+        -------
+
+        """
+        region_ept_info = self.get_region_ept_info()
+        return Catalog({region: region_ept_info[region] for region in regions},
+                       self.use_cache, self.cache, self.config)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_async_lock"] = state["_async_loop"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    region_ept_info = property(get_region_ept_info)
+    index = property(get_index)
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def shared_catalog() -> Catalog:
+    """
+    returns the catalog shared by every RasterGetter of the process that is not given
+    its own, it is created on the first call and loaded on first use
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = Catalog()
+        return _shared
@@ -0,0 +1,109 @@
+import os
+import json
+import time
+import tempfile
+from src.lidarToGeo.logger import setup_logger
+
+logger = setup_logger("catalog_cache")
+
+FORMAT_VERSION = 2
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "lidarToGeo")
+DEFAULT_TTL = 24 * 60 * 60
+
+class CatalogCache(object):
+    """
+    keeps a local copy of every region's ept.json in a single versioned json file
+    so that the catalog can be loaded with one file read instead of one http request
+    per region.
+
+    every entry is stored with the ETag and Last-Modified headers it was fetched with
+    so a refresh only needs to re-download the regions whose objects changed
+    """
+    def __init__(self, bucket: str, cache_dir: str = DEFAULT_CACHE_DIR, ttl: int = DEFAULT_TTL) -> None:
+        self.bucket = bucket
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.filename = os.path.join(cache_dir, f"{bucket}.catalog.json")
+
+    def read(self) -> dict:
+        """
+        reads the cache file from disk
+
+        Returns: a dictionary of form {"updated": float, "regions": {region: entry}},
+                an empty catalog is returned if the file is missing, unreadable or was
+                written by a different version of the cache
+        -------
+
+        """
+        empty = {"updated": 0, "regions": {}}
+        try:
+            with open(self.filename, "r", encoding="utf-8") as cache_file:
+                catalog = json.load(cache_file)
+        except FileNotFoundError:
+            return empty
+        except (OSError, ValueError) as e:
+            logger.warning(f"could not read catalog cache {self.filename}: {e}")
+            return empty
+
+        if catalog.get("format_version") != FORMAT_VERSION or catalog.get("bucket") != self.bucket:
+            logger.info(f"ignoring catalog cache {self.filename} written by another cache version")
+            return empty
+
+        return catalog
+
+    def write(self, regions: dict, fresh: bool = True) -> None:
+        """
+        atomically replaces the cache file with the given regions
+
+        Parameters
+        ----------
+        regions: dict : a dictionary of form {region: {"etag": str, "last_modified": str,
+                        "ept": str}}
+
+        fresh: bool : whether the regions are the complete catalog, an incomplete one is
+               saved as expired so that is_fresh is False and the next load revalidates it
+             (Default value = True)
+
+        Returns
+        -------
+
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        catalog = {
+            "format_version": FORMAT_VERSION,
+            "bucket": self.bucket,
+            "updated": time.time() if fresh else 0,
+            "regions": regions
+        }
+        fd, tmp_filename = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+                json.dump(catalog, tmp_file)
+            os.replace(tmp_filename, self.filename)
+        except BaseException:
+            os.remove(tmp_filename)
+            raise
+        logger.info(f"saved {len(regions)} regions to catalog cache {self.filename}")
+
+    def is_fresh(self, catalog: dict) -> bool:
+        """
+        checks whether a catalog read from the cache is younger than the ttl
+
+        Parameters
+        ----------
+        catalog: dict : catalog returned by read
+
+        Returns: True if the catalog can be used without revalidating it
+        -------
+
+        """
+        return bool(catalog["regions"]) and time.time() - catalog["updated"] < self.ttl
+
+    def clear(self) -> None:
+        """
+        deletes the cache file so that the next load fetches every region again
+        """
+        try:
+            os.remove(self.filename)
+        except FileNotFoundError:
+            pass
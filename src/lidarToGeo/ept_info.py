@@ -5,31 +5,94 @@ import numpy as np
 from pyproj import CRS
 from src.lidarToGeo.schema import Schema
 
+def srs_identifier(srs: dict) -> str:
+    """
+    builds a short identifier e.g "EPSG:3857" from the srs key of an ept json
+
+    Parameters
+    ----------
+    srs: dict : the value of the srs key in the ept json
+
+    Returns: the identifier or None if the srs has no authority / horizontal code
+    -------
+
+    """
+    if srs and srs.get('authority') and srs.get('horizontal'):
+        return f"{srs['authority']}:{srs['horizontal']}"
+    return None
+
 class Info(object):
     """
     This class takes in the ept.json and processes the data in the json file
     to a format that we can easily call as attributes of the class
 
+    Only the bounds, the number of points and the srs identifier are kept from
+    the parsed json, everything else is parsed again from the raw text the first
+    time it is needed and the derived Schema, dtype and CRS objects are cached
+
     reference: https://entwine.io/entwine-point-tile.html
 
     """
-    def __init__(self, data) -> None:
-        self.data = json.loads(data)
+    __slots__ = ("raw", "_data", "_bounds", "_points", "_srs_id", "_schema", "_dtype", "_crs")
+
+    def __init__(self, data, bounds: list = None, points: int = None, srs_id: str = None) -> None:
+        self.raw = data
+        self._data = None
+        self._schema = None
+        self._dtype = None
+        self._crs = None
+
+        if bounds is None or points is None:
+            parsed = json.loads(data)
+            bounds = parsed['bounds']
+            points = parsed['points']
+            srs_id = srs_identifier(parsed.get('srs'))
+
+        self._bounds = bounds
+        self._points = int(points)
+        self._srs_id = srs_id
+
+    def summary(self) -> dict:
+        """
+        returns the eagerly kept fields as keyword arguments for Info so that the
+        object can be rebuilt from the raw json without parsing it
+        """
+        return {"bounds": self._bounds, "points": self._points, "srs_id": self._srs_id}
+
+    def get_data(self) -> dict:
+        """
+        parses the full ept json the first time it is needed
+        """
+        if self._data is None:
+            self._data = json.loads(self.raw)
+        return self._data
+    data = property(get_data)
 
     def length(self) -> int:
         """
         reads the data in the points key in the ept json i.e
         all the data points in this particular data
         """
-        return int(self.data['points'])
+        return self._points
 
     def get_schema(self) -> src.lidarToGeo.schema.Schema:
         """
         reads the data in the schema key and passes that data to the Schema class
         """
-        return Schema(self.data['schema'])
+        if self._schema is None:
+            self._schema = Schema(self.data['schema'])
+        return self._schema
     schema = property(get_schema)
 
+    def get_dtype(self) -> np.dtype:
+        """
+        returns the numpy dtype of a point described by the schema
+        """
+        if self._dtype is None:
+            self._dtype = self.schema.dtype
+        return self._dtype
+    dtype = property(get_dtype)
+
     def get_span(self) -> int:
         """
         reads the data in the span key in the ept json
@@ -48,7 +111,7 @@ class Info(object):
         """
         reads the data in the bounds key in the ept json
         """
-        return self.data['bounds']
+        return self._bounds
     bounds = property(get_bounds)
 
     def get_conforming(self) -> list:
@@ -72,6 +135,14 @@ class Info(object):
         return self.data['hierarchyType']
     hierarchytype = property(get_hierarchytype)
 
+    def get_srs_id(self) -> str:
+        """
+        returns the authority and code of the srs e.g "EPSG:3857" or None
+        if the ept json does not have one
+        """
+        return self._srs_id
+    srs_id = property(get_srs_id)
+
     def get_srs(self) -> pyproj.crs.crs.CRS:
         """
         reads the data in the 'srs' key and computes a CRS from the 'wkt' value
@@ -79,7 +150,8 @@ class Info(object):
 
         returns: a pyproj.crs
         """
-        wkt = self.data['srs']['wkt']
-        crs = CRS.from_user_input(wkt)
-        return crs
+        if self._crs is None:
+            wkt = self.data['srs']['wkt']
+            self._crs = CRS.from_user_input(wkt)
+        return self._crs
     srs = property(get_srs)
@@ -0,0 +1,282 @@
+import os
+import json
+import math
+import random
+import asyncio
+import tempfile
+import numpy as np
+from aiohttp import ClientSession, ClientTimeout, ClientError, TCPConnector
+from src.lidarToGeo.ept_info import Info
+from src.lidarToGeo.load_data import FetchConfig, RetryableStatus
+from src.lidarToGeo.tile_cache import TileCache
+from src.lidarToGeo.logger import setup_logger
+
+logger = setup_logger("ept_reader")
+
+DATA_EXTENSIONS = {"laszip": "laz", "binary": "bin", "zstandard": "zst"}
+
+def node_bounds(key: str, cube: list) -> tuple:
+    """
+    computes the bounds of an octree node from its key
+
+    Parameters
+    ----------
+    key: str : the node's key of form "D-X-Y-Z"
+
+    cube: list : the ept bounds [xmin, ymin, zmin, xmax, ymax, zmax] of the root node
+
+    Returns: a tuple of form (xmin, ymin, zmin, xmax, ymax, zmax)
+    -------
+
+    """
+    depth, x, y, z = (int(part) for part in key.split("-"))
+    size = (cube[3] - cube[0]) / 2 ** depth
+    xmin = cube[0] + x * size
+    ymin = cube[1] + y * size
+    zmin = cube[2] + z * size
+    return (xmin, ymin, zmin, xmin + size, ymin + size, zmin + size)
+
+async def fetch_bytes(url: str, session: ClientSession, semaphore: asyncio.Semaphore,
+                      config: FetchConfig) -> bytes:
+    """
+    downloads a file, retrying timeouts and 5xx / 429 answers with an exponential backoff
+
+    Parameters
+    ----------
+    url: str : url of the file
+
+    session: aiohttp.ClientSession : session used to make the request
+
+    semaphore: asyncio.Semaphore : bounds the number of requests in flight
+
+    config: FetchConfig : retry and timeout settings
+
+    Returns : the file's content
+    -------
+
+    """
+    for attempt in range(config.retries + 1):
+        try:
+            async with semaphore:
+                async with session.get(url) as response:
+                    if response.status >= 500 or response.status == 429:
+                        raise RetryableStatus(f"status {response.status}")
+                    response.raise_for_status()
+                    return await response.read()
+        except (asyncio.TimeoutError, ClientError, RetryableStatus) as e:
+            # 4xx answers will not change on a retry
+            if attempt == config.retries or 400 <= getattr(e, "status", 0) < 500:
+                raise
+            await asyncio.sleep(config.backoff * 2 ** attempt * (1 + random.random()))
+
+class EptReader(object):
+    """
+    reads the points of an entwine point tile dataset without pdal's readers.ept, only the
+    octree nodes that intersect the requested bounds down to the depth needed for the
+    requested resolution are downloaded, concurrently with asyncio
+
+    reference: https://entwine.io/entwine-point-tile.html
+    """
+    def __init__(self, info: Info, url: str, config: FetchConfig = None,
+                 cache: TileCache = None, dimensions: list = None) -> None:
+        if info.datatype not in DATA_EXTENSIONS:
+            raise ValueError(f"Unrecognised ept dataType {info.datatype}, expected one of "
+                             f"{tuple(DATA_EXTENSIONS)}")
+        if info.datatype == "zstandard":
+            # checked before any node is downloaded
+            try:
+                import zstandard
+            except ImportError:
+                raise ImportError("the dataset's nodes are zstandard compressed, install the "
+                                  "zstandard package to read them") from None
+        # url of the dataset's folder, e.g. ".../usgs-lidar-public/IA_FullState/"
+        self.info = info
+        self.url = url if url.endswith("/") else url + "/"
+        self.config = config or FetchConfig()
+        # node files are read from and saved to the cache when one is given
+        self.cache = cache
+        # dimensions the points are decoded with, e.g ["X", "Y", "Z", "Classification"],
+        # every dimension of the schema when None
+        self.dimensions = dimensions
+        # node files downloaded by this reader, the cached ones are not counted, bytes_fetched
+        # also counts the hierarchy files
+        self.nodes_fetched = 0
+        self.bytes_fetched = 0
+
+    def depth_for_resolution(self, resolution: float) -> int:
+        """
+        returns the shallowest octree depth whose point spacing is at most resolution
+
+        Parameters
+        ----------
+        resolution: float : the desired spacing between points
+
+        Returns: the depth
+        -------
+
+        """
+        cube = self.info.bounds
+        spacing = (cube[3] - cube[0]) / self.info.span
+        return max(0, int(math.ceil(math.log2(spacing / resolution))))
+
+    async def select_nodes(self, box: tuple, depth: int, session: ClientSession,
+                           semaphore: asyncio.Semaphore) -> dict:
+        """
+        traverses the hierarchy and returns the nodes that intersect box, loading the
+        hierarchy files of the subtrees that are needed only
+
+        Parameters
+        ----------
+        box: tuple : (xmin, ymin, xmax, ymax) bounds of the query
+
+        depth: int : deepest octree level to select
+
+        session: aiohttp.ClientSession : session used to make the requests
+
+        semaphore: asyncio.Semaphore : bounds the number of requests in flight
+
+        Returns: a dictionary of form {node key: number of points}
+        -------
+
+        """
+        cube = self.info.bounds
+        selected = {}
+        pending = ["0-0-0-0"]
+
+        while pending:
+            pages = await asyncio.gather(*(
+                fetch_bytes(self.url + f"ept-hierarchy/{key}.json", session, semaphore, self.config)
+                for key in pending))
+            pending = []
+            self.bytes_fetched += sum(len(page) for page in pages)
+            for page in pages:
+                for key, count in json.loads(page).items():
+                    if int(key.split("-")[0]) > depth:
+                        continue
+                    bounds = node_bounds(key, cube)
+                    if bounds[0] > box[2] or bounds[3] < box[0] or \
+                            bounds[1] > box[3] or bounds[4] < box[1]:
+                        continue
+                    if count == -1:
+                        pending.append(key)
+                    elif count > 0:
+                        selected[key] = count
+
+        return selected
+
+    async def fetch_nodes(self, box: tuple, depth: int) -> dict:
+        """
+        downloads the data of every node that intersects box down to depth
+
+        Parameters
+        ----------
+        box: tuple : (xmin, ymin, xmax, ymax) bounds of the query
+
+        depth: int : deepest octree level to fetch
+
+        Returns: a dictionary of form {node key: the node's file content}
+        -------
+
+        """
+        extension = DATA_EXTENSIONS[self.info.datatype]
+        semaphore = asyncio.Semaphore(self.config.concurrency)
+        connector = TCPConnector(limit=self.config.concurrency,
+                                 limit_per_host=self.config.limit_per_host)
+        timeout = ClientTimeout(total=self.config.timeout)
+
+        async with ClientSession(connector=connector, timeout=timeout) as session:
+            nodes = await self.select_nodes(box, depth, session, semaphore)
+            logger.info(f"fetching {len(nodes)} nodes ({sum(nodes.values())} points) "
+                        f"down to depth {depth}")
+            contents = {}
+            if self.cache is not None:
+                for key in nodes:
+                    content = self.cache.get(self.url, key)
+                    if content is not None:
+                        contents[key] = content
+            keys = [key for key in nodes if key not in contents]
+            fetched = await asyncio.gather(*(
+                fetch_bytes(self.url + f"ept-data/{key}.{extension}", session, semaphore, self.config)
+                for key in keys))
+
+        self.nodes_fetched += len(fetched)
+        self.bytes_fetched += sum(len(content) for content in fetched)
+        for key, content in zip(keys, fetched):
+            contents[key] = content
+            if self.cache is not None:
+                self.cache.put(self.url, key, content)
+
+        return {key: contents[key] for key in nodes}
+
+    def decode(self, content: bytes) -> np.ndarray:
+        """
+        decodes the content of a node's file into a structured array with the scaled
+        dimensions (X, Y, Z) in real world coordinates
+
+        Parameters
+        ----------
+        content: bytes : the node's file content
+
+        Returns: a numpy structured array typed by the scaled dtype of the schema's
+                projection on dimensions
+        -------
+
+        """
+        datatype = self.info.datatype
+        if datatype == "laszip":
+            points = decode_laz(content)
+            return points if self.dimensions is None else self.info.schema.select(points, self.dimensions)
+        if datatype == "zstandard":
+            import zstandard
+            content = zstandard.ZstdDecompressor().decompressobj().decompress(content)
+
+        # only the projected dimensions are copied out of the node's buffer
+        return self.info.schema.decode(content, self.dimensions)
+
+    def read(self, bounds: tuple, resolution: float = None, depth: int = None) -> np.ndarray:
+        """
+        reads the points inside bounds
+
+        Parameters
+        ----------
+        bounds: tuple : (xmin, ymin, xmax, ymax) bounds of the query
+
+        resolution: float : spacing of the points needed, selects the depth of the octree
+                    that is read when depth is not given
+             (Default value = None)
+
+        depth: int : deepest octree level to read, every level is read when neither depth
+               nor resolution is given
+             (Default value = None)
+
+        Returns: a numpy structured array of the points
+        -------
+
+        """
+        if depth is None:
+            depth = self.depth_for_resolution(resolution) if resolution else 64
+        contents = asyncio.run(self.fetch_nodes(bounds, depth))
+        if not contents:
+            return np.empty(0, dtype=self.info.schema.projection(self.dimensions)[1])
+
+        points = np.concatenate([self.decode(content) for content in contents.values()])
+        inside = (points["X"] >= bounds[0]) & (points["X"] <= bounds[2]) & \
+            (points["Y"] >= bounds[1]) & (points["Y"] <= bounds[3])
+        return points[inside]
+
+def decode_laz(content: bytes) -> np.ndarray:
+    """
+    decodes a laszip compressed node with pdal's readers.las
+    """
+    # pdal is only needed for laszip datasets, binary ones are decoded with numpy alone
+    import pdal
+
+    fd, filename = tempfile.mkstemp(suffix=".laz")
+    try:
+        with os.fdopen(fd, "wb") as laz_file:
+            laz_file.write(content)
+        pipeline = pdal.Pipeline(json.dumps([{"type": "readers.las", "filename": filename}]))
+        pipeline.execute()
+        return np.concatenate(pipeline.arrays)
+    finally:
+        os.remove(filename)
@@ -0,0 +1,133 @@
+import json
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.feather as feather
+from pyproj import CRS
+from src.lidarToGeo.logger import setup_logger
+
+logger = setup_logger("export")
+
+# little endian WKB point: byte order, geometry type, x, y
+WKB_POINT = np.dtype([("byte_order", "u1"), ("type", "<u4"), ("x", "<f8"), ("y", "<f8")])
+# the offsets of an arrow binary array are int32, so a chunk holds less than 2 GiB of WKB
+MAX_WKB_CHUNK_SIZE = (2 ** 31 - 1) // WKB_POINT.itemsize
+WKB_CHUNK_SIZE = 10000000
+
+def points_to_wkb(x: np.ndarray, y: np.ndarray, chunk_size: int = WKB_CHUNK_SIZE) -> pa.ChunkedArray:
+    """
+    encodes points as WKB straight from their coordinates, without creating shapely geometries
+
+    Parameters
+    ----------
+    x: np.ndarray : x coordinates of the points
+
+    y: np.ndarray : y coordinates of the points
+
+    chunk_size: int : number of points per chunk of the array, the 32 bit offsets of an
+                arrow binary array address at most MAX_WKB_CHUNK_SIZE points
+         (Default value = WKB_CHUNK_SIZE)
+
+    Returns: a pyarrow chunked binary array with the WKB of every point
+    -------
+
+    """
+    if not 0 < chunk_size <= MAX_WKB_CHUNK_SIZE:
+        raise ValueError(f"chunk_size must be between 1 and {MAX_WKB_CHUNK_SIZE}, not {chunk_size}")
+    chunks = []
+    for start in range(0, len(x), chunk_size):
+        count = min(chunk_size, len(x) - start)
+        wkb = np.empty(count, dtype=WKB_POINT)
+        wkb["byte_order"] = 1
+        wkb["type"] = 1
+        wkb["x"] = x[start:start + count]
+        wkb["y"] = y[start:start + count]
+        offsets = np.arange(count + 1, dtype=np.int32) * np.int32(WKB_POINT.itemsize)
+        chunks.append(pa.Array.from_buffers(pa.binary(), count,
+                                            [None, pa.py_buffer(offsets), pa.py_buffer(wkb.tobytes())]))
+    return pa.chunked_array(chunks, type=pa.binary())
+
+def points_table(x: np.ndarray, y: np.ndarray, columns: dict, crs) -> pa.Table:
+    """
+    creates an arrow table of points with the GeoParquet "geo" metadata geopandas and
+    other readers use to recognise the geometry column
+
+    Parameters
+    ----------
+    x: np.ndarray : x coordinates of the points
+
+    y: np.ndarray : y coordinates of the points
+
+    columns: dict : a dictionary of form {column name: numpy array} of the points' attributes
+
+    crs : anything pyproj.CRS accepts, e.g 3857 or "EPSG:3857"
+
+    Returns: a pyarrow table with the attributes and a "geometry" column
+    -------
+
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    data = {name: pa.array(np.asarray(values)) for name, values in columns.items()}
+    data["geometry"] = points_to_wkb(x, y)
+    bbox = [float(x.min()), float(y.min()), float(x.max()), float(y.max())] if len(x) else []
+    geo = {
+        "version": "1.0.0",
+        "primary_column": "geometry",
+        "columns": {
+            "geometry": {
+                "encoding": "WKB",
+                "geometry_types": ["Point"],
+                "crs": CRS.from_user_input(crs).to_json_dict(),
+                "bbox": bbox
+            }
+        }
+    }
+    table = pa.table(data)
+    return table.replace_schema_metadata({b"geo": json.dumps(geo).encode()})
+
+def points_to_geoparquet(x: np.ndarray, y: np.ndarray, columns: dict, crs, filename: str,
+                         compression: str = "zstd") -> None:
+    """
+    writes points to a GeoParquet file
+
+    Parameters
+    ----------
+    x: np.ndarray : x coordinates of the points
+
+    y: np.ndarray : y coordinates of the points
+
+    columns: dict : a dictionary of form {column name: numpy array} of the points' attributes
+
+    crs : anything pyproj.CRS accepts, e.g 3857 or "EPSG:3857"
+
+    filename: str : name of the parquet file
+
+    compression: str : parquet compression codec
+         (Default value = "zstd")
+    """
+    pq.write_table(points_table(x, y, columns, crs), filename, compression=compression)
+    logger.info(f"{len(x)} points saved as {filename}")
+
+def points_to_feather(x: np.ndarray, y: np.ndarray, columns: dict, crs, filename: str,
+                      compression: str = "lz4") -> None:
+    """
+    writes points to a Feather (Arrow IPC) file
+
+    Parameters
+    ----------
+    x: np.ndarray : x coordinates of the points
+
+    y: np.ndarray : y coordinates of the points
+
+    columns: dict : a dictionary of form {column name: numpy array} of the points' attributes
+
+    crs : anything pyproj.CRS accepts, e.g 3857 or "EPSG:3857"
+
+    filename: str : name of the feather file
+
+    compression: str : feather compression codec
+         (Default value = "lz4")
+    """
+    feather.write_feather(points_table(x, y, columns, crs), filename, compression=compression)
+    logger.info(f"{len(x)} points saved as {filename}")
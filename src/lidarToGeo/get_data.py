@@ -1,15 +1,73 @@
 import os
-import ast
 import pdal
 import json
-import src.lidarToGeo.load_data
+import hashlib
+import shutil
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor
 from osgeo import ogr, gdal
 import numpy as np
 import geopandas as gpd
 from src.lidarToGeo.logger import setup_logger
+from src.lidarToGeo.metrics import Metrics
+from src.lidarToGeo.ept_reader import EptReader
+from src.lidarToGeo.point_store import PointStore, write_point_store
+from src.lidarToGeo.result_cache import request_key
+from src.lidarToGeo.export import points_to_geoparquet, points_to_feather
+from src.lidarToGeo.raster import mosaic_tifs, read_raster, write_cogs
+from src.lidarToGeo.quicklook import save_quicklook, tile_pyramid, points_to_grid
+from src.lidarToGeo.twi import twi
+from src.lidarToGeo.gridding import grid_elevation, grid_to_points, OUTPUT_TYPES as IN_MEMORY_OUTPUT_TYPES
+from src.lidarToGeo.catalog import Catalog, shared_catalog
+from src.lidarToGeo.load_data import ept_json_url
+from src.lidarToGeo.pipeline_template import raster_template, elevation_type
+from src.lidarToGeo.region_index import parse_bounds
+from src.lidarToGeo.tiling import split_bounds, format_bounds, grid_size
 
 logger = setup_logger("get_data")
 
+def region_year(region: str) -> str:
+    """
+    returns the year a region's data was collected in, taken from the end of the region's
+    name, or the region itself if the name does not end with a year
+    """
+    year = region.split("_")[-1][:-1]
+    if not year.isdigit():
+        year = region
+    return year
+
+def _process_region(raster_getter, region: str, save_png: bool, resolution: int,
+                    in_memory: bool = False, vectorize: str = "points") -> gpd.GeoDataFrame:
+    """
+    fetches and converts one region, run by region_gdf_dict and its worker processes
+    """
+    if in_memory:
+        return raster_getter.get_geodataframe_in_memory(region, save_png, resolution)
+    raster_getter.get_raster_terrain(region, resolution)
+    return raster_getter.get_geodataframe(region, save_png, resolution, vectorize)
+
+def _process_region_in_worker(raster_getter, region: str, save_png: bool, resolution: int,
+                              in_memory: bool = False, vectorize: str = "points") -> tuple:
+    """
+    runs _process_region in a worker process of region_gdf_dict and returns the worker's
+    metrics with the geodataframe, so they can be merged into the parent's
+    """
+    gdf = _process_region(raster_getter, region, save_png, resolution, in_memory, vectorize)
+    return gdf, raster_getter.metrics
+
+def _execute_tile(pipeline: str) -> bool:
+    """
+    executes the pipeline of one tile, run in the worker processes of get_tiled_raster_terrain.
+    A tile without any points makes pdal raise a RuntimeError, such tiles are left out of
+    the merged files
+    """
+    try:
+        pdal.Pipeline(pipeline).execute()
+        return True
+    except RuntimeError as e:
+        logger.warning(f"tile could not be read: {e}")
+        return False
+
 class RasterGetter:
     """
     fetches the point cloud data from the usgs-lidar-public bucket and converts it
@@ -18,16 +76,55 @@ class RasterGetter:
     dataset: https://registry.opendata.aws/usgs-lidar/
     """
 
-    def __init__(self, bounds: str, crs: int) -> None:
+    def __init__(self, bounds: str, crs: int, tile_size: float = None, tile_overlap: float = 30,
+                 tile_workers: int = 1, catalog: Catalog = None) -> None:
         self.bounds = bounds
         self.crs = crs
+        # when tile_size is set the bounds are read as a grid of tiles, each with its own
+        # pipeline, and the tiles' las and tif files are merged afterwards
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.tile_workers = tile_workers
+        # how the flow of a cell is routed when computing the topographic wetness index,
+        # "d8" or "dinf"
+        self.flow_method = "d8"
+        # what reads the points of the in memory path, "pdal" or "native" (EptReader)
+        self.point_reader = "pdal"
+        # TileCache the native reader keeps the downloaded ept nodes in, None disables it
+        self.tile_cache = None
+        # ResultCache region_gdf_dict reuses finished geodataframes from, None disables it
+        self.result_cache = None
+        # largest width or height of the png saved with save_png, bigger grids are downsampled
+        self.quicklook_size = 2048
+        # folder the xyz web tiles of every region are written to with save_png, None skips them
+        self.tile_pyramid_dir = None
+        # CogOptions the tif is also written with as one cloud optimized geotiff per output
+        # type, None skips them
+        self.cog_options = None
+        # folder the points read by the in memory path are stored in, one memory mapped store
+        # per region and bounds that later runs regrid instead of reading the ept again,
+        # None disables it
+        self.point_store_dir = None
+        # dimensions get_points, iter_points and the point stores keep of every point, only
+        # they are decoded, None keeps every dimension
+        self.point_dimensions = ["X", "Y", "Z", "Classification"]
+        # PointFilter applied in numpy to the points of get_points and iter_points, it
+        # changes the classes kept and the crs without building a new pdal pipeline
+        self.point_filter = None
         self.public_data_path = "https://s3-us-west-2.amazonaws.com/usgs-lidar-public/"
-        # get region based in bounds
-        self.regions = self.get_region(bounds)
+        # the ept.json of every region, the process' shared catalog when not given
+        self.catalog = catalog if catalog is not None else shared_catalog()
+        # regions of the bounds, found the first time they are needed
+        self._regions = None
+        # (geodataframe, x, y, columns) arrays the last geodataframe made from a grid was
+        # built from, the columnar exports write them without going through shapely
+        self._point_arrays = None
         self.path = os.getcwd()
+        # wall / cpu time and memory of every stage, the points read and the bytes fetched
+        self.metrics = Metrics()
         self.construct_pipeline()
 
-    def get_region(self, bounds: str) -> list:
+    def get_region(self, bounds: str, predicate: str = "contains") -> list:
         """
 
         Gets all the regions the given boundaries lie in
@@ -37,74 +134,118 @@ class RasterGetter:
         bounds: str : a string containing the bounds you wish to get a
                     geodataframe of. e.g "([-10425171.940, -10423171.940], [5164494.710, 5166494.710])"
 
+        predicate: str : "contains" to only get the regions the bounds lie fully inside,
+                    "intersects" to also get regions that partially overlap the bounds
+             (Default value = "contains")
+
         Returns: a list with all the regions the give bounds
                 lie inf
         -------
 
         """
         logger.info("Finding Entered bound's region")
-        region_ept_info = src.lidarToGeo.load_data.load_ept_json()
-        user_bounds = ast.literal_eval(bounds)
-        regions = []
-
-        for key, value in region_ept_info.items():
-            if value.bounds[0] <= user_bounds[0][0] and \
-                value.bounds[1] <= user_bounds[1][0] and \
-                value.bounds[3] >= user_bounds[0][1] and \
-                    value.bounds[4] >= user_bounds[1][1]:
-                regions.append(key)
+        # the first query loads the catalog
+        fetched = self.catalog.bytes_fetched
+        with self.metrics.stage("get_region"):
+            regions = self.catalog.query(bounds, predicate)
+        self.metrics.add("bytes_fetched", self.catalog.bytes_fetched - fetched)
 
         print("\n")
         logger.info(f"regions containing the boundaries are {regions}")
         return regions
 
+    def get_regions_of_bounds(self) -> list:
+        if self._regions is None:
+            self._regions = self.get_region(self.bounds)
+        return self._regions
+
+    def set_regions_of_bounds(self, regions: list) -> None:
+        self._regions = regions
+
+    regions = property(get_regions_of_bounds, set_regions_of_bounds)
+
+    def get_regions(self, bounds: list, predicate: str = "contains") -> list:
+        """
+
+        Gets the regions each of many boundaries lie in with a single query of the
+        region index
+
+        Parameters
+        ----------
+        bounds: list : a list of bounds strings, see get_region
+
+        predicate: str : "contains" or "intersects", see get_region
+             (Default value = "contains")
+
+        Returns: a list with a list of regions for every entered bounds
+        -------
+
+        """
+        return self.catalog.query_many(bounds, predicate)
+
     def construct_pipeline(self):
         """
-        creates a list containing a json of the pipeline to pass into the PDAL
-        library
+        sets the pipeline template passed into the PDAL library, change it with the
+        template's methods, e.g.
+        raster.pipeline_template = raster.pipeline_template.with_output_type("tin")
         """
-        self.dynamic_pipeline = []
-        reader = {
-            "bounds": "",
-            "filename": "",
-            "type": "readers.ept",
-            "tag": "readdata"
-        }
-        self.dynamic_pipeline.append(reader)
-        classification_filter = {
-            "limits": "Classification![2:7], Classification![9:9]",
-            "type": "filters.range",
-            "tag": "nonoise"
+        self.pipeline_template = raster_template()
 
+    def pipeline_params(self, region: str, resolution: float = None) -> dict:
+        """
+
+        returns the options of the pipeline that depend on the region and the bounds,
+        see PipelineTemplate.bind. The tif's grid starts at the bounds' (xmin, ymin), the
+        grid the tiles of get_tiled_raster_terrain are mosaicked on
+
+        Parameters
+        ----------
+        region: str : region where bounds occur
+
+        resolution: float : cell size of the tif, the template's when None
+             (Default value = None)
+
+        Returns: a dictionary of form {stage name: {option: value}}
+        -------
+
+        """
+        name = str(region).strip('/')
+        params = {
+            "reader": {"bounds": self.bounds, "filename": ept_json_url(region)},
+            "reprojection": {"in_srs": f"EPSG:{self.crs}", "out_srs": f"EPSG:{self.crs}"},
+            "las_writer": {"filename": self.region_laz(region)},
+            "tif_writer": {"filename": self.path + f"/{name}.tif"}
         }
-        self.dynamic_pipeline.append(classification_filter)
-        reprojection = {
-            "in_srs": "EPSG:3857",
-            "out_srs": "EPSG:3857",
-            "tag": "reprojectUTM",
-            "type": "filters.reprojection"
-        }
-        self.dynamic_pipeline.append(reprojection)
-        laz_writer = {
-            "filename": "",
-            "inputs": ["reprojectUTM"],
-            "tag": "writerslas",
-            "type": "writers.las"
-        }
-        self.dynamic_pipeline.append(laz_writer)
-        tif_writer = {
-            "filename": "",
-            "gdalopts": "tiled=yes,     compress=deflate",
-            "inputs": ["writerslas"],
-            "nodata": -9999,
-            "output_type": "idw",
-            "resolution": 5,
-            "type": "writers.gdal",
-            "window_size": 6
-        }
-        self.dynamic_pipeline.append(tif_writer)
+        if resolution is None:
+            resolution = self.pipeline_template.raster_options()['resolution']
+        box = parse_bounds(self.bounds)
+        width, height = grid_size(box, resolution)
+        params.setdefault(self.pipeline_template.grid_stage(), {}).update({
+            "resolution": resolution,
+            "origin_x": box[0],
+            "origin_y": box[1],
+            "width": width,
+            "height": height
+        })
+        return params
+
+    def source_srs(self, region: str) -> str:
+        """
+
+        returns the srs the ept reader returns the region's points in, the reprojection stage
+        is only left out of the pipeline when it reprojects to that same srs
+
+        Parameters
+        ----------
+        region: str : region where bounds occur
+
+        Returns: the srs identifier of the region's ept e.g "EPSG:3857", or None when unknown
+        -------
 
-    def get_raster_terrain(self, region: str) -> None:
+        """
+        return self.catalog.info(region).srs_id
+
+    def get_raster_terrain(self, region: str, resolution: float = None) -> None:
         """
 
         Generates the region's las and tif files using the pdal library
@@ -112,68 +253,531 @@ class RasterGetter:
         Parameters
         ----------
         region: str : region where bounds occur
+
+        resolution: float : cell size of the tif, the template's when None. region_gdf_dict
+                    passes its resolution so that the tif and the in memory grid match
+             (Default value = None)
         """
 
         logger.info(f"Fetching Laz and tiff files for {region}")
-        PUBLIC_ACCESS_PATH = self.public_data_path + region + "ept.json"
-
-        # dynamically update template pipeline
-        self.dynamic_pipeline[0]['bounds'] = self.bounds
-        self.dynamic_pipeline[0]['filename'] = PUBLIC_ACCESS_PATH
-        self.dynamic_pipeline[2]['in_srs'] = f"EPSG:{self.crs}"
-        self.dynamic_pipeline[2]['out_srs'] = f"EPSG:{self.crs}"
-        self.dynamic_pipeline[3]['filename'] = self.path + f"/{str(region).strip('/')}.laz"
-        self.dynamic_pipeline[4]['filename'] = self.path + f"/{str(region).strip('/')}.tif"
-
-        # create pdal pipeline
-        pipeline = pdal.Pipeline(json.dumps(self.dynamic_pipeline))
-        logger.info("Pipeline Dumped and Read for use")
-
-        # execute pipeline
-        pipe_exec = pipeline.execute()
-        metadata = pipeline.metadata
-        log = pipeline.log
-        logger.info("Pipeline Completed Execution Successfully ")
 
-    def get_geodataframe(self, region: str, save_png: bool, resolution: int) -> gpd.GeoDataFrame:
+        if self.tile_size:
+            self.get_tiled_raster_terrain(region, resolution)
+        else:
+            # create pdal pipeline
+            pipeline = pdal.Pipeline(self.pipeline_template.bind(self.pipeline_params(region, resolution),
+                                                                  self.source_srs(region)))
+            logger.info("Pipeline Dumped and Read for use")
+
+            # execute pipeline
+            with self.metrics.stage("pdal_execute", region=region):
+                pipe_exec = pipeline.execute()
+            self.metrics.add("points_read", pipe_exec)
+            self.metrics.add("bytes_read", pipe_exec * self.catalog.info(region).schema.dtype.itemsize)
+            self.metrics.record_pipeline(region, pipeline.metadata, pipeline.log)
+            logger.info("Pipeline Completed Execution Successfully ")
+
+        if self.cog_options is not None:
+            self.write_cogs(region)
+
+    def write_cogs(self, region: str) -> dict:
         """
 
-        Converts the pdal generated tif file into a shp file and creates a geodataframe from the
-        shp file and calculates it topographic wetness index
+        writes every band of the region's tif (one per output type of the pipeline) as a
+        validated cloud optimized geotiff with internal overviews, see region_cog
 
         Parameters
         ----------
         region: str : region where bounds occur
 
-        save_png: bool : Whether to save the plot of the region (takes a significant amount of time
-        to save the plot)
+        Returns: a dictionary of form {output type: name of the cog}
+        -------
+
+        """
+        bands = self.pipeline_template.bands()
+        with self.metrics.stage("write_cogs", region=region):
+            write_cogs(self.region_tif(region),
+                       {band: self.region_cog(region, output_type)
+                        for band, output_type in enumerate(bands, start=1)},
+                       self.cog_options)
+        return {output_type: self.region_cog(region, output_type) for output_type in bands}
+
+    def get_tiled_raster_terrain(self, region: str, resolution: float = None) -> None:
+        """
+
+        Generates the region's las and tif files by splitting the bounds into tiles of
+        tile_size, running a pipeline per tile in tile_workers processes and merging the
+        tiles' las and tif files. The tif is on the grid of an untiled run, see
+        pipeline_params, and every tile is read with tile_overlap extra around it so that
+        the interpolated cells at its edges see the points an untiled run does.
+
+        Parameters
+        ----------
+        region: str : region where bounds occur
+
+        resolution: float : cell size of the tif, the template's when None
+             (Default value = None)
+        """
+        name = str(region).strip('/')
+        if resolution is None:
+            resolution = self.pipeline_template.raster_options()['resolution']
+        box = parse_bounds(self.bounds)
+        tiles = split_bounds(box, self.tile_size, self.tile_overlap, resolution)
+        tile_dir = tempfile.mkdtemp(prefix=f"{name}_tiles_", dir=self.path)
+        logger.info(f"Splitting the bounds into {len(tiles)} tiles")
+
+        pipelines = []
+        for i, (core, read) in enumerate(tiles):
+            pipelines.append(self.tile_pipeline(region, core, read, resolution,
+                                                os.path.join(tile_dir, f"{i}.laz"),
+                                                os.path.join(tile_dir, f"{i}.tif")))
+
+        try:
+            with self.metrics.stage("pdal_execute_tiles", region=region):
+                if self.tile_workers > 1:
+                    with ProcessPoolExecutor(max_workers=self.tile_workers) as executor:
+                        executed = list(executor.map(_execute_tile, pipelines))
+                else:
+                    executed = [_execute_tile(pipeline) for pipeline in pipelines]
+
+            done = [i for i in range(len(tiles)) if executed[i]]
+            if not done:
+                raise RuntimeError(f"none of the {len(tiles)} tiles of {region} could be read")
+
+            if "las_writer" in self.pipeline_template:
+                with self.metrics.stage("merge_las", region=region):
+                    self.merge_las([os.path.join(tile_dir, f"{i}.laz") for i in done],
+                                   self.region_laz(region))
+            with self.metrics.stage("mosaic_tifs", region=region):
+                mosaic_tifs([(os.path.join(tile_dir, f"{i}.tif"), tiles[i][0]) for i in done],
+                            self.path + f"/{name}.tif", (box[0], box[1]), resolution)
+        finally:
+            shutil.rmtree(tile_dir, ignore_errors=True)
+        logger.info("Tiled Pipelines Completed Execution Successfully ")
+
+    def tile_pipeline(self, region: str, core: tuple, read: tuple, resolution: float,
+                      laz_filename: str, tif_filename: str) -> str:
+        """
+
+        creates the pipeline of a single tile from the pipeline template, the points are
+        read from the tile's expanded bounds, the tif covers those bounds on the shared
+        grid and only the points in the tile's core are written to the las file
+
+        Parameters
+        ----------
+        region: str : region where bounds occur
+
+        core: tuple : (xmin, ymin, xmax, ymax) part of the bounds the tile covers
+
+        read: tuple : (xmin, ymin, xmax, ymax) bounds the tile's points are read from
+
+        resolution: float : cell size of the tif
+
+        laz_filename: str : name of the tile's las file
+
+        tif_filename: str : name of the tile's tif file
+
+        Returns: the pipeline as a json string
+        -------
+
+        """
+        template = self.pipeline_template
+        points_tag = template.points_tag()
+        raster_input = "delaunay" if "delaunay" in template else "tif_writer"
+        template = template.with_options(raster_input, inputs=[points_tag])
+        if "las_writer" in template:
+            template = template.with_stage("crop", {"inputs": [points_tag], "tag": "core",
+                                                    "type": "filters.crop"}, before="las_writer")
+            template = template.with_options("las_writer", inputs=["core"])
+
+        params = self.pipeline_params(region)
+        params["reader"]["bounds"] = format_bounds(read)
+        params["crop"] = {"bounds": format_bounds(core)}
+        params["las_writer"]["filename"] = laz_filename
+        params["tif_writer"]["filename"] = tif_filename
+        params.setdefault(template.grid_stage(), {}).update({
+            "resolution": resolution,
+            "origin_x": read[0],
+            "origin_y": read[1],
+            "width": int(round((read[2] - read[0]) / resolution)),
+            "height": int(round((read[3] - read[1]) / resolution))
+        })
+        return template.bind(params, self.source_srs(region))
+
+    def merge_las(self, laz_filenames: list, laz_filename: str) -> None:
+        """
+
+        merges the las files of the tiles into one las file
+
+        Parameters
+        ----------
+        laz_filenames: list : names of the tiles' las files
+
+        laz_filename: str : name of the merged las file
+        """
+        stages = [{"type": "readers.las", "filename": filename} for filename in laz_filenames]
+        stages.append({"type": "filters.merge"})
+        stages.append({"type": "writers.las", "filename": laz_filename})
+        pdal.Pipeline(json.dumps(stages)).execute()
+
+    def get_geodataframe(self, region: str, save_png: bool, resolution: int,
+                         vectorize: str = "points") -> gpd.GeoDataFrame:
+        """
+
+        Converts the pdal generated tif file into points and creates a geodataframe from
+        them and calculates it topographic wetness index
+
+        Parameters
+        ----------
+        region: str : region where bounds occur
+
+        save_png: bool : Whether to save a quicklook png of the region's elevation
 
         resolution: int : resolution of the points
 
+        vectorize: str : "points" to create a point at the center of every cell of the tif,
+                   "polygons" to polygonize the tif into a shp file and take the centroids of
+                   the polygons
+             (Default value = "points")
+
         Returns: a geopandas dataframe
         -------
 
         """
-        self.tif_to_shp(self.path + f"/{str(region).strip('/')}.tif",
-                        self.path + f"/{str(region).strip('/')}.shp")
-        self.gdf = gpd.read_file(self.path + f"/{str(region).strip('/')}.shp")
+        tif_filename = self.path + f"/{str(region).strip('/')}.tif"
+        # the geodataframe is built in a local so that threads sharing the getter do
+        # not return each other's result
+        grid = transform = nodata = None
+        if vectorize == "points":
+            with self.metrics.stage("read_tif", region=region):
+                grid, transform, nodata = read_raster(tif_filename, self.pipeline_template.elevation_band())
+            gdf = self.grid_to_geodataframe(grid, transform, nodata)
+        elif vectorize == "polygons":
+            with self.metrics.stage("polygonize", region=region):
+                self.tif_to_shp(tif_filename, self.path + f"/{str(region).strip('/')}.shp",
+                                self.pipeline_template.elevation_band())
+            with self.metrics.stage("read_shp", region=region):
+                gdf = gpd.read_file(self.path + f"/{str(region).strip('/')}.shp")
 
-        self.gdf["area"] = self.gdf["geometry"].area
-        self.gdf["denom"] = self.gdf["elevation"] / resolution
-        self.gdf["TWI"] = np.log(self.gdf["area"] / self.gdf["denom"])
+            gdf["area"] = gdf["geometry"].area
+            gdf["denom"] = gdf["elevation"] / resolution
+            gdf["TWI"] = np.log(gdf["area"] / gdf["denom"])
 
-        self.gdf.drop(["area", "denom"], axis=1, inplace=True)
+            gdf.drop(["area", "denom"], axis=1, inplace=True)
 
-        self.gdf["geometry"] = self.gdf["geometry"].centroid
+            gdf["geometry"] = gdf["geometry"].centroid
+            if save_png:
+                # the centroids of the merged polygons are not on the tif's grid
+                grid, transform, nodata = read_raster(tif_filename, self.pipeline_template.elevation_band())
+        else:
+            raise ValueError(f"Unrecognised vectorize {vectorize}, expected points or polygons")
+        self.gdf = gdf
 
         if save_png:
-            logger.info(f"saving plot as {str(region).strip('/')}.png")
-            plot = self.gdf.plot(column="elevation", kind='geo', legend=True)
-            fig = plot.get_figure()
-            fig.set_size_inches(18.5, 10.5)
-            fig.savefig(f"{str(region).strip('/')}.png")
+            self.save_plot(region, gdf, grid, transform, nodata)
+
+        return gdf
+
+    def grid_to_geodataframe(self, grid: np.ndarray, transform: tuple, nodata: float) -> gpd.GeoDataFrame:
+        """
 
-        return self.gdf
+        creates a geodataframe with a point at the center of every raster cell that has data,
+        along with the cell's elevation and topographic wetness index
+
+        Parameters
+        ----------
+        grid: np.ndarray : 2d elevation grid
+
+        transform: tuple : gdal geotransform of the grid
+
+        nodata: float : value of the cells without data
+
+        Returns: a geopandas dataframe
+        -------
+
+        """
+        with self.metrics.stage("twi"):
+            cell_twi = twi(grid, abs(transform[1]), nodata, self.flow_method)
+        with self.metrics.stage("vectorize"):
+            x, y, elevation = grid_to_points(grid, transform, nodata)
+            _, _, wetness = grid_to_points(cell_twi, transform, nodata)
+
+            gdf = gpd.GeoDataFrame({"elevation": elevation}, geometry=gpd.points_from_xy(x, y),
+                                   crs=f"EPSG:{self.crs}")
+            gdf["TWI"] = wetness
+        self._point_arrays = (gdf, x, y, {"elevation": elevation, "TWI": wetness})
+        return gdf
+
+    def get_points(self, region: str, resolution: float = None) -> np.ndarray:
+        """
+
+        Reads the region's points inside the bounds with the reader, classification and
+        reprojection stages of the pipeline and keeps them in memory instead of writing
+        las and tif files.
+
+        When point_reader is "native" the points are read with EptReader instead of pdal,
+        which only downloads the octree nodes needed for resolution. The classification
+        and reprojection stages are not applied to those points, point_filter is applied
+        to the points of both readers.
+
+        Parameters
+        ----------
+        region: str : region where bounds occur
+
+        resolution: float : spacing of the points needed by the native reader, every
+                    level of the octree is read when None
+             (Default value = None)
+
+        Returns: a numpy structured array of the points
+        -------
+
+        """
+        logger.info(f"Fetching points for {region}")
+        if self.point_reader == "native":
+            reader = EptReader(self.catalog.info(region), self.public_data_path + region,
+                               cache=self.tile_cache, dimensions=self.point_dimensions)
+            with self.metrics.stage("ept_read", region=region):
+                points = reader.read(parse_bounds(self.bounds), resolution)
+            self.metrics.add("points_read", len(points))
+            self.metrics.add("bytes_read", len(points) * reader.info.schema.dtype.itemsize)
+            self.metrics.add("nodes_fetched", reader.nodes_fetched)
+            self.metrics.add("bytes_fetched", reader.bytes_fetched)
+            return self.filter_points(points, region)
+
+        pipeline = pdal.Pipeline(self.points_pipeline(region))
+        with self.metrics.stage("pdal_execute", region=region):
+            points_read = pipeline.execute()
+        self.metrics.add("points_read", points_read)
+        # pdal does not report the size of its downloads
+        self.metrics.add("bytes_read", points_read * self.catalog.info(region).schema.dtype.itemsize)
+        self.metrics.record_pipeline(region, pipeline.metadata, pipeline.log)
+        logger.info("Pipeline Completed Execution Successfully ")
+
+        points = np.concatenate(pipeline.arrays)
+        if self.point_dimensions is not None:
+            points = self.catalog.info(region).schema.select(points, self.point_dimensions)
+        return self.filter_points(points, region)
+
+    def filter_points(self, points: np.ndarray, region: str = None) -> np.ndarray:
+        """
+
+        applies point_filter to points read by get_points or iter_points
+
+        Parameters
+        ----------
+        points: np.ndarray : numpy structured array of the points
+
+        region: str : region the points were read from, labels the metrics
+             (Default value = None)
+
+        Returns: the filtered points, points themselves when there is no point_filter
+        -------
+
+        """
+        if self.point_filter is None:
+            return points
+        with self.metrics.stage("point_filter", region=region):
+            return self.point_filter.apply(points)
+
+    def get_point_store(self, region: str, resolution: float = None) -> PointStore:
+        """
+
+        opens the region's point store, reading the points into it first if it does not
+        exist or was written from an older ept.json. The store only depends on the bounds,
+        the reader and the filter stages, so it can be regridded at any resolution
+
+        Parameters
+        ----------
+        region: str : region where bounds occur
+
+        resolution: float : spacing of the points needed by the native reader, which keeps
+                    a store per resolution, ignored by pdal
+             (Default value = None)
+
+        Returns: a PointStore
+        -------
+
+        """
+        request = self.point_store_request(region, resolution)
+        directory = os.path.join(self.point_store_dir, request_key(request))
+        version = self.region_version(region)
+        try:
+            store = PointStore(directory)
+            if store.meta.get("version") == version:
+                logger.info(f"using the point store {directory}")
+                return store
+        except FileNotFoundError:
+            pass
+        except (KeyError, ValueError) as e:
+            # e.g a meta.json without the columns, the store is written again
+            logger.warning(f"rewriting the unreadable point store {directory}: {e!r}")
+
+        info = self.catalog.info(region)
+        chunks = self.get_points(region, resolution) if self.point_reader == "native" \
+            else self.iter_points(region)
+        # the scaled dimensions only fit the schema's integers in the ept's own srs
+        quantize = (self.point_reader == "native" or info.srs_id == f"EPSG:{self.crs}") and \
+            (self.point_filter is None or not self.point_filter.reprojects())
+        with self.metrics.stage("write_point_store", region=region):
+            return write_point_store(directory, chunks, info.schema,
+                                     dict(request, version=version), quantize)
+
+    def point_store_request(self, region: str, resolution: float = None) -> dict:
+        """
+        describes everything the points of a region's point store depend on, used as the
+        key of the store
+
+        Returns: a json serializable dictionary
+        -------
+
+        """
+        return {
+            "region": region,
+            "bounds": parse_bounds(self.bounds),
+            "crs": self.crs,
+            "point_reader": self.point_reader,
+            "resolution": resolution if self.point_reader == "native" else None,
+            "dimensions": self.point_dimensions,
+            "point_filter": self.point_filter.describe() if self.point_filter is not None else None,
+            "pipeline": [stage for name, stage in self.pipeline_template.points_template().stages()
+                         if name != "reader"]
+        }
+
+    def points_pipeline(self, region: str) -> str:
+        """
+
+        creates a pipeline with only the reader and filter stages of the pipeline template, for reading the region's points without writing any files
+
+        Parameters
+        ----------
+        region: str : region where bounds occur
+
+        Returns: the pipeline as a json string
+        -------
+
+        """
+        return self.pipeline_template.points_template().bind(self.pipeline_params(region),
+                                                             self.source_srs(region))
+
+    def iter_points(self, region: str, chunk_size: int = 1000000):
+        """
+
+        Streams the region's points inside the bounds through the reader, classification and
+        reprojection stages of the pipeline, so that any number of points can be processed
+        with bounded memory
+
+        Parameters
+        ----------
+        region: str : region where bounds occur
+
+        chunk_size: int : maximum number of points in a chunk
+             (Default value = 1000000)
+
+        Returns: a generator of numpy structured arrays typed by the region's schema and
+                projected on point_dimensions, with the scaled dimensions (X, Y, Z) as float64
+                like pdal returns them
+        -------
+
+        """
+        schema = self.catalog.info(region).schema
+        pipeline = pdal.Pipeline(self.points_pipeline(region))
+        logger.info(f"Streaming points for {region} in chunks of {chunk_size}")
+
+        for chunk in pipeline.iterator(chunk_size=chunk_size):
+            self.metrics.add("bytes_read", len(chunk) * schema.dtype.itemsize)
+            points = self.filter_points(schema.select(chunk, self.point_dimensions), region)
+            self.metrics.add("points_read", len(points))
+            yield points
+
+    def get_geodataframe_in_memory(self, region: str, save_png: bool, resolution: int) -> gpd.GeoDataFrame:
+        """
+
+        Creates the region's geodataframe without the laz / tif / shp round trip, the points
+        returned by the pipeline are gridded in numpy like writers.gdal does and every filled
+        cell becomes a point at the cell's center
+
+        Parameters
+        ----------
+        region: str : region where bounds occur
+
+        save_png: bool : Whether to save the plot of the region
+
+        resolution: int : resolution of the grid and the points
+
+        Returns: a geopandas dataframe
+        -------
+
+        """
+        options = self.pipeline_template.raster_options()
+        output_type = elevation_type(options["output_type"])
+        if output_type not in IN_MEMORY_OUTPUT_TYPES:
+            # checked before any point is read
+            raise ValueError(f"the in memory path cannot grid the {output_type} output type, "
+                             f"use one of {IN_MEMORY_OUTPUT_TYPES} or in_memory=False")
+        if self.point_store_dir is not None:
+            points = self.get_point_store(region, resolution)
+        else:
+            points = self.get_points(region, resolution)
+        with self.metrics.stage("grid", region=region):
+            grid, transform = grid_elevation(points["X"], points["Y"], points["Z"],
+                                             parse_bounds(self.bounds), resolution,
+                                             output_type=output_type,
+                                             nodata=options["nodata"],
+                                             window_size=options["window_size"])
+        gdf = self.grid_to_geodataframe(grid, transform, options["nodata"])
+        self.gdf = gdf
+
+        if save_png:
+            self.save_plot(region, gdf, grid, transform, options["nodata"])
+
+        return gdf
+
+    def save_plot(self, region: str, gdf: gpd.GeoDataFrame = None, grid: np.ndarray = None,
+                  transform: tuple = None, nodata: float = -9999, resolution: float = None) -> None:
+        """
+
+        saves a quicklook of the elevation as a png named after the region, the grid is
+        colored and hillshaded directly instead of plotting every point, and written to
+        tile_pyramid_dir as xyz web tiles when it is set
+
+        Parameters
+        ----------
+        region: str : region where bounds occur
+
+        gdf: gpd.GeoDataFrame : the geodataframe to plot when no grid is given, its points
+             are put back into a grid of resolution, the last one created when None
+             (Default value = None)
+
+        grid: np.ndarray : 2d elevation grid
+             (Default value = None)
+
+        transform: tuple : gdal geotransform of the grid
+             (Default value = None)
+
+        nodata: float : value of the cells without data
+             (Default value = -9999)
+
+        resolution: float : cell size of the grid the points of gdf are put back into,
+                    needed when no grid is given
+             (Default value = None)
+        """
+        name = str(region).strip('/')
+        logger.info(f"saving plot as {name}.png")
+        with self.metrics.stage("save_png", region=region):
+            if grid is None:
+                if resolution is None:
+                    raise ValueError("save_plot needs the grid or the resolution of the geodataframe")
+                if gdf is None:
+                    gdf = self.gdf
+                grid, transform = points_to_grid(gdf.geometry.x.to_numpy(), gdf.geometry.y.to_numpy(),
+                                                 gdf["elevation"].to_numpy(), resolution, nodata)
+            save_quicklook(grid, abs(transform[1]), f"{name}.png", nodata, max_size=self.quicklook_size)
+
+            if self.tile_pyramid_dir is not None:
+                if int(self.crs) == 3857:
+                    tile_pyramid(grid, transform, os.path.join(self.tile_pyramid_dir, name), nodata)
+                else:
+                    logger.warning(f"web tiles need EPSG:3857 bounds, not EPSG:{self.crs}")
 
     def save_as_geojson(self, filename: str) -> None:
         """
@@ -191,7 +795,81 @@ class RasterGetter:
         self.gdf.to_file(filename, driver="GeoJSON")
         logger.info(f"GeoDataframe Elevation File Successfully Saved as {filename}")
 
-    def region_gdf_dict(self, saved_png: bool, resolution: int = 5) -> dict:
+    def save_as_geoparquet(self, filename: str) -> None:
+        """
+
+        saves the geopandas dataframe in the GeoParquet format, the points are encoded
+        straight from their coordinate arrays
+
+        Parameters
+        ----------
+        filename: str : what you want the parquet file saved as
+
+        Returns
+        -------
+
+        """
+        x, y, columns = self._point_columns()
+        points_to_geoparquet(x, y, columns, self.gdf.crs or self.crs, filename)
+        logger.info(f"GeoDataframe Elevation File Successfully Saved as {filename}")
+
+    def save_as_feather(self, filename: str) -> None:
+        """
+
+        saves the geopandas dataframe in the Feather (Arrow IPC) format
+
+        Parameters
+        ----------
+        filename: str : what you want the feather file saved as
+
+        Returns
+        -------
+
+        """
+        x, y, columns = self._point_columns()
+        points_to_feather(x, y, columns, self.gdf.crs or self.crs, filename)
+        logger.info(f"GeoDataframe Elevation File Successfully Saved as {filename}")
+
+    def save_as_flatgeobuf(self, filename: str, spatial_index: bool = True) -> None:
+        """
+
+        saves the geopandas dataframe in the FlatGeobuf format
+
+        Parameters
+        ----------
+        filename: str : what you want the fgb file saved as
+
+        spatial_index: bool : write a packed r-tree so readers can fetch only the points
+                       in a bounding box
+             (Default value = True)
+
+        Returns
+        -------
+
+        """
+        self.gdf.to_file(filename, driver="FlatGeobuf",
+                         SPATIAL_INDEX="YES" if spatial_index else "NO")
+        logger.info(f"GeoDataframe Elevation File Successfully Saved as {filename}")
+
+    def _point_columns(self) -> tuple:
+        """
+        returns the coordinates and the attribute columns of the geodataframe's points
+        as numpy arrays, the arrays of the grid when the geodataframe was made from one and
+        the coordinates of its geometries otherwise (e.g polygon centroids or a cached result)
+        """
+        if self._point_arrays is not None and self._point_arrays[0] is self.gdf:
+            _, x, y, columns = self._point_arrays
+            if set(columns) == set(self.gdf.columns) - {self.gdf.geometry.name}:
+                return x, y, columns
+        x = self.gdf.geometry.x.to_numpy()
+        y = self.gdf.geometry.y.to_numpy()
+        columns = {name: self.gdf[name].to_numpy() for name in self.gdf.columns
+                   if name != self.gdf.geometry.name}
+        return x, y, columns
+
+    def region_gdf_dict(self, saved_png: bool, resolution: int = 5, workers: int = 1,
+                        in_memory: bool = False, vectorize: str = "points",
+                        with_metrics: bool = False):
         """
 
         creates a dictionary where the keys are the regions or the years where
@@ -204,30 +882,243 @@ class RasterGetter:
         resolution: int : resolution of the geometric points
              (Default value = 5)
 
-        Returns: a dictionary of form {"year / region": geopandas.DataFrame}
+        workers: int : number of processes the regions are processed in, every region
+                 is fetched and converted in its own process when greater than 1
+             (Default value = 1)
+
+        in_memory: bool : grid the points in memory instead of writing and reading back
+                   laz, tif and shp files
+             (Default value = False)
+
+        vectorize: str : how the tif is turned into points, see get_geodataframe
+             (Default value = "points")
+
+        with_metrics: bool : also return the Metrics of this call
+             (Default value = False)
+
+        Returns: a dictionary of form {"year / region": geopandas.DataFrame}, or a tuple of
+                form (dictionary, Metrics) when with_metrics is set
         -------
 
         """
+        if with_metrics:
+            self.metrics = Metrics()
         region_gdf = {}
+        pending = []
         for region in self.regions:
-            year = region.split("_")[-1][:-1]
-            if not year.isdigit():
-                year = region
-            try:
-                print("\n")
-                self.get_raster_terrain(region)
-                gdf = self.get_geodataframe(region, saved_png, resolution)
-                region_gdf[year] = gdf
-            except RuntimeError as e:
-                logger.warning(e)
-                logger.info(f"Pipeline Process Could not be completed for region {region}")
-                if len(self.regions) > 1:
+            gdf = None
+            if self.result_cache is not None:
+                gdf = self.result_cache.get(self.result_request(region, resolution, in_memory, vectorize),
+                                            self.region_version(region),
+                                            files=self.region_outputs(region, in_memory))
+            if gdf is None:
+                pending.append(region)
+                continue
+            self.gdf = region_gdf[region] = gdf
+            if saved_png:
+                if not in_memory and os.path.exists(self.region_tif(region)):
+                    # the cached tif was copied back, it is the grid the geodataframe was made from
+                    grid, transform, nodata = read_raster(self.region_tif(region),
+                                                          self.pipeline_template.elevation_band())
+                    self.save_plot(region, gdf, grid, transform, nodata)
+                else:
+                    self.save_plot(region, gdf, nodata=self.pipeline_template.raster_options()["nodata"],
+                                   resolution=resolution)
+
+        if workers > 1 and len(pending) > 1:
+            computed = self._parallel_region_gdf_dict(pending, saved_png, resolution, workers,
+                                                      in_memory, vectorize)
+        else:
+            computed = {}
+            for region in pending:
+                try:
                     print("\n")
-                    logger.info("fecthing the next region")
+                    computed[region] = _process_region(self, region, saved_png, resolution,
+                                                       in_memory, vectorize)
+                except RuntimeError as e:
+                    logger.warning(e)
+                    logger.info(f"Pipeline Process Could not be completed for region {region}")
+                    if len(pending) > 1:
+                        print("\n")
+                        logger.info("fecthing the next region")
+
+        for region, gdf in computed.items():
+            region_gdf[region] = gdf
+            if self.result_cache is not None:
+                self.result_cache.put(self.result_request(region, resolution, in_memory, vectorize),
+                                      self.region_version(region), gdf,
+                                      files=self.region_outputs(region, in_memory))
+
+        result = {region_year(region): region_gdf[region] for region in self.regions
+                  if region in region_gdf}
+        if with_metrics:
+            self.metrics.log()
+            return result, self.metrics
+        return result
+
+    def _parallel_region_gdf_dict(self, regions: list, saved_png: bool, resolution: int,
+                                  workers: int, in_memory: bool, vectorize: str,
+                                  executor: Executor = None) -> dict:
+        """
+        runs get_raster_terrain and get_geodataframe for every region in a process pool,
+        a region that fails is logged and left out like in region_gdf_dict. Any exception of
+        a region's future is caught, not only the RuntimeError of pdal: a getter or result
+        that cannot be pickled, or a worker that died and broke the pool, only lose the
+        regions they affect
+
+        executor: Executor : executor the regions are submitted to, a process pool of
+                  workers processes when None
+             (Default value = None)
+
+        Returns: a dictionary of form {region: geopandas.DataFrame}
+        """
+        logger.info(f"Processing {len(regions)} regions in {workers} processes")
+        region_gdf = {}
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=min(workers, len(regions)))
+        try:
+            futures = {}
+            for region in regions:
+                try:
+                    futures[region] = executor.submit(_process_region_in_worker, self, region, saved_png,
+                                                      resolution, in_memory, vectorize)
+                except Exception as e:
+                    # e.g the pool broke while the regions were submitted
+                    logger.warning(f"{region} could not be submitted: {e!r}")
+            for region, future in futures.items():
+                try:
+                    self.gdf, metrics = future.result()
+                    # a thread pool hands back the getter's own metrics
+                    if metrics is not self.metrics:
+                        self.metrics.merge(metrics)
+                    region_gdf[region] = self.gdf
+                except Exception as e:
+                    logger.warning(f"{type(e).__name__}: {e}")
+                    logger.info(f"Pipeline Process Could not be completed for region {region}")
+        finally:
+            if own_executor:
+                executor.shutdown()
 
         return region_gdf
 
-    def tif_to_shp(self, tif_filename: str, shp_filename: str) -> None:
+    def result_request(self, region: str, resolution: int, in_memory: bool, vectorize: str) -> dict:
+        """
+        describes everything the geodataframe of a region depends on, used as the key of
+        the result cache
+
+        Returns: a json serializable dictionary
+        -------
+
+        """
+        template = self.pipeline_template
+        return {
+            "region": region,
+            "bounds": parse_bounds(self.bounds),
+            "crs": self.crs,
+            "resolution": resolution,
+            "in_memory": in_memory,
+            "vectorize": vectorize,
+            "flow_method": self.flow_method,
+            "point_reader": self.point_reader,
+            "point_filter": self.point_filter.describe() if self.point_filter is not None and in_memory
+            else None,
+            "pipeline": [stage for name, stage in template.points_template().stages()
+                         if name != "reader"],
+            "tif_writer": template.raster_options(),
+            # the files of the pdal run, the in memory path writes none of them
+            "tile_size": None if in_memory else self.tile_size,
+            "tile_overlap": None if in_memory or not self.tile_size else self.tile_overlap,
+            "las_writer": not in_memory and "las_writer" in template,
+            "cog_options": None if in_memory or self.cog_options is None else self.cog_options.creation_options()
+        }
+
+    def region_outputs(self, region: str, in_memory: bool) -> dict:
+        """
+        returns the files a run of the region writes besides the geodataframe, they are
+        kept with its result cache entry and copied back on a hit
+
+        Parameters
+        ----------
+        region: str : region where bounds occur
+
+        in_memory: bool : whether the region is gridded in memory, which writes no file
+
+        Returns: a dictionary of form {name: filename}
+        -------
+
+        """
+        if in_memory:
+            return {}
+        files = {"tif": self.region_tif(region)}
+        if "las_writer" in self.pipeline_template:
+            files["laz"] = self.region_laz(region)
+        if self.cog_options is not None:
+            for output_type in self.pipeline_template.bands():
+                files[f"cog_{output_type}"] = self.region_cog(region, output_type)
+        return files
+
+    def region_version(self, region: str) -> str:
+        """
+        returns a hash of the region's ept.json, it changes whenever the region's data does
+        """
+        return hashlib.sha256(self.catalog.info(region).raw.encode()).hexdigest()
+
+    def region_tif(self, region: str) -> str:
+        """
+        returns the name of the tif get_raster_terrain creates for the region
+        """
+        return self.path + f"/{str(region).strip('/')}.tif"
+
+    def region_laz(self, region: str) -> str:
+        """
+        returns the name of the las file get_raster_terrain creates for the region
+        """
+        return self.path + f"/{str(region).strip('/')}.laz"
+
+    def region_cog(self, region: str, output_type: str) -> str:
+        """
+        returns the name of the cloud optimized geotiff of an output type of the region
+        """
+        return self.path + f"/{str(region).strip('/')}_{output_type}.cog.tif"
+
+    def for_bounds(self, bounds: str, regions: list = None):
+        """
+        returns a shallow copy of the getter for other bounds, it shares the getter's
+        catalog, caches, pipeline template and metrics. copy.copy goes through __getstate__,
+        which is meant for worker processes and would query the regions and drop the metrics
+
+        Parameters
+        ----------
+        bounds: str : the bounds of the copy
+
+        regions: list : the regions of the bounds, found with the catalog on first use when None
+             (Default value = None)
+
+        Returns: a RasterGetter
+        -------
+
+        """
+        getter = self.__class__.__new__(self.__class__)
+        getter.__dict__.update(self.__dict__)
+        getter.bounds = bounds
+        getter._regions = regions
+        getter._point_arrays = None
+        return getter
+
+    def __getstate__(self) -> dict:
+        """
+        sends only the catalog entries of the getter's regions when the getter is sent to
+        a worker process, the workers only need the regions that were already found
+        """
+        state = self.__dict__.copy()
+        state["catalog"] = self.catalog.subset(self.regions)
+        # the worker's metrics are sent back and merged, it starts with none of its own
+        state["metrics"] = Metrics()
+        state["_point_arrays"] = None
+        return state
+
+    def tif_to_shp(self, tif_filename: str, shp_filename: str, band: int = 1) -> None:
         """
         Converts the pdal generated tif file into a shp file
 
@@ -237,6 +1128,9 @@ class RasterGetter:
 
         shp_filename: str : name of the shp file to be saved as
 
+        band: int : band of the tif that is polygonized
+             (Default value = 1)
+
         Returns
         -------
 
@@ -263,10 +1157,10 @@ class RasterGetter:
             exit()
 
         try:
-            srcband = ds.GetRasterBand(1)
+            srcband = ds.GetRasterBand(band)
         except RuntimeError as e:
             # for example, try GetRasterBand(10)
-            logger.error('Band ( %i ) not found' % 1)
+            logger.error('Band ( %i ) not found' % band)
             logger.error(e)
             exit()
 
@@ -0,0 +1,212 @@
+import math
+import numpy as np
+
+OUTPUT_TYPES = ("min", "max", "mean", "idw", "count")
+
+def grid_shape(box: tuple, resolution: float) -> tuple:
+    """
+    returns the (rows, columns) of a grid of cells of size resolution covering box
+
+    Parameters
+    ----------
+    box: tuple : a (xmin, ymin, xmax, ymax) tuple
+
+    resolution: float : cell size
+
+    Returns: a tuple of form (rows, columns)
+    -------
+
+    """
+    xmin, ymin, xmax, ymax = box
+    columns = max(1, int(math.ceil(round((xmax - xmin) / resolution, 6))))
+    rows = max(1, int(math.ceil(round((ymax - ymin) / resolution, 6))))
+    return rows, columns
+
+def geotransform(box: tuple, resolution: float) -> tuple:
+    """
+    returns the gdal geotransform of the grid covering box, the first row of the grid is
+    its northern edge
+
+    Parameters
+    ----------
+    box: tuple : a (xmin, ymin, xmax, ymax) tuple
+
+    resolution: float : cell size
+
+    Returns: a tuple of form (xmin, resolution, 0, ymax, 0, -resolution)
+    -------
+
+    """
+    rows, columns = grid_shape(box, resolution)
+    return (box[0], resolution, 0.0, box[1] + rows * resolution, 0.0, -resolution)
+
+def grid_elevation(x: np.ndarray, y: np.ndarray, z: np.ndarray, box: tuple, resolution: float,
+                   output_type: str = "idw", nodata: float = -9999, radius: float = None,
+                   power: float = 1.0, window_size: int = 0) -> tuple:
+    """
+    grids point elevations into a raster like pdal's writers.gdal does, without writing
+    anything to disk
+
+    Parameters
+    ----------
+    x: np.ndarray : x coordinates of the points
+
+    y: np.ndarray : y coordinates of the points
+
+    z: np.ndarray : elevations of the points
+
+    box: tuple : (xmin, ymin, xmax, ymax) extent of the grid
+
+    resolution: float : cell size
+
+    output_type: str : one of "min", "max", "mean", "idw" or "count"
+         (Default value = "idw")
+
+    nodata: float : value of the cells no point falls in
+         (Default value = -9999)
+
+    radius: float : distance from a cell's center within which points are used by "idw",
+            defaults to resolution * sqrt(2) like writers.gdal
+         (Default value = None)
+
+    power: float : exponent of the distance in the idw weights
+         (Default value = 1.0)
+
+    window_size: int : empty cells are filled with the inverse distance weighted mean of
+                 the filled cells at most this many cells away, 0 disables the fill
+         (Default value = 0)
+
+    Returns: a tuple of form (grid, geotransform), grid being a 2d float64 array whose first
+            row is the northern edge of box
+    -------
+
+    """
+    if output_type not in OUTPUT_TYPES:
+        raise ValueError(f"Unrecognised output_type {output_type}, expected one of {OUTPUT_TYPES}")
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    z = np.asarray(z, dtype=np.float64)
+    transform = geotransform(box, resolution)
+    rows, columns = grid_shape(box, resolution)
+    size = rows * columns
+
+    # column and row of every point, rows counted from the northern edge
+    column = np.floor((x - transform[0]) / resolution).astype(np.int64)
+    row = np.floor((transform[3] - y) / resolution).astype(np.int64)
+
+    if output_type == "idw":
+        radius = resolution * math.sqrt(2) if radius is None else radius
+        reach = int(math.ceil(radius / resolution))
+        weights = np.zeros(size)
+        values = np.zeros(size)
+        exact = np.full(size, np.nan)
+        for row_offset in range(-reach, reach + 1):
+            for column_offset in range(-reach, reach + 1):
+                r = row + row_offset
+                c = column + column_offset
+                inside = (r >= 0) & (r < rows) & (c >= 0) & (c < columns)
+                cell = r[inside] * columns + c[inside]
+                center_x = transform[0] + (c[inside] + 0.5) * resolution
+                center_y = transform[3] - (r[inside] + 0.5) * resolution
+                distance = np.hypot(x[inside] - center_x, y[inside] - center_y)
+                near = distance <= radius
+                on_center = near & (distance == 0)
+                exact[cell[on_center]] = z[inside][on_center]
+                near &= distance > 0
+                w = 1.0 / distance[near] ** power
+                weights += np.bincount(cell[near], weights=w, minlength=size)
+                values += np.bincount(cell[near], weights=w * z[inside][near], minlength=size)
+        grid = np.full(size, float(nodata))
+        np.divide(values, weights, out=grid, where=weights > 0)
+        has_exact = ~np.isnan(exact)
+        grid[has_exact] = exact[has_exact]
+    else:
+        inside = (row >= 0) & (row < rows) & (column >= 0) & (column < columns)
+        cell = row[inside] * columns + column[inside]
+        values = z[inside]
+        count = np.bincount(cell, minlength=size)
+        grid = np.full(size, float(nodata))
+        filled = count > 0
+        if output_type == "count":
+            grid = count.astype(np.float64)
+        elif output_type == "mean":
+            grid[filled] = np.bincount(cell, weights=values, minlength=size)[filled] / count[filled]
+        elif output_type == "min":
+            lowest = np.full(size, np.inf)
+            np.minimum.at(lowest, cell, values)
+            grid[filled] = lowest[filled]
+        else:
+            highest = np.full(size, -np.inf)
+            np.maximum.at(highest, cell, values)
+            grid[filled] = highest[filled]
+
+    grid = grid.reshape(rows, columns)
+    if window_size and output_type != "count":
+        grid = fill_window(grid, nodata, window_size)
+
+    return grid, transform
+
+def fill_window(grid: np.ndarray, nodata: float, window_size: int) -> np.ndarray:
+    """
+    fills the empty cells of a grid with the inverse distance weighted mean of the filled
+    cells at most window_size cells away
+
+    Parameters
+    ----------
+    grid: np.ndarray : a 2d grid
+
+    nodata: float : value of the empty cells
+
+    window_size: int : how many cells away donor cells may be
+
+    Returns: a new grid with the empty cells that have donors filled
+    -------
+
+    """
+    rows, columns = grid.shape
+    filled = grid != nodata
+    padded = np.pad(np.where(filled, grid, 0.0), window_size)
+    padded_filled = np.pad(filled, window_size)
+    weights = np.zeros(grid.shape)
+    values = np.zeros(grid.shape)
+
+    for row_offset in range(-window_size, window_size + 1):
+        for column_offset in range(-window_size, window_size + 1):
+            if row_offset == 0 and column_offset == 0:
+                continue
+            r = slice(window_size + row_offset, window_size + row_offset + rows)
+            c = slice(window_size + column_offset, window_size + column_offset + columns)
+            w = padded_filled[r, c] / math.hypot(row_offset, column_offset)
+            weights += w
+            values += w * padded[r, c]
+
+    result = grid.copy()
+    fill = ~filled & (weights > 0)
+    result[fill] = values[fill] / weights[fill]
+    return result
+
+def grid_to_points(grid: np.ndarray, transform: tuple, nodata: float = -9999) -> tuple:
+    """
+    returns the coordinates of the centers of a grid's filled cells and their values
+
+    Parameters
+    ----------
+    grid: np.ndarray : a 2d grid
+
+    transform: tuple : the gdal geotransform of the grid
+
+    nodata: float : value of the empty cells
+         (Default value = -9999)
+
+    Returns: a tuple of form (x, y, values) of 1d arrays
+    -------
+
+    """
+    valid = grid != nodata
+    if nodata is not None and np.isnan(nodata):
+        valid = ~np.isnan(grid)
+    row, column = np.nonzero(valid)
+    x = transform[0] + (column + 0.5) * transform[1] + (row + 0.5) * transform[2]
+    y = transform[3] + (column + 0.5) * transform[4] + (row + 0.5) * transform[5]
+    return x, y, grid[row, column]
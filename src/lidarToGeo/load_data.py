@@ -1,16 +1,36 @@
 import json
 import boto3
+import random
 import asyncio
-from aiohttp import ClientSession
+import threading
+from aiohttp import ClientSession, ClientTimeout, ClientError, TCPConnector
 from src.lidarToGeo.ept_info import Info
+from src.lidarToGeo.catalog_cache import CatalogCache
 from src.lidarToGeo.logger import setup_logger
 
 logger = setup_logger("load_data")
 
-s3 = boto3.client("s3")
 bucket = "usgs-lidar-public"
 bucket_url = "https://s3-us-west-2.amazonaws.com/usgs-lidar-public/"
 
+# the s3 client is only created once the bucket has to be listed
+_s3 = None
+_s3_lock = threading.Lock()
+
+def get_s3_client() -> boto3.client:
+    """
+    returns the module's s3 boto3 client, creating it on the first call
+
+    Returns : an s3 boto3 client
+    -------
+
+    """
+    global _s3
+    with _s3_lock:
+        if _s3 is None:
+            _s3 = boto3.client("s3")
+        return _s3
+
 def list_folders(s3_client: boto3.client, bucket_name: str):
     """
     This function takes an s3 boto3 client and the a s3 bucket's name and
@@ -34,46 +54,308 @@ def list_folders(s3_client: boto3.client, bucket_name: str):
         for content in page.get("CommonPrefixes", []):
             yield content.get('Prefix')
 
-async def fetch(region, url, session) -> tuple:
-    async with session.get(url) as response:
-        return (region, await response.read())
+def ept_json_url(region: str) -> str:
+    """
+    returns the url of a region's ept.json, a couple of regions in the bucket store
+    it under a different name
+
+    Parameters
+    ----------
+    region: str : the region's folder name in the bucket
+
+    Returns : the url of the region's ept.json
+    -------
+
+    """
+    if region == "USGS_LPC_WA_Western_North_2016_LAS_2018/" or \
+            region == "USGS_LPC_WA_Western_South_2016_LAS_2018/":
+        return bucket_url + region + "ept-1.json"
+    return bucket_url + region + "ept.json"
+
+def entry_to_info(entry: dict) -> Info:
+    """
+    creates the Info object of a catalog cache entry, the json is only parsed if the
+    entry does not already have the summary Info keeps eagerly, which is then stored
+    in the entry
+
+    Parameters
+    ----------
+    entry: dict : a catalog cache entry
+
+    Returns : an Info object
+    -------
+
+    """
+    if "summary" in entry:
+        return Info(entry["ept"], **entry["summary"])
+    info = Info(entry["ept"])
+    entry["summary"] = info.summary()
+    return info
+
+class FetchConfig(object):
+    """
+    settings of the engine that downloads the ept.json files
+
+    Parameters
+    ----------
+    concurrency: int : maximum number of requests in flight at once
+         (Default value = 64)
+
+    limit_per_host: int : maximum number of open connections to the bucket's host,
+                    0 means no limit besides concurrency
+         (Default value = 0)
+
+    timeout: float : seconds a single request may take before it is retried
+         (Default value = 30)
+
+    retries: int : number of times a request that timed out or failed with a 5xx / 429
+             status is retried
+         (Default value = 4)
+
+    backoff: float : seconds waited before the first retry, doubled on every retry
+         (Default value = 0.5)
+    """
+    def __init__(self, concurrency: int = 64, limit_per_host: int = 0, timeout: float = 30,
+                 retries: int = 4, backoff: float = 0.5) -> None:
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        if retries < 0:
+            raise ValueError(f"retries must not be negative, got {retries}")
+        self.concurrency = concurrency
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+class RetryableStatus(Exception):
+    """
+    raised when the bucket answers with a status worth retrying (5xx or 429)
+    """
+
+async def fetch(region, url, session, cached=None, semaphore=None, config=None, failed=None) -> tuple:
+    """
+    fetches a region's ept.json, when a cached entry is passed in the request is made
+    conditional on its ETag / Last-Modified so unchanged files are not downloaded again
+
+    requests that time out or fail with a 5xx / 429 status are retried with an exponential
+    backoff, if every attempt fails the cached entry (if any) is kept and the region is
+    added to failed
+
+    Parameters
+    ----------
+    region: str : the region's folder name in the bucket
+
+    url: str : url of the region's ept.json
 
-async def run() -> list:
-    regions = list_folders(s3, bucket)
-    region_info = []
-    async with ClientSession() as session:
+    session: aiohttp.ClientSession : session used to make the request
+
+    cached: dict : the region's entry in the catalog cache
+         (Default value = None)
+
+    semaphore: asyncio.Semaphore : bounds the number of requests in flight
+         (Default value = None)
+
+    config: FetchConfig : retry and timeout settings
+         (Default value = None)
+
+    failed: set : the regions whose every attempt failed are added to it
+         (Default value = None)
+
+    Returns : a tuple of form (region, entry) where entry is a catalog cache entry or None
+            if the file could not be fetched
+    -------
+
+    """
+    config = config or FetchConfig()
+    semaphore = semaphore or asyncio.Semaphore(config.concurrency)
+    headers = {}
+    if cached is not None:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    for attempt in range(config.retries + 1):
+        try:
+            async with semaphore:
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 304:
+                        return (region, cached)
+                    if response.status >= 500 or response.status == 429:
+                        raise RetryableStatus(f"status {response.status}")
+                    if response.status != 200:
+                        logger.warning(f"could not fetch {url}: status {response.status}")
+                        return (region, None)
+                    return (region, {
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                        "ept": (await response.read()).decode()
+                    })
+        except (asyncio.TimeoutError, ClientError, RetryableStatus) as e:
+            if attempt == config.retries:
+                logger.warning(f"giving up on {url} after {attempt + 1} attempts: {e!r}")
+                if failed is not None:
+                    failed.add(region)
+                return (region, cached)
+            await asyncio.sleep(config.backoff * 2 ** attempt * (1 + random.random()))
+
+async def run(cached_regions: dict = None, config: FetchConfig = None, stats: dict = None) -> tuple:
+    """
+    fetches the ept.json of every region in the bucket with a bounded number of requests
+    in flight, each file is parsed into an Info object as soon as its response arrives
+
+    Parameters
+    ----------
+    cached_regions: dict : regions already in the catalog cache, only the regions
+                    that changed since they were cached are downloaded
+         (Default value = None)
+
+    config: FetchConfig : concurrency, timeout and retry settings
+         (Default value = None)
+
+    stats: dict : the number of ept.json files downloaded ("files_fetched") and their size
+           ("bytes_fetched") are added to it, the unchanged cached ones are not counted
+         (Default value = None)
+
+    Returns : a tuple of form ({region: catalog cache entry}, {region: Info}, failed) where
+            failed is the set of regions that could not be fetched because of timeouts or
+            server errors, they are worth fetching again later
+    -------
+
+    """
+    cached_regions = cached_regions or {}
+    config = config or FetchConfig()
+    # listing the bucket is blocking boto3 calls, they are run in the loop's executor
+    loop = asyncio.get_running_loop()
+    regions = await loop.run_in_executor(None, lambda: list(list_folders(get_s3_client(), bucket)))
+    semaphore = asyncio.Semaphore(config.concurrency)
+    connector = TCPConnector(limit=config.concurrency, limit_per_host=config.limit_per_host,
+                             ttl_dns_cache=300)
+    timeout = ClientTimeout(total=config.timeout)
+    entries = {}
+    region_ept_info = {}
+    failed = set()
+    stats = {} if stats is None else stats
+    stats.setdefault("files_fetched", 0)
+    stats.setdefault("bytes_fetched", 0)
+
+    async with ClientSession(connector=connector, timeout=timeout) as session:
         logger.info(f"loading the ept.json files from {bucket}")
-        for region in regions:
-            if region == "USGS_LPC_WA_Western_North_2016_LAS_2018/" or \
-                    region == "USGS_LPC_WA_Western_South_2016_LAS_2018/":
-                ept_json_path = bucket_url + region + "ept-1.json"
-            else:
-                ept_json_path = bucket_url + region + "ept.json"
-            ept_region_info = asyncio.ensure_future(fetch(region, ept_json_path, session))
-            region_info.append(ept_region_info)
+        region_info = [fetch(region, ept_json_url(region), session, cached_regions.get(region),
+                             semaphore, config, failed) for region in regions]
 
-        response = await asyncio.gather(*region_info)
+        for ept_region_info in asyncio.as_completed(region_info):
+            region, entry = await ept_region_info
+            if entry is None:
+                continue
+            if entry is not cached_regions.get(region):
+                stats["files_fetched"] += 1
+                stats["bytes_fetched"] += len(entry["ept"].encode())
+            try:
+                region_ept_info[region] = entry_to_info(entry)
+            except (json.decoder.JSONDecodeError, KeyError) as e:
+                logger.warning(f"could not parse the ept.json of {region}")
+                continue
+            entries[region] = entry
 
-    return region_info
+    # responses arrive in any order, keep the catalog in the bucket's listing order
+    entries = {region: entries[region] for region in regions if region in entries}
+    region_ept_info = {region: region_ept_info[region] for region in regions
+                       if region in region_ept_info}
+    return entries, region_ept_info, failed
 
-def load_ept_json() -> dict:
+def load_ept_json(use_cache: bool = True, refresh: bool = False,
+                  cache: CatalogCache = None, config: FetchConfig = None, stats: dict = None) -> dict:
     """
     calls the asynchronous functions that get all the ept.json files in the usgs-lidar-public bucket
     and passes the result into the Info class so that we can get the data readily
 
+    the ept.json files are kept in a local catalog cache, while the cache is younger than its
+    ttl the catalog is read from disk, once it expires (or refresh is set) only the regions
+    whose ETag / Last-Modified changed are downloaded again
+
+    this function runs its own event loop, use load_ept_json_async from code that is already
+    running in one
+
+    Parameters
+    ----------
+    use_cache: bool : read and update the local catalog cache
+         (Default value = True)
+
+    refresh: bool : revalidate the cached catalog against the bucket even if it is fresh
+         (Default value = False)
+
+    cache: CatalogCache : cache to use instead of the default one for the bucket
+         (Default value = None)
+
+    config: FetchConfig : concurrency, timeout and retry settings of the download
+         (Default value = None)
+
+    stats: dict : the number of ept.json files downloaded and their size are added to it,
+           see run
+         (Default value = None)
 
     Returns : a dictionary
     """
-    loop = asyncio.get_event_loop()
-    future = asyncio.ensure_future(run())
-    regions = loop.run_until_complete(future)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(load_ept_json_async(use_cache, refresh, cache, config, stats))
+    raise RuntimeError("load_ept_json cannot be called from a running event loop, "
+                       "await load_ept_json_async instead")
 
-    region_ept_info = {}
+async def load_ept_json_async(use_cache: bool = True, refresh: bool = False,
+                              cache: CatalogCache = None, config: FetchConfig = None,
+                              stats: dict = None) -> dict:
+    """
+    loads the catalog like load_ept_json in the caller's event loop, the blocking cache
+    reads and writes are run in the loop's executor
 
-    for i in range(len(regions)):
-        try:
-            region_ept_info[regions[i].result()[0]] = Info(regions[i].result()[1].decode())
-        except json.decoder.JSONDecodeError as e:
-            print(regions[i].result()[0])
+    Parameters
+    ----------
+    use_cache: bool : read and update the local catalog cache
+         (Default value = True)
+
+    refresh: bool : revalidate the cached catalog against the bucket even if it is fresh
+         (Default value = False)
+
+    cache: CatalogCache : cache to use instead of the default one for the bucket
+         (Default value = None)
+
+    config: FetchConfig : concurrency, timeout and retry settings of the download
+         (Default value = None)
+
+    stats: dict : the number of ept.json files downloaded and their size are added to it,
+           see run
+         (Default value = None)
+
+    Returns : a dictionary of form {region: Info}
+    """
+    if cache is None:
+        cache = CatalogCache(bucket)
+    loop = asyncio.get_running_loop()
+
+    if use_cache:
+        catalog = await loop.run_in_executor(None, cache.read)
+    else:
+        catalog = {"updated": 0, "regions": {}}
+    if use_cache and not refresh and cache.is_fresh(catalog):
+        logger.info(f"loading the ept.json files from the catalog cache {cache.filename}")
+        region_ept_info = {}
+        for region, entry in catalog["regions"].items():
+            try:
+                region_ept_info[region] = entry_to_info(entry)
+            except (json.decoder.JSONDecodeError, KeyError) as e:
+                logger.warning(f"could not parse the ept.json of {region}")
+        return region_ept_info
+
+    entries, region_ept_info, failed = await run(catalog["regions"], config, stats)
+    if failed:
+        logger.warning(f"{len(failed)} regions could not be fetched, they are fetched again on "
+                       "the next load")
+    if use_cache:
+        # a partial catalog is saved as already expired so the next load revalidates it
+        # instead of hiding the failed regions for the whole ttl
+        await loop.run_in_executor(None, cache.write, entries, not failed)
 
-    return(region_ept_info)
+    return region_ept_info
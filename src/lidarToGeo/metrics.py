@@ -0,0 +1,227 @@
+import os
+import time
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from src.lidarToGeo.logger import setup_logger
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+logger = setup_logger("metrics")
+
+def peak_memory() -> int:
+    """
+    returns the peak resident memory of the process in bytes, 0 where it is not available
+    """
+    if resource is None:
+        return 0
+    # ru_maxrss is in kilobytes on linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def escape_label(value) -> str:
+    """
+    escapes the backslashes, double quotes and line feeds of a prometheus label value
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Metrics(object):
+    """
+    collects the wall and cpu time and the peak memory of every stage of a run, counters
+    such as the points read and the bytes fetched, and the metadata and log of the pdal
+    pipelines that were executed.
+
+    the cpu time is the one of the thread that ran the stage, the peak memory is the high
+    water mark of the process at the end of the stage. A Metrics object can be shared by
+    threads, and the metrics of worker processes are added with merge
+
+    bytes_fetched counts the downloads made in python: the ept.json files of the catalog
+    and the hierarchy and node files of the native reader. pdal does not report what its
+    readers download, the reads of both readers add the size of the decoded points to
+    bytes_read instead
+    """
+    def __init__(self) -> None:
+        self.stages = []
+        self.counters = {}
+        # {name of the pipeline: {"metadata": ..., "log": ...}}
+        self.pipelines = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, **labels):
+        """
+        measures the code run inside the with block as a stage
+
+        Parameters
+        ----------
+        name: str : name of the stage, e.g "pdal_execute"
+
+        labels : extra information kept with the stage, e.g region="IA_FullState/"
+        """
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            record = dict(labels, stage=name, wall=time.perf_counter() - wall,
+                          cpu=time.thread_time() - cpu, peak_memory=peak_memory())
+            with self._lock:
+                self.stages.append(record)
+            logger.debug(f"{name} took {record['wall']:.3f}s wall, {record['cpu']:.3f}s cpu")
+
+    def add(self, counter: str, value: float) -> None:
+        """
+        adds value to a counter
+
+        Parameters
+        ----------
+        counter: str : name of the counter, e.g "points_read"
+
+        value: float : amount to add
+        """
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def record_pipeline(self, name: str, metadata, log: str) -> None:
+        """
+        keeps the metadata and log of an executed pdal pipeline
+
+        Parameters
+        ----------
+        name: str : name of the pipeline, e.g the region
+
+        metadata : the pipeline's metadata
+
+        log: str : the pipeline's log
+        """
+        with self._lock:
+            self.pipelines[name] = {"metadata": metadata, "log": log}
+
+    def merge(self, other) -> None:
+        """
+        adds the stages, counters and pipelines of another Metrics object, e.g one filled
+        in a worker process
+        """
+        with self._lock:
+            self.stages.extend(other.stages)
+            for counter, value in other.counters.items():
+                self.counters[counter] = self.counters.get(counter, 0) + value
+            self.pipelines.update(other.pipelines)
+
+    def summary(self) -> dict:
+        """
+        aggregates the stages by name
+
+        Returns: a dictionary of form {stage: {"count", "wall", "cpu", "peak_memory"}}
+        -------
+
+        """
+        summary = {}
+        with self._lock:
+            stages = list(self.stages)
+        for record in stages:
+            total = summary.setdefault(record["stage"], {"count": 0, "wall": 0.0, "cpu": 0.0,
+                                                         "peak_memory": 0})
+            total["count"] += 1
+            total["wall"] += record["wall"]
+            total["cpu"] += record["cpu"]
+            total["peak_memory"] = max(total["peak_memory"], record["peak_memory"])
+        return summary
+
+    def to_dict(self) -> dict:
+        """
+        returns the stages, their summary and the counters as a json serializable dictionary
+        """
+        with self._lock:
+            stages = [dict(record) for record in self.stages]
+            counters = dict(self.counters)
+        return {"stages": stages, "summary": self.summary(), "counters": counters}
+
+    def log(self, to: logging.Logger = logger, level: int = logging.INFO) -> None:
+        """
+        logs the summary of every stage and the counters
+
+        Parameters
+        ----------
+        to: logging.Logger : the logger to log to
+             (Default value = the metrics logger)
+
+        level: int : level of the messages
+             (Default value = logging.INFO)
+        """
+        for name, total in self.summary().items():
+            to.log(level, f"{name}: {total['count']} runs, {total['wall']:.3f}s wall, "
+                          f"{total['cpu']:.3f}s cpu, peak memory {total['peak_memory'] / 2 ** 20:.1f} MiB")
+        for counter, value in sorted(self.counters.items()):
+            to.log(level, f"{counter}: {value}")
+
+    def to_prometheus(self, prefix: str = "lidartogeo") -> str:
+        """
+        formats the summary and the counters in the prometheus text exposition format
+
+        Parameters
+        ----------
+        prefix: str : prefix of the metric names
+             (Default value = "lidartogeo")
+
+        Returns: the metrics as a string
+        -------
+
+        """
+        summary = self.summary()
+        lines = []
+        for metric, key, help_text in (
+                ("stage_runs_total", "count", "number of times the stage ran"),
+                ("stage_wall_seconds_total", "wall", "wall time spent in the stage"),
+                ("stage_cpu_seconds_total", "cpu", "cpu time spent in the stage"),
+                ("stage_peak_memory_bytes", "peak_memory", "peak resident memory after the stage")):
+            name = f"{prefix}_{metric}"
+            kind = "gauge" if key == "peak_memory" else "counter"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for stage, total in sorted(summary.items()):
+                lines.append(f'{name}{{stage="{escape_label(stage)}"}} {total[key]}')
+        with self._lock:
+            counters = sorted(self.counters.items())
+        for counter, value in counters:
+            name = f"{prefix}_{counter}_total"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, filename: str, prefix: str = "lidartogeo") -> None:
+        """
+        writes the metrics to a file read by the node exporter's textfile collector, the file
+        is replaced atomically so the collector never reads a partial file
+
+        Parameters
+        ----------
+        filename: str : name of the .prom file
+
+        prefix: str : prefix of the metric names
+             (Default value = "lidartogeo")
+        """
+        directory = os.path.dirname(os.path.abspath(filename))
+        fd, tmp_filename = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as prom_file:
+                prom_file.write(self.to_prometheus(prefix))
+            # mkstemp creates the file readable by its owner only, the collector may run as
+            # another user
+            os.chmod(tmp_filename, 0o644)
+            os.replace(tmp_filename, filename)
+        except BaseException:
+            os.remove(tmp_filename)
+            raise
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
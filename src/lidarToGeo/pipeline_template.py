@@ -0,0 +1,410 @@
+import json
+import functools
+
+# output types of writers.gdal, "tin" is rendered as a delaunay triangulation instead
+GDAL_OUTPUT_TYPES = ("min", "max", "mean", "idw", "count", "stdev", "all")
+OUTPUT_TYPES = GDAL_OUTPUT_TYPES + ("tin",)
+
+# order of the bands writers.gdal writes when it is given several output types, whatever
+# order they are listed in
+GDAL_BANDS = ("min", "max", "mean", "idw", "count", "stdev")
+
+# stages that write or rasterize the points, every stage before them filters the points
+OUTPUT_STAGES = ("crop", "las_writer", "delaunay", "faceraster", "tif_writer")
+
+class PipelineTemplate(object):
+    """
+    an immutable pdal pipeline made of named stages.
+
+    the options that change from call to call (bounds, file names, srs) are bound when the
+    pipeline is rendered with bind, the template itself is never modified: with_options,
+    with_stage, without and with_output_type return new templates. Templates can therefore
+    be shared by any number of threads, and the rendered and validated json of a template
+    and its bound options is cached
+    """
+    def __init__(self, stages: list) -> None:
+        # tuple of (name, stage as json) pairs, which keeps the template hashable
+        self._stages = tuple((name, json.dumps(stage, sort_keys=True)) for name, stage in stages)
+        validate_stages(self.stages())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names()
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PipelineTemplate) and self._stages == other._stages
+
+    def __hash__(self) -> int:
+        return hash(self._stages)
+
+    def names(self) -> list:
+        """
+        returns the names of the stages in pipeline order
+        """
+        return [name for name, _ in self._stages]
+
+    def stages(self) -> list:
+        """
+        returns a copy of the stages as a list of (name, stage dictionary) pairs
+        """
+        return [(name, json.loads(stage)) for name, stage in self._stages]
+
+    def stage(self, name: str) -> dict:
+        """
+        returns a copy of a stage
+
+        Parameters
+        ----------
+        name: str : the stage's name
+
+        Returns: the stage's dictionary
+        -------
+
+        """
+        for stage_name, stage in self._stages:
+            if stage_name == name:
+                return json.loads(stage)
+        raise KeyError(f"the pipeline has no stage {name}")
+
+    def with_options(self, name: str, **options):
+        """
+        returns a template with options of a stage changed
+
+        Parameters
+        ----------
+        name: str : the stage's name
+
+        options : the options to set
+
+        Returns: a PipelineTemplate
+        -------
+
+        """
+        stage = self.stage(name)
+        stage.update(options)
+        return self.with_stage(name, stage)
+
+    def with_stage(self, name: str, stage: dict, before: str = None):
+        """
+        returns a template with a stage replaced, or added if there is no stage of that name
+
+        Parameters
+        ----------
+        name: str : the stage's name
+
+        stage: dict : the pdal stage
+
+        before: str : name of the stage a new stage is inserted before, a new stage is
+                appended when None
+             (Default value = None)
+
+        Returns: a PipelineTemplate
+        -------
+
+        """
+        stages = self.stages()
+        names = self.names()
+        if name in names:
+            stages[names.index(name)] = (name, stage)
+        elif before is None:
+            stages.append((name, stage))
+        else:
+            stages.insert(names.index(before), (name, stage))
+        return PipelineTemplate(stages)
+
+    def without(self, name: str):
+        """
+        returns a template without a stage, the stages that read from it read from the
+        removed stage's inputs instead
+
+        Parameters
+        ----------
+        name: str : the stage's name
+
+        Returns: a PipelineTemplate
+        -------
+
+        """
+        stages = self.stages()
+        position = self.names().index(name)
+        removed = stages.pop(position)[1]
+        if "tag" in removed:
+            inputs = removed.get("inputs")
+            if inputs is None:
+                inputs = [stage["tag"] for _, stage in stages[position - 1:position] if "tag" in stage]
+            for _, stage in stages:
+                if removed["tag"] in stage.get("inputs", []):
+                    position = stage["inputs"].index(removed["tag"])
+                    stage["inputs"][position:position + 1] = inputs
+                    if not stage["inputs"]:
+                        del stage["inputs"]
+        return PipelineTemplate(stages)
+
+    def with_output_type(self, output_type: str):
+        """
+        returns a template whose tif is interpolated with output_type, "tin" replaces
+        writers.gdal with a delaunay triangulation rasterized by filters.faceraster
+
+        Parameters
+        ----------
+        output_type: str : one of OUTPUT_TYPES, or a comma separated list of
+                     GDAL_OUTPUT_TYPES written as the bands of one tif in a single pass
+
+        Returns: a PipelineTemplate
+        -------
+
+        """
+        if output_type != "tin":
+            output_type = ",".join(output_types(output_type))
+
+        writer = self.stage("tif_writer")
+        grid = self.stage(self.grid_stage())
+        inputs = self.stage("delaunay").get("inputs") if "delaunay" in self else writer.get("inputs")
+        template = self
+        for name in ("delaunay", "faceraster"):
+            if name in template:
+                template = template.without(name)
+
+        grid_options = {key: grid[key] for key in ("resolution", "nodata", "origin_x", "origin_y",
+                                                    "width", "height") if key in grid}
+        if output_type == "tin":
+            delaunay = {"type": "filters.delaunay", "tag": "delaunay"}
+            faceraster = dict(grid_options, type="filters.faceraster", tag="faceraster",
+                              inputs=["delaunay"])
+            tif_writer = {"type": "writers.raster", "filename": writer["filename"],
+                          "gdalopts": writer.get("gdalopts", ""), "inputs": ["faceraster"]}
+            if inputs:
+                delaunay["inputs"] = inputs
+            template = template.with_stage("delaunay", delaunay, before="tif_writer")
+            template = template.with_stage("faceraster", faceraster, before="tif_writer")
+        else:
+            tif_writer = dict(grid_options, type="writers.gdal", filename=writer["filename"],
+                              gdalopts=writer.get("gdalopts", ""), output_type=output_type,
+                              window_size=grid.get("window_size", 0))
+            if inputs:
+                tif_writer["inputs"] = inputs
+        return template.with_stage("tif_writer", tif_writer)
+
+    def grid_stage(self) -> str:
+        """
+        returns the name of the stage that holds the resolution and extent of the tif
+        """
+        return "faceraster" if "faceraster" in self else "tif_writer"
+
+    def bands(self) -> list:
+        """
+        returns the output type of every band of the tif, in band order
+        """
+        output_type = self.raster_options()["output_type"]
+        return ["tin"] if output_type == "tin" else output_types(output_type)
+
+    def elevation_band(self) -> int:
+        """
+        returns the number of the tif's band the elevation of the geodataframe is read from,
+        see elevation_type
+        """
+        bands = self.bands()
+        return bands.index(elevation_type(",".join(bands))) + 1
+
+    def raster_options(self) -> dict:
+        """
+        returns the output_type, resolution, nodata and window_size of the tif
+
+        Returns: a dictionary
+        -------
+
+        """
+        grid = self.stage(self.grid_stage())
+        return {
+            "output_type": grid.get("output_type", "tin"),
+            "resolution": grid["resolution"],
+            "nodata": grid.get("nodata", -9999),
+            "window_size": grid.get("window_size", 0)
+        }
+
+    def points_tag(self) -> str:
+        """
+        returns the tag of the last stage that filters the points, the writers read from it
+        """
+        tag = None
+        for name, stage in self.stages():
+            if name in OUTPUT_STAGES:
+                break
+            tag = stage.get("tag", tag)
+        return tag
+
+    def points_template(self):
+        """
+        returns a template with only the stages that read and filter the points
+        """
+        return PipelineTemplate([(name, stage) for name, stage in self.stages()
+                                 if name not in OUTPUT_STAGES])
+
+    def bind(self, params: dict, source_srs: str = None) -> str:
+        """
+        renders the pipeline with the options of the call
+
+        Parameters
+        ----------
+        params: dict : a dictionary of form {stage name: {option: value}}, the options of
+                stages the template does not have are ignored so optional stages can be
+                left out of a template without changing the caller
+
+        source_srs: str : srs of the points the reader returns, e.g the srs_id of the
+                    region's ept Info, see without_noop_reprojection
+             (Default value = None)
+
+        Returns: the pipeline as a json string
+        -------
+
+        """
+        return render(self.without_noop_reprojection(params, source_srs), json.dumps(params, sort_keys=True))
+
+    def without_noop_reprojection(self, params: dict, source_srs: str = None):
+        """
+        returns the template without its filters.reprojection stages that would leave the
+        points unchanged once params are bound, i.e whose in_srs and out_srs are both the srs
+        the reader returns the points in. A stage whose in_srs and out_srs are the same but
+        differ from the reader's srs still assigns that srs to the points and the files, so it
+        is kept, as is every stage when the reader's srs is unknown
+
+        Parameters
+        ----------
+        params: dict : the options of the call, see bind
+
+        source_srs: str : srs of the points the reader returns, nothing is dropped when None
+             (Default value = None)
+
+        Returns: a PipelineTemplate
+        -------
+
+        """
+        template = self
+        if source_srs is None:
+            return template
+        for name, stage in self.stages():
+            stage.update(params.get(name, {}))
+            if stage["type"] == "filters.reprojection" and \
+                    stage.get("in_srs") == stage.get("out_srs") == source_srs:
+                template = template.without(name)
+        return template
+
+def output_types(output_type: str) -> list:
+    """
+    splits a comma separated output_type of writers.gdal into its types
+
+    Parameters
+    ----------
+    output_type: str : e.g "idw" or "min, max, idw", "all" stands for every type
+
+    Returns: the types in the order of the bands writers.gdal writes them in
+    -------
+
+    """
+    types = set()
+    for name in str(output_type).split(","):
+        name = name.strip()
+        if name not in GDAL_OUTPUT_TYPES:
+            raise ValueError(f"Unrecognised output_type {name}, expected one of {GDAL_OUTPUT_TYPES}")
+        types.update(GDAL_BANDS if name == "all" else (name,))
+    return [name for name in GDAL_BANDS if name in types]
+
+def elevation_type(output_type: str) -> str:
+    """
+    returns the output type the elevation is taken from when several are written,
+    "idw" when it is one of them and the first one listed otherwise
+    """
+    if output_type == "tin":
+        return "tin"
+    types = [name.strip() for name in str(output_type).split(",")]
+    return "idw" if "idw" in output_types(output_type) else output_types(types[0])[0]
+
+def validate_stages(stages: list) -> None:
+    """
+    checks that a pipeline is well formed, raises a ValueError if it is not
+
+    Parameters
+    ----------
+    stages: list : a list of (name, stage dictionary) pairs
+    """
+    tags = set()
+    names = set()
+    for name, stage in stages:
+        if name in names:
+            raise ValueError(f"duplicate stage {name}")
+        names.add(name)
+        if "type" not in stage:
+            raise ValueError(f"stage {name} has no type")
+        for tag in stage.get("inputs", []):
+            if tag not in tags:
+                raise ValueError(f"stage {name} reads from {tag}, which is not an earlier stage")
+        if "tag" in stage:
+            if stage["tag"] in tags:
+                raise ValueError(f"duplicate tag {stage['tag']}")
+            tags.add(stage["tag"])
+        if stage["type"] == "writers.gdal":
+            output_types(stage.get("output_type"))
+
+@functools.lru_cache(maxsize=1024)
+def render(template: PipelineTemplate, params: str) -> str:
+    """
+    binds the options to the template's stages and validates the result, cached since the
+    same template is rendered with the same options for every tile and region
+
+    Parameters
+    ----------
+    template: PipelineTemplate : the template
+
+    params: str : the options as a json string, see PipelineTemplate.bind
+
+    Returns: the pipeline as a json string
+    -------
+
+    """
+    params = json.loads(params)
+    stages = template.stages()
+    for name, stage in stages:
+        stage.update(params.get(name, {}))
+    validate_stages(stages)
+    return json.dumps([stage for _, stage in stages])
+
+def raster_template() -> PipelineTemplate:
+    """
+    returns the default pipeline of RasterGetter: the points are read from the ept,
+    the noise is filtered out, the points are reprojected and written to a las file
+    and interpolated into a tif
+    """
+    return PipelineTemplate([
+        ("reader", {
+            "bounds": "",
+            "filename": "",
+            "type": "readers.ept",
+            "tag": "readdata"
+        }),
+        ("classification", {
+            "limits": "Classification![2:7], Classification![9:9]",
+            "type": "filters.range",
+            "tag": "nonoise"
+        }),
+        ("reprojection", {
+            "in_srs": "EPSG:3857",
+            "out_srs": "EPSG:3857",
+            "tag": "reprojectUTM",
+            "type": "filters.reprojection"
+        }),
+        ("las_writer", {
+            "filename": "",
+            "inputs": ["reprojectUTM"],
+            "tag": "writerslas",
+            "type": "writers.las"
+        }),
+        ("tif_writer", {
+            "filename": "",
+            "gdalopts": "TILED=YES,COMPRESS=DEFLATE",
+            "inputs": ["writerslas"],
+            "nodata": -9999,
+            "output_type": "idw",
+            "resolution": 5,
+            "type": "writers.gdal",
+            "window_size": 6
+        })
+    ])
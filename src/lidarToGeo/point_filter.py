@@ -0,0 +1,163 @@
+import threading
+import numpy as np
+from pyproj import Transformer
+from src.lidarToGeo.logger import setup_logger
+
+logger = setup_logger("point_filter")
+
+# low and high noise in the asprs classes of las 1.4
+NOISE_CLASSES = (7, 18)
+GROUND_CLASSES = (2,)
+
+# transformers are not thread safe in pyproj < 3.1, every thread caches its own
+_transformers = threading.local()
+
+def get_transformer(in_srs: str, out_srs: str) -> Transformer:
+    """
+    returns the transformer between two crs, cached per thread since building one means
+    looking the crs up in the proj database. The axes are always in x, y (longitude,
+    latitude) order
+
+    Parameters
+    ----------
+    in_srs: str : crs of the points, e.g "EPSG:3857"
+
+    out_srs: str : crs to reproject the points to
+
+    Returns: a pyproj Transformer
+    -------
+
+    """
+    cache = getattr(_transformers, "cache", None)
+    if cache is None:
+        cache = _transformers.cache = {}
+    key = (in_srs, out_srs)
+    if key not in cache:
+        cache[key] = Transformer.from_crs(in_srs, out_srs, always_xy=True)
+    return cache[key]
+
+def classification_mask(classification: np.ndarray, classes: list = None, exclude: list = None) -> np.ndarray:
+    """
+    returns the mask of the points whose class is in classes and not in exclude
+
+    Parameters
+    ----------
+    classification: np.ndarray : class of every point
+
+    classes: list : classes to keep, every class when None
+         (Default value = None)
+
+    exclude: list : classes to remove
+         (Default value = None)
+
+    Returns: a boolean numpy array
+    -------
+
+    """
+    mask = np.ones(len(classification), dtype=bool)
+    if classes is not None:
+        mask &= np.isin(classification, np.asarray(classes))
+    if exclude is not None:
+        mask &= ~np.isin(classification, np.asarray(exclude))
+    return mask
+
+def reproject(points: np.ndarray, in_srs: str, out_srs: str, batch_size: int = 1000000) -> np.ndarray:
+    """
+    reprojects the X, Y (and Z when the transformation has a vertical part) of points in
+    place, in batches so that the temporary arrays of proj stay small
+
+    Parameters
+    ----------
+    points: np.ndarray : numpy structured array with float64 X, Y and Z dimensions
+
+    in_srs: str : crs of the points
+
+    out_srs: str : crs to reproject the points to
+
+    batch_size: int : number of points transformed at once
+         (Default value = 1000000)
+
+    Returns: points
+    -------
+
+    """
+    if in_srs == out_srs or len(points) == 0:
+        return points
+    transformer = get_transformer(in_srs, out_srs)
+    has_z = "Z" in points.dtype.names
+    for start in range(0, len(points), batch_size):
+        batch = points[start:start + batch_size]
+        if has_z:
+            batch["X"], batch["Y"], batch["Z"] = transformer.transform(batch["X"], batch["Y"], batch["Z"])
+        else:
+            batch["X"], batch["Y"] = transformer.transform(batch["X"], batch["Y"])
+    return points
+
+class PointFilter(object):
+    """
+    filters and reprojects points that are already in memory with numpy and proj, the
+    classification and reprojection stages of the pdal pipeline can be left out of the
+    template and changed from run to run without building a new pipeline. It also applies
+    them to the points of the native reader, which has no pipeline
+
+    Parameters
+    ----------
+    classes: list : classes to keep, every class when None
+         (Default value = None)
+
+    exclude: list : classes to remove, e.g NOISE_CLASSES
+         (Default value = None)
+
+    in_srs: str : crs of the points, e.g "EPSG:3857", the points are not reprojected when
+            in_srs or out_srs is None or they are the same
+         (Default value = None)
+
+    out_srs: str : crs to reproject the points to
+         (Default value = None)
+
+    batch_size: int : number of points reprojected at once
+         (Default value = 1000000)
+    """
+    def __init__(self, classes: list = None, exclude: list = None, in_srs: str = None,
+                 out_srs: str = None, batch_size: int = 1000000) -> None:
+        self.classes = None if classes is None else sorted(int(c) for c in classes)
+        self.exclude = None if exclude is None else sorted(int(c) for c in exclude)
+        self.in_srs = in_srs
+        self.out_srs = out_srs
+        self.batch_size = batch_size
+
+    def reprojects(self) -> bool:
+        """
+        returns whether the filter changes the coordinates of the points
+        """
+        return self.in_srs is not None and self.out_srs is not None and self.in_srs != self.out_srs
+
+    def describe(self) -> dict:
+        """
+        returns a json serializable description of the filter, used in the cache keys
+        """
+        return {"classes": self.classes, "exclude": self.exclude,
+                "in_srs": self.in_srs, "out_srs": self.out_srs if self.reprojects() else self.in_srs}
+
+    def apply(self, points: np.ndarray) -> np.ndarray:
+        """
+        keeps the points of the filter's classes and reprojects them
+
+        Parameters
+        ----------
+        points: np.ndarray : numpy structured array of the points, it needs a Classification
+                dimension when the filter has classes
+
+        Returns: a new numpy structured array, points are left unchanged
+        -------
+
+        """
+        if self.classes is not None or self.exclude is not None:
+            if "Classification" not in points.dtype.names:
+                raise ValueError("the points have no Classification dimension to filter on")
+            points = points[classification_mask(points["Classification"], self.classes, self.exclude)]
+        else:
+            points = points.copy()
+        if self.reprojects():
+            reproject(points, self.in_srs, self.out_srs, self.batch_size)
+        return points
@@ -0,0 +1,334 @@
+import os
+import json
+import shutil
+import tempfile
+import numpy as np
+import numpy.lib.format
+from src.lidarToGeo.logger import setup_logger
+from src.lidarToGeo.gridding import grid_elevation
+from src.lidarToGeo.schema import Schema
+
+logger = setup_logger("point_store")
+
+META_FILE = "meta.json"
+
+class PointStoreWriter(object):
+    """
+    writes chunks of points into a new point store, every dimension is appended to its own
+    .npy file so any number of points can be written with bounded memory.
+
+    the dimensions of the schema are stored with the schema's type, the scaled ones (X, Y,
+    Z) as the integers of the ept files with their scale and offset applied when they are
+    read back, which halves their size. The store is written to a temporary directory and
+    renamed into place by close so readers never see a partial store
+
+    Parameters
+    ----------
+    directory: str : folder of the store
+
+    schema: Schema : schema of the region's ept
+
+    meta: dict : json serializable description of the points kept with the store,
+          e.g the region and bounds they were read from
+         (Default value = None)
+
+    quantize: bool : store the scaled dimensions as the schema's integers, the points must
+              still be in the ept's srs for them to fit
+         (Default value = True)
+    """
+    def __init__(self, directory: str, schema: Schema, meta: dict = None, quantize: bool = True) -> None:
+        self.directory = directory
+        self.schema = schema
+        self.meta = dict(meta or {})
+        self.quantize = quantize
+        self.count = 0
+        self.columns = None
+        self._files = {}
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        self._tmp = tempfile.mkdtemp(dir=parent, prefix=".tmp")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _open(self, dtype: np.dtype) -> None:
+        """
+        decides how every dimension of the first chunk is stored and creates its file
+        """
+        self.columns = {}
+        for name in dtype.names:
+            dim = self.schema.dimesions.get(name)
+            if dim is None:
+                # e.g a dimension added by a filter
+                column = {"dtype": dtype[name].str}
+            elif 'scale' in dim or 'offset' in dim:
+                if self.quantize:
+                    column = {"dtype": np.dtype(dim['dtype']).str, "scale": dim.get('scale', 1.0),
+                              "offset": dim.get('offset', 0.0)}
+                else:
+                    column = {"dtype": np.dtype('f8').str}
+            else:
+                column = {"dtype": np.dtype(dim['dtype']).str}
+            self.columns[name] = column
+
+            column_file = open(os.path.join(self._tmp, f"{name}.npy"), "wb")
+            # the header is written again with the final number of points once they are all
+            # written, numpy pads it so that it keeps its size
+            numpy.lib.format.write_array_header_1_0(column_file, self._header(name, 0))
+            self._files[name] = column_file
+
+    def _header(self, name: str, count: int) -> dict:
+        descr = numpy.lib.format.dtype_to_descr(np.dtype(self.columns[name]["dtype"]))
+        return {"descr": descr, "fortran_order": False, "shape": (count,)}
+
+    def write(self, points: np.ndarray) -> None:
+        """
+        appends a chunk of points to the store
+
+        Parameters
+        ----------
+        points: np.ndarray : numpy structured array of the points, every chunk must have the
+                same dimensions
+        """
+        if self.columns is None:
+            self._open(points.dtype)
+        if set(points.dtype.names) != set(self.columns):
+            raise ValueError(f"the chunk's dimensions {points.dtype.names} differ from the store's "
+                             f"{tuple(self.columns)}")
+
+        for name, column in self.columns.items():
+            values = points[name]
+            dtype = np.dtype(column["dtype"])
+            if "scale" in column:
+                values = np.round((values - column["offset"]) / column["scale"])
+                info = np.iinfo(dtype) if dtype.kind in "iu" else np.finfo(dtype)
+                if len(values) and (values.min() < info.min or values.max() > info.max):
+                    raise ValueError(f"{name} does not fit the schema's {dtype}, the points are not "
+                                     "in the ept's srs and can not be quantized")
+            self._files[name].write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        self.count += len(points)
+
+    def close(self):
+        """
+        finishes the store and moves it into place
+
+        Returns: the store opened with PointStore
+        -------
+
+        """
+        if self.columns is None:
+            self._open(self.schema.scaled_dtype)
+        for name, column_file in self._files.items():
+            size = column_file.tell()
+            column_file.seek(0)
+            numpy.lib.format.write_array_header_1_0(column_file, self._header(name, self.count))
+            header = column_file.tell()
+            column_file.close()
+            if size - header != self.count * np.dtype(self.columns[name]["dtype"]).itemsize:
+                self.abort()
+                raise RuntimeError(f"the header of {name}.npy changed size, the store is corrupt")
+
+        with open(os.path.join(self._tmp, META_FILE), "w") as meta_file:
+            json.dump({"count": self.count, "columns": self.columns, "meta": self.meta}, meta_file)
+
+        shutil.rmtree(self.directory, ignore_errors=True)
+        try:
+            os.replace(self._tmp, self.directory)
+        except OSError:
+            # another process wrote the same store in the meantime
+            shutil.rmtree(self._tmp, ignore_errors=True)
+        logger.info(f"{self.count} points stored in {self.directory}")
+        return PointStore(self.directory)
+
+    def abort(self) -> None:
+        """
+        discards the points written so far
+        """
+        for column_file in self._files.values():
+            column_file.close()
+        shutil.rmtree(self._tmp, ignore_errors=True)
+
+def write_point_store(directory: str, chunks, schema: Schema, meta: dict = None, quantize: bool = True):
+    """
+    writes points into a new point store
+
+    Parameters
+    ----------
+    directory: str : folder of the store
+
+    chunks : a numpy structured array of points or an iterable of them, e.g
+             RasterGetter.iter_points
+
+    schema: Schema : schema of the region's ept
+
+    meta: dict : json serializable description of the points kept with the store
+         (Default value = None)
+
+    quantize: bool : store the scaled dimensions as the schema's integers, see PointStoreWriter
+         (Default value = True)
+
+    Returns: the store opened with PointStore
+    -------
+
+    """
+    if isinstance(chunks, np.ndarray):
+        chunks = [chunks]
+    with PointStoreWriter(directory, schema, meta, quantize) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+    return PointStore(directory)
+
+class PointStore(object):
+    """
+    a region's points kept on disk as one memory mapped .npy file per dimension.
+
+    the columns are mapped when they are first used, so a store can be regridded at any
+    resolution, filtered or split into chunks without downloading and decompressing the
+    points again. raw and chunks read only what they return, but column, points and grid
+    copy the (masked) points they use into memory, the scaled dimensions as float64: grid
+    holds X, Y and Z of every gridded point at once like gridding the points of get_points
+
+    Parameters
+    ----------
+    directory: str : folder of the store
+    """
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE), "r") as meta_file:
+            stored = json.load(meta_file)
+        self.count = stored["count"]
+        self.columns = stored["columns"]
+        self.meta = stored["meta"]
+        self._maps = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.column(name)
+
+    def get_names(self) -> list:
+        """
+        returns the names of the stored dimensions
+        """
+        return list(self.columns)
+    names = property(get_names)
+
+    def raw(self, name: str) -> np.ndarray:
+        """
+        returns the read only memory map of a dimension as it is stored, without its scale
+        and offset applied
+
+        Parameters
+        ----------
+        name: str : the dimension's name
+
+        Returns: a 1d numpy memmap
+        -------
+
+        """
+        if name not in self.columns:
+            raise KeyError(f"the store has no dimension {name}")
+        if name not in self._maps:
+            self._maps[name] = np.load(os.path.join(self.directory, f"{name}.npy"), mmap_mode="r")
+        return self._maps[name]
+
+    def column(self, name: str, mask: np.ndarray = None) -> np.ndarray:
+        """
+        returns the values of a dimension, the memory map itself for the dimensions without
+        a scale and a float64 array in memory for the scaled ones
+
+        Parameters
+        ----------
+        name: str : the dimension's name
+
+        mask: np.ndarray : boolean mask or indices of the points to return, every point when None
+             (Default value = None)
+
+        Returns: a 1d numpy array
+        -------
+
+        """
+        values = self.raw(name)
+        if mask is not None:
+            values = values[mask]
+        column = self.columns[name]
+        if "scale" in column:
+            return values * column["scale"] + column["offset"]
+        return values
+
+    def points(self, names: list = None, mask: np.ndarray = None) -> np.ndarray:
+        """
+        copies dimensions of the points into a structured array like the one pdal returns
+
+        Parameters
+        ----------
+        names: list : the dimensions to copy, all of them when None
+             (Default value = None)
+
+        mask: np.ndarray : boolean mask or indices of the points to copy, every point when None
+             (Default value = None)
+
+        Returns: a numpy structured array with the scaled dimensions as float64
+        -------
+
+        """
+        names = self.names if names is None else list(names)
+        dtype = [(name, 'f8' if "scale" in self.columns[name] else self.columns[name]["dtype"])
+                 for name in names]
+        count = self.count if mask is None else len(self.raw(names[0])[mask])
+        points = np.empty(count, dtype=dtype)
+        for name in names:
+            points[name] = self.column(name, mask)
+        return points
+
+    def chunks(self, chunk_size: int = 1000000, names: list = None):
+        """
+        iterates over the points in chunks, like RasterGetter.iter_points does over the ept
+
+        Parameters
+        ----------
+        chunk_size: int : maximum number of points in a chunk
+             (Default value = 1000000)
+
+        names: list : the dimensions of the chunks, all of them when None
+             (Default value = None)
+
+        Returns: a generator of numpy structured arrays
+        -------
+
+        """
+        for start in range(0, self.count, chunk_size):
+            yield self.points(names, slice(start, start + chunk_size))
+
+    def grid(self, box: tuple, resolution: float, mask: np.ndarray = None, **kwargs) -> tuple:
+        """
+        grids the elevation of the stored points, see gridding.grid_elevation
+
+        Parameters
+        ----------
+        box: tuple : (xmin, ymin, xmax, ymax) extent of the grid
+
+        resolution: float : cell size
+
+        mask: np.ndarray : boolean mask or indices of the points to grid, e.g
+              np.isin(store["Classification"], [2]) for the ground, every point when None
+             (Default value = None)
+
+        kwargs : output_type, nodata, radius, power and window_size of grid_elevation
+
+        Returns: a tuple of form (grid, geotransform)
+        -------
+
+        """
+        return grid_elevation(self.column("X", mask), self.column("Y", mask), self.column("Z", mask),
+                              box, resolution, **kwargs)
@@ -0,0 +1,267 @@
+import os
+import math
+import numpy as np
+import matplotlib.image
+from src.lidarToGeo.logger import setup_logger
+
+try:
+    from matplotlib import colormaps
+
+    def get_cmap(name: str):
+        return colormaps[name]
+except ImportError:
+    # matplotlib < 3.5
+    from matplotlib.cm import get_cmap
+
+logger = setup_logger("quicklook")
+
+# half the width of the web mercator world, the extent of the xyz tiles
+WEB_MERCATOR_HALF_WORLD = 20037508.342789244
+TILE_SIZE = 256
+
+def _valid(grid: np.ndarray, nodata: float) -> np.ndarray:
+    """
+    returns the mask of the cells that have data
+    """
+    valid = ~np.isnan(grid)
+    if nodata is not None and not np.isnan(nodata):
+        valid &= grid != nodata
+    return valid
+
+def downsample(grid: np.ndarray, max_size: int, nodata: float = -9999) -> tuple:
+    """
+    averages blocks of cells so that the grid is at most max_size cells wide and high
+
+    Parameters
+    ----------
+    grid: np.ndarray : 2d grid of elevations
+
+    max_size: int : largest number of rows or columns of the result
+
+    nodata: float : value of the cells without data, they are left out of the averages
+         (Default value = -9999)
+
+    Returns: a tuple of form (grid with nan for the cells without data, block size)
+    -------
+
+    """
+    elevation = np.where(_valid(grid, nodata), grid, np.nan).astype(np.float64)
+    factor = max(1, int(math.ceil(max(grid.shape) / max_size)))
+    if factor == 1:
+        return elevation, 1
+
+    rows, columns = elevation.shape
+    padded = np.full((-(-rows // factor) * factor, -(-columns // factor) * factor), np.nan)
+    padded[:rows, :columns] = elevation
+    blocks = padded.reshape(padded.shape[0] // factor, factor, padded.shape[1] // factor, factor)
+    count = np.sum(~np.isnan(blocks), axis=(1, 3))
+    total = np.nansum(blocks, axis=(1, 3))
+    return np.divide(total, count, out=np.full(count.shape, np.nan), where=count > 0), factor
+
+def hillshade(elevation: np.ndarray, resolution: float, azimuth: float = 315,
+              altitude: float = 45) -> np.ndarray:
+    """
+    computes the illumination of every cell by a light source at azimuth and altitude
+
+    Parameters
+    ----------
+    elevation: np.ndarray : 2d grid of elevations, nan for cells without data
+
+    resolution: float : cell size
+
+    azimuth: float : direction the light comes from in degrees clockwise from north
+         (Default value = 315)
+
+    altitude: float : angle of the light above the horizon in degrees
+         (Default value = 45)
+
+    Returns: a 2d grid of values between 0 and 1, nan where the slope is undefined
+    -------
+
+    """
+    if min(elevation.shape) < 2:
+        return np.ones(elevation.shape)
+    dz_dy, dz_dx = np.gradient(elevation, resolution)
+    # rows are counted from the northern edge so the gradient along them points south
+    slope = np.arctan(np.hypot(dz_dx, dz_dy))
+    aspect = np.arctan2(-dz_dx, dz_dy)
+    zenith = math.radians(90 - altitude)
+    light = math.radians(azimuth)
+    shade = np.cos(zenith) * np.cos(slope) + np.sin(zenith) * np.sin(slope) * np.cos(light - aspect)
+    return np.clip(shade, 0, 1)
+
+def render(grid: np.ndarray, resolution: float, nodata: float = -9999, cmap: str = "terrain",
+           shade: float = 0.6, max_size: int = 2048) -> np.ndarray:
+    """
+    colors an elevation grid and shades it with its hillshade
+
+    Parameters
+    ----------
+    grid: np.ndarray : 2d grid of elevations
+
+    resolution: float : cell size
+
+    nodata: float : value of the cells without data, they are transparent
+         (Default value = -9999)
+
+    cmap: str : name of the matplotlib colormap
+         (Default value = "terrain")
+
+    shade: float : strength of the hillshade between 0 (none) and 1
+         (Default value = 0.6)
+
+    max_size: int : largest width or height of the image, bigger grids are downsampled
+         (Default value = 2048)
+
+    Returns: an (rows, columns, 4) uint8 rgba image
+    -------
+
+    """
+    elevation, factor = downsample(grid, max_size, nodata)
+    valid = ~np.isnan(elevation)
+    rgba = np.zeros(elevation.shape + (4,))
+    if valid.any():
+        low, high = np.percentile(elevation[valid], (2, 98))
+        normalized = np.clip((elevation - low) / (high - low if high > low else 1.0), 0, 1)
+        rgba = get_cmap(cmap)(np.nan_to_num(normalized))
+        light = np.nan_to_num(hillshade(elevation, resolution * factor), nan=1.0)
+        rgba[..., :3] *= (1 - shade) + shade * light[..., np.newaxis]
+    rgba[..., 3] = valid
+    return (rgba * 255).round().astype(np.uint8)
+
+def save_quicklook(grid: np.ndarray, resolution: float, filename: str, nodata: float = -9999,
+                   **kwargs) -> None:
+    """
+    saves the rendered grid as a png, one pixel per (downsampled) cell
+
+    Parameters
+    ----------
+    grid: np.ndarray : 2d grid of elevations
+
+    resolution: float : cell size
+
+    filename: str : name of the png
+
+    nodata: float : value of the cells without data
+         (Default value = -9999)
+
+    kwargs : cmap, shade and max_size, see render
+    """
+    matplotlib.image.imsave(filename, render(grid, resolution, nodata, **kwargs))
+    logger.info(f"quicklook saved as {filename}")
+
+def points_to_grid(x: np.ndarray, y: np.ndarray, values: np.ndarray, resolution: float,
+                   nodata: float = -9999) -> tuple:
+    """
+    puts points back into a grid of cells of resolution, e.g the cell centers of a
+    geodataframe created by get_geodataframe or the centroids of polygonized cells. A cell
+    takes the value of the last point that falls in it
+
+    Parameters
+    ----------
+    x: np.ndarray : x coordinates of the points
+
+    y: np.ndarray : y coordinates of the points
+
+    values: np.ndarray : values of the points
+
+    resolution: float : cell size of the grid, it is never guessed from the spacing of the
+                points since irregular points would give a tiny cell size
+
+    nodata: float : value of the cells without a point
+         (Default value = -9999)
+
+    Returns: a tuple of form (grid, geotransform)
+    -------
+
+    """
+    if not resolution or resolution <= 0:
+        raise ValueError(f"resolution must be positive, not {resolution}")
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) == 0:
+        return np.full((1, 1), nodata, dtype=np.float64), (0.0, resolution, 0.0, 0.0, 0.0, -resolution)
+    xmin = x.min() - resolution / 2
+    ymax = y.max() + resolution / 2
+    columns = np.floor((x - xmin) / resolution).astype(np.int64)
+    rows = np.floor((ymax - y) / resolution).astype(np.int64)
+    grid = np.full((rows.max() + 1, columns.max() + 1), nodata, dtype=np.float64)
+    grid[rows, columns] = values
+    return grid, (xmin, resolution, 0.0, ymax, 0.0, -resolution)
+
+def zoom_for_resolution(resolution: float) -> int:
+    """
+    returns the zoom level of the web mercator tiles whose pixels are at most resolution wide
+    """
+    return max(0, int(math.ceil(math.log2(2 * WEB_MERCATOR_HALF_WORLD / TILE_SIZE / resolution))))
+
+def tile_pyramid(grid: np.ndarray, transform: tuple, directory: str, nodata: float = -9999,
+                 min_zoom: int = None, max_zoom: int = None, **kwargs) -> int:
+    """
+    writes the rendered grid as a pyramid of xyz web tiles, directory/z/x/y.png, that web maps
+    (leaflet, openlayers...) can display. The grid must be in web mercator (EPSG:3857)
+
+    Parameters
+    ----------
+    grid: np.ndarray : 2d grid of elevations
+
+    transform: tuple : gdal geotransform of the grid
+
+    directory: str : folder the tiles are written to
+
+    nodata: float : value of the cells without data
+         (Default value = -9999)
+
+    min_zoom: int : lowest zoom level, 4 levels above max_zoom when None
+         (Default value = None)
+
+    max_zoom: int : highest zoom level, the level matching the grid's resolution when None
+         (Default value = None)
+
+    kwargs : cmap and shade, see render
+
+    Returns: the number of tiles written
+    -------
+
+    """
+    resolution = abs(transform[1])
+    if max_zoom is None:
+        max_zoom = zoom_for_resolution(resolution)
+    if min_zoom is None:
+        min_zoom = max(0, max_zoom - 4)
+    image = render(grid, resolution, nodata, max_size=max(grid.shape), **kwargs)
+    rows, columns = grid.shape
+    xmin, ymax = transform[0], transform[3]
+    xmax, ymin = xmin + columns * resolution, ymax - rows * resolution
+
+    written = 0
+    for zoom in range(min_zoom, max_zoom + 1):
+        span = 2 * WEB_MERCATOR_HALF_WORLD / 2 ** zoom
+        pixel = span / TILE_SIZE
+        first_x = int((xmin + WEB_MERCATOR_HALF_WORLD) // span)
+        last_x = int((xmax + WEB_MERCATOR_HALF_WORLD) // span)
+        first_y = int((WEB_MERCATOR_HALF_WORLD - ymax) // span)
+        last_y = int((WEB_MERCATOR_HALF_WORLD - ymin) // span)
+        offsets = (np.arange(TILE_SIZE) + 0.5) * pixel
+        for tile_x in range(first_x, last_x + 1):
+            # column of the grid under every pixel of the tile, nearest neighbour
+            x = tile_x * span - WEB_MERCATOR_HALF_WORLD + offsets
+            column = np.floor((x - xmin) / resolution).astype(np.int64)
+            inside_x = (column >= 0) & (column < columns)
+            for tile_y in range(first_y, last_y + 1):
+                y = WEB_MERCATOR_HALF_WORLD - tile_y * span - offsets
+                row = np.floor((ymax - y) / resolution).astype(np.int64)
+                inside_y = (row >= 0) & (row < rows)
+                if not inside_x.any() or not inside_y.any():
+                    continue
+                tile = np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8)
+                tile[np.ix_(inside_y, inside_x)] = image[np.ix_(row[inside_y], column[inside_x])]
+                if not tile[..., 3].any():
+                    continue
+                tile_dir = os.path.join(directory, str(zoom), str(tile_x))
+                os.makedirs(tile_dir, exist_ok=True)
+                matplotlib.image.imsave(os.path.join(tile_dir, f"{tile_y}.png"), tile)
+                written += 1
+
+    logger.info(f"{written} tiles of zoom {min_zoom} to {max_zoom} written to {directory}")
+    return written
@@ -0,0 +1,239 @@
+import math
+import uuid
+from osgeo import gdal
+from src.lidarToGeo.gridding import grid_to_points
+from src.lidarToGeo.logger import setup_logger
+
+logger = setup_logger("raster")
+
+gdal.UseExceptions()
+
+def mosaic_tifs(tiles: list, tif_filename: str, origin: tuple, resolution: float,
+                creation_options: list = ("TILED=YES", "COMPRESS=DEFLATE")) -> None:
+    """
+    combines the rasters of bounds tiles into a single raster, only the core of every tile
+    is kept so that the cells in the overlaps are taken from the tile they belong to
+
+    Parameters
+    ----------
+    tiles: list : a list of (tif_filename, core) tuples, core being the (xmin, ymin, xmax, ymax)
+           part of the bounds the tile covers
+
+    tif_filename: str : name of the mosaic to create
+
+    origin: tuple : (x, y) lower left corner of the grid all the tiles are aligned to
+
+    resolution: float : cell size of the rasters
+
+    creation_options: list : gdal creation options of the mosaic
+         (Default value = ("TILED=YES", "COMPRESS=DEFLATE"))
+
+    Returns
+    -------
+
+    """
+    def snap(value, start):
+        return start + math.ceil(round((value - start) / resolution, 6)) * resolution
+
+    prefix = f"/vsimem/mosaic_{uuid.uuid4().hex}"
+    cores = []
+    try:
+        for i, (tile_filename, core) in enumerate(tiles):
+            xmin, ymin, xmax, ymax = core
+            window = [xmin, snap(ymax, origin[1]), snap(xmax, origin[0]), ymin]
+            core_filename = f"{prefix}_{i}.vrt"
+            gdal.Translate(core_filename, tile_filename, format="VRT", projWin=window)
+            cores.append(core_filename)
+
+        logger.info(f"mosaicking {len(cores)} tiles into {tif_filename}")
+        vrt = gdal.BuildVRT(f"{prefix}.vrt", cores)
+        cores.append(f"{prefix}.vrt")
+        gdal.Translate(tif_filename, vrt, creationOptions=list(creation_options))
+        vrt = None
+    finally:
+        for core_filename in cores:
+            gdal.Unlink(core_filename)
+
+def read_raster(tif_filename: str, band: int = 1) -> tuple:
+    """
+    reads a raster band into a numpy array
+
+    Parameters
+    ----------
+    tif_filename: str : name of the raster
+
+    band: int : band to read
+         (Default value = 1)
+
+    Returns: a tuple of form (grid, geotransform, nodata)
+    -------
+
+    """
+    ds = gdal.Open(tif_filename)
+    srcband = ds.GetRasterBand(band)
+    return srcband.ReadAsArray(), ds.GetGeoTransform(), srcband.GetNoDataValue()
+
+def raster_to_points(tif_filename: str, band: int = 1) -> tuple:
+    """
+    reads a raster band and returns the centers of its cells that are not nodata along with
+    the cells' values, without polygonizing the raster
+
+    Parameters
+    ----------
+    tif_filename: str : name of the raster
+
+    band: int : band to read
+         (Default value = 1)
+
+    Returns: a tuple of form (x, y, values, geotransform), x, y and values being 1d numpy arrays
+    -------
+
+    """
+    grid, transform, nodata = read_raster(tif_filename, band)
+    x, y, values = grid_to_points(grid, transform, nodata)
+    return x, y, values, transform
+
+class CogOptions(object):
+    """
+    settings of the cloud optimized geotiffs written from the tif, readers can fetch
+    single blocks and overviews of them with range requests
+
+    Parameters
+    ----------
+    blocksize: int : width and height of the internal tiles in pixels
+         (Default value = 512)
+
+    compression: str : gdal compression method, e.g "DEFLATE", "ZSTD", "LZW" or "NONE"
+         (Default value = "DEFLATE")
+
+    predictor: str : "YES" lets gdal pick the floating point or horizontal differencing
+               predictor that fits the band's data type, "NO" disables it, "STANDARD" or
+               "FLOATING_POINT" force one
+         (Default value = "YES")
+
+    level: int : compression level, gdal's default when None
+         (Default value = None)
+
+    overview_resampling: str : resampling of the internal overviews
+         (Default value = "AVERAGE")
+    """
+    def __init__(self, blocksize: int = 512, compression: str = "DEFLATE", predictor: str = "YES",
+                 level: int = None, overview_resampling: str = "AVERAGE") -> None:
+        if blocksize <= 0 or blocksize % 16:
+            raise ValueError(f"blocksize must be a positive multiple of 16, not {blocksize}")
+        self.blocksize = blocksize
+        self.compression = compression.upper()
+        self.predictor = predictor.upper()
+        self.level = level
+        self.overview_resampling = overview_resampling.upper()
+
+    def creation_options(self) -> list:
+        """
+        returns the creation options of gdal's COG driver
+        """
+        options = [f"BLOCKSIZE={self.blocksize}", f"COMPRESS={self.compression}",
+                   f"OVERVIEW_RESAMPLING={self.overview_resampling}", "OVERVIEWS=IGNORE_EXISTING",
+                   "BIGTIFF=IF_SAFER"]
+        if self.compression != "NONE":
+            options.append(f"PREDICTOR={self.predictor}")
+        if self.level is not None:
+            options.append(f"LEVEL={self.level}")
+        return options
+
+def write_cog(tif_filename: str, cog_filename: str, band: int = None, options: CogOptions = None) -> None:
+    """
+    copies a raster, or one of its bands, into a cloud optimized geotiff with internal overviews
+
+    Parameters
+    ----------
+    tif_filename: str : name of the raster
+
+    cog_filename: str : name of the cloud optimized geotiff to create
+
+    band: int : band to copy, every band when None
+         (Default value = None)
+
+    options: CogOptions : block size, compression and predictor, CogOptions() when None
+         (Default value = None)
+
+    Returns
+    -------
+
+    """
+    options = options if options is not None else CogOptions()
+    gdal.Translate(cog_filename, tif_filename, format="COG",
+                   bandList=[band] if band is not None else None,
+                   creationOptions=options.creation_options())
+
+def validate_cog(cog_filename: str, options: CogOptions = None) -> list:
+    """
+    checks that a raster is a cloud optimized geotiff: a tiled geotiff whose header and
+    overviews come before the image data, with overviews down to a single block
+
+    Parameters
+    ----------
+    cog_filename: str : name of the raster
+
+    options: CogOptions : when given, the block size and compression are checked as well
+         (Default value = None)
+
+    Returns: a list of the problems found, empty when the raster is valid
+    -------
+
+    """
+    problems = []
+    ds = gdal.Open(cog_filename)
+    if ds.GetDriver().ShortName != "GTiff":
+        return [f"{cog_filename} is not a geotiff"]
+    if ds.GetMetadataItem("LAYOUT", "IMAGE_STRUCTURE") != "COG":
+        problems.append("the header, overviews and image data are not laid out as a cog")
+
+    band = ds.GetRasterBand(1)
+    block_x, block_y = band.GetBlockSize()
+    # tiff tiles are multiples of 16 pixels wide and high, strips usually are not
+    if block_x % 16 or block_y % 16:
+        problems.append("the raster is not tiled")
+    elif options is not None and (block_x, block_y) != (options.blocksize, options.blocksize):
+        problems.append(f"the blocks are {block_x}x{block_y} instead of "
+                        f"{options.blocksize}x{options.blocksize}")
+
+    if max(ds.RasterXSize, ds.RasterYSize) > block_x and band.GetOverviewCount() == 0:
+        problems.append("the raster has no overviews")
+    elif band.GetOverviewCount():
+        smallest = band.GetOverview(band.GetOverviewCount() - 1)
+        if max(smallest.XSize, smallest.YSize) > block_x:
+            problems.append("the smallest overview is larger than a block")
+
+    compression = ds.GetMetadataItem("COMPRESSION", "IMAGE_STRUCTURE")
+    if options is not None and options.compression != "NONE" and \
+            (compression or "").upper() != options.compression:
+        problems.append(f"the raster is compressed with {compression} instead of {options.compression}")
+    ds = None
+    return problems
+
+def write_cogs(tif_filename: str, cog_filenames: dict, options: CogOptions = None) -> dict:
+    """
+    splits the bands of a raster into one validated cloud optimized geotiff per band
+
+    Parameters
+    ----------
+    tif_filename: str : name of the raster
+
+    cog_filenames: dict : a dictionary of form {band number: name of the band's cog}
+
+    options: CogOptions : block size, compression and predictor, CogOptions() when None
+         (Default value = None)
+
+    Returns: cog_filenames
+    -------
+
+    """
+    options = options if options is not None else CogOptions()
+    for band, cog_filename in cog_filenames.items():
+        logger.info(f"writing band {band} of {tif_filename} to {cog_filename}")
+        write_cog(tif_filename, cog_filename, band, options)
+        problems = validate_cog(cog_filename, options)
+        if problems:
+            raise RuntimeError(f"{cog_filename} is not a valid cloud optimized geotiff: "
+                               + ", ".join(problems))
+    return cog_filenames
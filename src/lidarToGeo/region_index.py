@@ -0,0 +1,117 @@
+import ast
+import numpy as np
+
+PREDICATES = ("contains", "intersects")
+
+def parse_bounds(bounds: str) -> tuple:
+    """
+    converts a bounds string to a (xmin, ymin, xmax, ymax) tuple
+
+    Parameters
+    ----------
+    bounds: str : a string containing the bounds e.g
+                "([-10425171.940, -10423171.940], [5164494.710, 5166494.710])"
+
+    Returns: a tuple of form (xmin, ymin, xmax, ymax)
+    -------
+
+    """
+    (xmin, xmax), (ymin, ymax) = ast.literal_eval(bounds)
+    return (float(xmin), float(ymin), float(xmax), float(ymax))
+
+class RegionIndex(object):
+    """
+    compiles the bounds of every region in the catalog into a numpy array sorted by
+    the regions' minimum x so that finding the regions a set of boundaries lie in is
+    a binary search followed by a vectorized comparison instead of a python loop
+    over every region
+    """
+    def __init__(self, region_ept_info: dict) -> None:
+        names = list(region_ept_info.keys())
+        bounds = np.array([region_ept_info[name].bounds for name in names],
+                          dtype=np.float64).reshape(-1, 6)
+        # ept bounds are [xmin, ymin, zmin, xmax, ymax, zmax], only x and y are indexed
+        bounds = bounds[:, [0, 1, 3, 4]]
+
+        # regions are returned in catalog order, the position of each sorted row in the
+        # catalog is kept so that results can be put back in that order
+        self.order = np.argsort(bounds[:, 0], kind="stable")
+        self.names = np.array(names, dtype=object)
+        self.bounds = bounds[self.order]
+
+    def length(self) -> int:
+        """
+        returns the number of regions in the index
+        """
+        return len(self.names)
+
+    def query(self, box: tuple, predicate: str = "contains") -> list:
+        """
+        finds the regions that contain or intersect a box
+
+        Parameters
+        ----------
+        box: tuple : a (xmin, ymin, xmax, ymax) tuple
+
+        predicate: str : "contains" to only return regions the box lies fully inside,
+                    "intersects" to also return regions that partially overlap the box
+             (Default value = "contains")
+
+        Returns: a list of region names
+        -------
+
+        """
+        xmin, ymin, xmax, ymax = box
+        if predicate == "contains":
+            end = np.searchsorted(self.bounds[:, 0], xmin, side="right")
+            candidates = self.bounds[:end]
+            mask = (candidates[:, 1] <= ymin) & (candidates[:, 2] >= xmax) & \
+                (candidates[:, 3] >= ymax)
+        elif predicate == "intersects":
+            end = np.searchsorted(self.bounds[:, 0], xmax, side="right")
+            candidates = self.bounds[:end]
+            mask = (candidates[:, 1] <= ymax) & (candidates[:, 2] >= xmin) & \
+                (candidates[:, 3] >= ymin)
+        else:
+            raise ValueError(f"Unrecognised predicate {predicate}, expected one of {PREDICATES}")
+
+        return list(self.names[np.sort(self.order[:end][mask])])
+
+    def query_many(self, boxes, predicate: str = "contains", chunk_size: int = 1024) -> list:
+        """
+        finds the regions that contain or intersect each of many boxes in one call
+
+        Parameters
+        ----------
+        boxes : an array like of shape (n, 4) with a (xmin, ymin, xmax, ymax) row per box
+
+        predicate: str : "contains" or "intersects", see query
+             (Default value = "contains")
+
+        chunk_size: int : number of boxes compared against the index at once, bounds the
+                    size of the (boxes x regions) comparison matrix
+             (Default value = 1024)
+
+        Returns: a list with a list of region names for every box
+        -------
+
+        """
+        if predicate not in PREDICATES:
+            raise ValueError(f"Unrecognised predicate {predicate}, expected one of {PREDICATES}")
+
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        r_xmin, r_ymin, r_xmax, r_ymax = (self.bounds[:, i] for i in range(4))
+        results = []
+
+        for start in range(0, len(boxes), chunk_size):
+            chunk = boxes[start:start + chunk_size]
+            b_xmin, b_ymin, b_xmax, b_ymax = (chunk[:, i, np.newaxis] for i in range(4))
+            if predicate == "contains":
+                mask = (r_xmin <= b_xmin) & (r_ymin <= b_ymin) & \
+                    (r_xmax >= b_xmax) & (r_ymax >= b_ymax)
+            else:
+                mask = (r_xmin <= b_xmax) & (r_ymin <= b_ymax) & \
+                    (r_xmax >= b_xmin) & (r_ymax >= b_ymin)
+            results.extend(list(self.names[np.sort(self.order[row])]) for row in mask)
+
+        return results
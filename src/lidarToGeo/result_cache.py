@@ -0,0 +1,147 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import geopandas as gpd
+from src.lidarToGeo.logger import setup_logger
+
+logger = setup_logger("result_cache")
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "lidarToGeo", "results")
+
+def request_key(request: dict) -> str:
+    """
+    returns a hash of a request that does not depend on the order of its keys
+
+    Parameters
+    ----------
+    request: dict : json serializable description of the request
+
+    Returns: the sha256 hex digest of the request
+    -------
+
+    """
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def requested_files(tif_filename: str = None, files: dict = None) -> dict:
+    """
+    merges the tif_filename argument of ResultCache.get / put into its files
+    """
+    files = dict(files or {})
+    if tif_filename is not None:
+        files["tif"] = tif_filename
+    return files
+
+class ResultCache(object):
+    """
+    keeps the finished geodataframes (as GeoParquet) of region_gdf_dict on disk with the
+    files the run wrote next to them (tif, laz, cloud optimized geotiffs), keyed by a hash
+    of the request.
+
+    every entry records the version of the region's ept.json it was computed from, an entry
+    whose version differs from the current one is deleted instead of being returned
+    """
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR) -> None:
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, request: dict, version: str, tif_filename: str = None,
+            files: dict = None) -> gpd.GeoDataFrame:
+        """
+        returns the cached result of a request
+
+        Parameters
+        ----------
+        request: dict : json serializable description of the request
+
+        version: str : current version of the region's ept.json
+
+        tif_filename: str : where to copy the cached tif to, same as files={"tif": tif_filename}
+             (Default value = None)
+
+        files: dict : a dictionary of form {name: filename} of the files the request writes,
+               every one is copied back from the entry, an entry that misses one of them is
+               a miss since the caller expects them on disk
+             (Default value = None)
+
+        Returns: the cached geodataframe or None on a miss
+        -------
+
+        """
+        entry = os.path.join(self.cache_dir, request_key(request))
+        try:
+            with open(os.path.join(entry, "meta.json"), "r") as meta_file:
+                meta = json.load(meta_file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if meta["version"] != version:
+            logger.info(f"dropping cached result {entry} computed from an older ept.json")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        files = requested_files(tif_filename, files)
+        # entries written before the other files were kept only record the tif
+        stored = meta.get("files", ["tif"] if meta.get("tif") else [])
+        missing = [name for name in files if name not in stored]
+        if missing:
+            logger.info(f"cached result {entry} does not have the requested {missing}")
+            return None
+
+        gdf = gpd.read_parquet(os.path.join(entry, "result.parquet"))
+        for name, filename in files.items():
+            shutil.copyfile(os.path.join(entry, f"result.{name}"), filename)
+        logger.info(f"using cached result {entry}")
+        return gdf
+
+    def put(self, request: dict, version: str, gdf: gpd.GeoDataFrame, tif_filename: str = None,
+            files: dict = None) -> None:
+        """
+        stores the result of a request, the entry is written to a temporary directory and
+        renamed into place so readers never see a partial entry
+
+        Parameters
+        ----------
+        request: dict : json serializable description of the request
+
+        version: str : version of the region's ept.json the result was computed from
+
+        gdf: gpd.GeoDataFrame : the result
+
+        tif_filename: str : the tif created for the request, same as files={"tif": tif_filename}
+             (Default value = None)
+
+        files: dict : a dictionary of form {name: filename} of the files the request wrote,
+               the ones that exist are stored with the result
+             (Default value = None)
+        """
+        entry = os.path.join(self.cache_dir, request_key(request))
+        tmp_entry = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp")
+        try:
+            gdf.to_parquet(os.path.join(tmp_entry, "result.parquet"))
+            stored = []
+            for name, filename in requested_files(tif_filename, files).items():
+                if os.path.exists(filename):
+                    shutil.copyfile(filename, os.path.join(tmp_entry, f"result.{name}"))
+                    stored.append(name)
+            with open(os.path.join(tmp_entry, "meta.json"), "w") as meta_file:
+                json.dump({"request": request, "version": version, "tif": "tif" in stored,
+                           "files": stored}, meta_file)
+            shutil.rmtree(entry, ignore_errors=True)
+            try:
+                os.replace(tmp_entry, entry)
+            except OSError:
+                # another process stored the same request in the meantime
+                shutil.rmtree(tmp_entry, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            raise
+
+    def clear(self) -> None:
+        """
+        deletes every cached result
+        """
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
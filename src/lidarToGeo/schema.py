@@ -1,12 +1,23 @@
 import numpy as np
 
+# numpy kind of every type of the ept schema
+KINDS = {"unsigned": "u", "signed": "i", "float": "f"}
+SIZES = {"u": (1, 2, 4, 8), "i": (1, 2, 4, 8), "f": (4, 8)}
+
 class Schema(object):
     """
     reads and processes the dictionary / json in the schema key of the ept.json files
     to a format we can call as attributes to the Schema class
+
+    the schema is compiled once: the dtype of the points, the dtype with the scale and
+    offset applied and the dtypes of projections on a few dimensions are built on first
+    use and cached
     """
     def __init__(self, data) -> None:
         self.dimesions = self.get_dimensions(data)
+        self._dtype = None
+        self._scaled_dtype = None
+        self._projections = {}
 
     def length(self) -> int:
         """
@@ -16,7 +27,8 @@ class Schema(object):
 
     def get_dimensions(self, data: dict) -> dict:
         """
-        gets the data types of the schema elements
+        gets the data types of the schema elements, the dimensions in data are copied and
+        left unchanged
 
         Parameters
         ----------
@@ -30,32 +42,163 @@ class Schema(object):
 
         for d in data:
             name = d['name']
+            if name in dimensions:
+                raise ValueError(f"the schema has two dimensions named {name}")
 
-            kind = 'i'
-            if d['type'] == 'unsigned':
-                kind = 'u'
-            elif d['type'] == "signed":
-                kind = 'i'
-            elif d['type'] == 'float':
-                kind = 'f'
-            else:
+            kind = KINDS.get(d['type'])
+            if kind is None:
                 raise TypeError(f"Unrecognised type{d['type']}, cannot convert {d['type']}"
                                 "to numpy dtype")
+            if d['size'] not in SIZES[kind]:
+                raise ValueError(f"dimension {name} has an invalid size {d['size']} for type {d['type']}")
 
-            d['dtype'] = kind + str(d['size'])
-            dimensions[name] = d
+            dimensions[name] = dict(d, dtype=kind + str(d['size']))
 
         return dimensions
 
+    def get_names(self) -> list:
+        """
+        returns the names of the dimensions in the order of the points' bytes
+        """
+        return list(self.dimesions)
+    names = property(get_names)
+
+    def is_scaled(self, name: str) -> bool:
+        """
+        returns whether a dimension has a scale or an offset, i.e is stored as integers
+        """
+        dim = self.dimesions[name]
+        return 'scale' in dim or 'offset' in dim
+
     def get_dtype(self) -> np.dtype:
         """
         describes how the bytes in the fixed-size block of memory corresponding
         to a schema item should be interpreted
         """
-        dt = []
-        for d in self.dimesions:
-            dim = self.dimesions[d]
-            dt.append((dim['name'], dim['dtype']))
-
-        return np.dtype(dt)
+        if self._dtype is None:
+            self._dtype = np.dtype([(name, dim['dtype']) for name, dim in self.dimesions.items()])
+        return self._dtype
     dtype = property(get_dtype)
+
+    def get_scaled_dtype(self) -> np.dtype:
+        """
+        describes the points once the scale and offset of the dimensions that have one
+        are applied, those dimensions become float64 as in the arrays pdal returns
+        """
+        if self._scaled_dtype is None:
+            self._scaled_dtype = np.dtype([(name, 'f8' if self.is_scaled(name) else dim['dtype'])
+                                           for name, dim in self.dimesions.items()])
+        return self._scaled_dtype
+    scaled_dtype = property(get_scaled_dtype)
+
+    def projection(self, names: list = None) -> tuple:
+        """
+        returns the dtypes of a projection of the points on some of their dimensions
+
+        Parameters
+        ----------
+        names: list : the dimensions to keep, e.g ["X", "Y", "Z", "Classification"], every
+               dimension when None
+             (Default value = None)
+
+        Returns: a tuple of form (view dtype, scaled dtype), the view dtype has the offsets and
+                item size of the full dtype so that it views the kept dimensions of raw points
+                without copying them, the scaled dtype is the packed dtype of the decoded points
+        -------
+
+        """
+        key = tuple(self.dimesions) if names is None else tuple(names)
+        if key not in self._projections:
+            missing = [name for name in key if name not in self.dimesions]
+            if missing:
+                raise KeyError(f"the schema has no dimensions {missing}")
+            full = self.dtype
+            view = np.dtype({"names": list(key), "formats": [full[name] for name in key],
+                             "offsets": [full.fields[name][1] for name in key],
+                             "itemsize": full.itemsize})
+            scaled = np.dtype([(name, self.scaled_dtype[name]) for name in key])
+            self._projections[key] = (view, scaled)
+        return self._projections[key]
+
+    def view(self, content, names: list = None) -> np.ndarray:
+        """
+        views the raw points in a buffer, e.g the content of an ept node, without copying them
+
+        Parameters
+        ----------
+        content : bytes or any buffer of points laid out as the schema's dtype
+
+        names: list : the dimensions to view, every dimension when None
+             (Default value = None)
+
+        Returns: a read only numpy structured array of the stored (unscaled) values
+        -------
+
+        """
+        return np.frombuffer(content, dtype=self.projection(names)[0])
+
+    def scale(self, raw: np.ndarray, name: str) -> np.ndarray:
+        """
+        returns a dimension of raw points in real world units, the raw column itself when
+        the dimension has no scale or offset
+
+        Parameters
+        ----------
+        raw: np.ndarray : raw points, e.g from view
+
+        name: str : the dimension's name
+
+        Returns: a 1d numpy array
+        -------
+
+        """
+        if not self.is_scaled(name):
+            return raw[name]
+        dim = self.dimesions[name]
+        return raw[name] * dim.get('scale', 1.0) + dim.get('offset', 0.0)
+
+    def decode(self, content, names: list = None) -> np.ndarray:
+        """
+        decodes raw points into a packed structured array of the projected dimensions with
+        the scale and offset applied, only the kept dimensions are copied
+
+        Parameters
+        ----------
+        content : bytes or any buffer of points laid out as the schema's dtype
+
+        names: list : the dimensions to decode, every dimension when None
+             (Default value = None)
+
+        Returns: a numpy structured array typed by the projection's scaled dtype
+        -------
+
+        """
+        raw = self.view(content, names)
+        points = np.empty(len(raw), dtype=self.projection(names)[1])
+        for name in points.dtype.names:
+            points[name] = self.scale(raw, name)
+        return points
+
+    def select(self, points: np.ndarray, names: list = None) -> np.ndarray:
+        """
+        keeps the dimensions of decoded points (e.g the arrays pdal returns) that are in
+        names and in the schema, in the schema's types
+
+        Parameters
+        ----------
+        points: np.ndarray : numpy structured array of the points
+
+        names: list : the dimensions to keep, every dimension of the schema when None
+             (Default value = None)
+
+        Returns: a packed numpy structured array
+        -------
+
+        """
+        dtype = self.scaled_dtype
+        names = self.names if names is None else names
+        kept = [name for name in names if name in dtype.names and name in points.dtype.names]
+        selected = np.empty(len(points), dtype=[(name, dtype[name]) for name in kept])
+        for name in kept:
+            selected[name] = points[name]
+        return selected
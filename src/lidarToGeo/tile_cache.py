@@ -0,0 +1,173 @@
+import os
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from src.lidarToGeo.logger import setup_logger
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = setup_logger("tile_cache")
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "lidarToGeo", "tiles")
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+
+class TileCache(object):
+    """
+    content addressed on disk cache of ept node files with a size cap.
+
+    files are named after the sha256 of the dataset and node key and written atomically, so
+    several processes can share a cache directory. A file's modification time is updated
+    every time it is read and the least recently used files are evicted once the cache
+    grows past max_bytes, the eviction holds a lock file so only one process evicts at a time
+    """
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.evictions = 0
+        # bytes written since the size of the cache was last checked
+        self._unchecked = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, dataset: str, key: str) -> str:
+        """
+        returns the file a node is cached in
+
+        Parameters
+        ----------
+        dataset: str : url or name of the ept dataset, e.g the region
+
+        key: str : the node's key of form "D-X-Y-Z"
+
+        Returns: the path of the node's file
+        -------
+
+        """
+        digest = hashlib.sha256(f"{dataset}\0{key}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest)
+
+    def get(self, dataset: str, key: str) -> bytes:
+        """
+        reads a node from the cache
+
+        Parameters
+        ----------
+        dataset: str : url or name of the ept dataset
+
+        key: str : the node's key
+
+        Returns: the node's content or None if it is not cached
+        -------
+
+        """
+        path = self.path(dataset, key)
+        try:
+            with open(path, "rb") as node_file:
+                content = node_file.read()
+            os.utime(path)
+        except FileNotFoundError:
+            # missing or evicted by another process
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.bytes_read += len(content)
+        return content
+
+    def put(self, dataset: str, key: str, content: bytes) -> None:
+        """
+        stores a node in the cache and evicts the least recently used nodes if the
+        cache is bigger than max_bytes
+
+        Parameters
+        ----------
+        dataset: str : url or name of the ept dataset
+
+        key: str : the node's key
+
+        content: bytes : the node's content
+        """
+        path = self.path(dataset, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_filename = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(content)
+            os.replace(tmp_filename, path)
+        except BaseException:
+            os.remove(tmp_filename)
+            raise
+
+        self.bytes_written += len(content)
+        self._unchecked += len(content)
+        # the cache is only scanned once enough was written to possibly exceed the cap
+        if self._unchecked >= self.max_bytes // 10:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        deletes the least recently used nodes until the cache is at most max_bytes
+        """
+        with self._lock():
+            files = []
+            total = 0
+            for directory in os.scandir(self.cache_dir):
+                if not directory.is_dir():
+                    continue
+                for entry in os.scandir(directory.path):
+                    if entry.name.endswith(".tmp"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+            files.sort()
+            for mtime, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                self.evictions += 1
+
+        self._unchecked = 0
+
+    @contextmanager
+    def _lock(self):
+        """
+        holds an exclusive lock on the cache directory, a no-op where fcntl is not available
+        """
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.cache_dir, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def stats(self) -> dict:
+        """
+        returns the hit / miss statistics of this cache object
+        """
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "evictions": self.evictions
+        }
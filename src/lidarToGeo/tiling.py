@@ -0,0 +1,145 @@
+import math
+from src.lidarToGeo.region_index import parse_bounds
+
+def format_bounds(box: tuple) -> str:
+    """
+    converts a (xmin, ymin, xmax, ymax) tuple to the bounds string pdal's readers.ept expects
+
+    Parameters
+    ----------
+    box: tuple : a (xmin, ymin, xmax, ymax) tuple
+
+    Returns: a string of form "([xmin, xmax], [ymin, ymax])"
+    -------
+
+    """
+    # numpy scalars are converted first, their repr is not a plain number
+    xmin, ymin, xmax, ymax = (float(value) for value in box)
+    return f"([{xmin!r}, {xmax!r}], [{ymin!r}, {ymax!r}])"
+
+def grid_size(box: tuple, resolution: float) -> tuple:
+    """
+    returns the number of columns and rows of the grid whose origin is the bounds' (xmin, ymin),
+    the last column and row cover the bounds' xmax and ymax like the mosaic of the tiles does
+
+    Parameters
+    ----------
+    box: tuple : a (xmin, ymin, xmax, ymax) tuple
+
+    resolution: float : cell size of the grid
+
+    Returns: a tuple of form (width, height)
+    -------
+
+    """
+    xmin, ymin, xmax, ymax = box
+    # rounded first so that a bounds a whole number of cells wide gets no extra column
+    return (max(1, math.ceil(round((xmax - xmin) / resolution, 6))),
+            max(1, math.ceil(round((ymax - ymin) / resolution, 6))))
+
+def split_bounds(box: tuple, tile_size: float, overlap: float = 0, resolution: float = 1) -> list:
+    """
+    splits bounds into a grid of tiles, every tile is read with an overlap around it so that
+    interpolation at the tile's edges sees the same neighbouring points as it would without tiling
+
+    tile_size and overlap are rounded up to multiples of resolution so that the rasters of
+    all the tiles lie on the same grid, whose origin is the bounds' (xmin, ymin)
+
+    Parameters
+    ----------
+    box: tuple : a (xmin, ymin, xmax, ymax) tuple
+
+    tile_size: float : width and height of a tile in the bounds' units
+
+    overlap: float : distance the read bounds of a tile extend past the tile
+         (Default value = 0)
+
+    resolution: float : cell size of the rasters created from the tiles
+         (Default value = 1)
+
+    Returns: a list of (core, read) tuples where core is the part of the bounds the tile covers,
+            clipped to the bounds, and read is core expanded by the overlap. Both are aligned to
+            the raster grid.
+    -------
+
+    """
+    if tile_size <= 0:
+        raise ValueError(f"tile_size must be positive, got {tile_size}")
+
+    xmin, ymin, xmax, ymax = box
+    cells = math.ceil(tile_size / resolution)
+    overlap_cells = math.ceil(overlap / resolution)
+    step = cells * resolution
+    margin = overlap_cells * resolution
+    columns = max(1, math.ceil((xmax - xmin) / step))
+    rows = max(1, math.ceil((ymax - ymin) / step))
+
+    tiles = []
+    for row in range(rows):
+        for column in range(columns):
+            core = (xmin + column * step, ymin + row * step,
+                    min(xmin + (column + 1) * step, xmax), min(ymin + (row + 1) * step, ymax))
+            read = (core[0] - margin, core[1] - margin,
+                    xmin + (column + 1) * step + margin, ymin + (row + 1) * step + margin)
+            tiles.append((core, read))
+
+    return tiles
+
+def bounds_to_boxes(bounds) -> list:
+    """
+    converts many bounds to (xmin, ymin, xmax, ymax) tuples
+
+    Parameters
+    ----------
+    bounds : a list of bounds strings or (xmin, ymin, xmax, ymax) tuples, or a GeoDataFrame /
+             GeoSeries whose geometries' bounding boxes are used
+
+    Returns: a list of (xmin, ymin, xmax, ymax) tuples
+    -------
+
+    """
+    if hasattr(bounds, "bounds"):
+        return [tuple(float(v) for v in row) for row in bounds.bounds.to_numpy()]
+    return [parse_bounds(b) if isinstance(b, str) else tuple(float(v) for v in b) for b in bounds]
+
+def merge_boxes(boxes: list, gap: float = 0, max_size: float = None) -> list:
+    """
+    merges boxes that overlap or lie within gap of each other into the boxes of shared reads
+
+    Parameters
+    ----------
+    boxes: list : a list of (xmin, ymin, xmax, ymax) tuples
+
+    gap: float : boxes closer than gap are merged, 0 merges the overlapping and touching boxes
+         (Default value = 0)
+
+    max_size: float : largest width or height of a merged box, boxes are not merged past it
+         (Default value = None)
+
+    Returns: a list of (merged box, indices of the boxes inside it) tuples
+    -------
+
+    """
+    groups = [(tuple(box), [i]) for i, box in enumerate(boxes)]
+    merged = True
+    # merging two boxes can make their union reach a third one, so merge until nothing changes
+    while merged:
+        merged = False
+        result = []
+        for box, indices in groups:
+            for i, (other, other_indices) in enumerate(result):
+                if box[0] > other[2] + gap or other[0] > box[2] + gap or \
+                        box[1] > other[3] + gap or other[1] > box[3] + gap:
+                    continue
+                union = (min(box[0], other[0]), min(box[1], other[1]),
+                         max(box[2], other[2]), max(box[3], other[3]))
+                if max_size is not None and max(union[2] - union[0], union[3] - union[1]) > max_size:
+                    continue
+                result[i] = (union, other_indices + indices)
+                merged = True
+                break
+            else:
+                result.append((box, indices))
+        groups = result
+
+    return [(box, sorted(indices)) for box, indices in groups]
@@ -0,0 +1,243 @@
+import math
+import numpy as np
+
+FLOW_METHODS = ("d8", "dinf")
+
+# (row, column) offsets of the 8 neighbours of a cell, rows counted from the northern edge
+NEIGHBOURS = ((0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1), (1, 0), (1, 1))
+
+# the 8 triangular facets of d-infinity, as (cardinal neighbour, diagonal neighbour) offsets
+FACETS = (((0, 1), (-1, 1)), ((-1, 0), (-1, 1)), ((-1, 0), (-1, -1)), ((0, -1), (-1, -1)),
+          ((0, -1), (1, -1)), ((1, 0), (1, -1)), ((1, 0), (1, 1)), ((0, 1), (1, 1)))
+
+def _neighbour(elevation: np.ndarray, offset: tuple) -> np.ndarray:
+    """
+    returns the elevation of every cell's neighbour at offset, nan outside the grid
+    """
+    rows, columns = elevation.shape
+    row_offset, column_offset = offset
+    padded = np.pad(elevation, 1, constant_values=np.nan)
+    return padded[1 + row_offset:1 + row_offset + rows, 1 + column_offset:1 + column_offset + columns]
+
+def _neighbour_index(shape: tuple, offset: tuple) -> np.ndarray:
+    """
+    returns the flat index of every cell's neighbour at offset, -1 outside the grid
+    """
+    rows, columns = shape
+    row, column = np.indices(shape)
+    row = row + offset[0]
+    column = column + offset[1]
+    inside = (row >= 0) & (row < rows) & (column >= 0) & (column < columns)
+    return np.where(inside, row * columns + column, -1)
+
+def slope(elevation: np.ndarray, resolution: float) -> np.ndarray:
+    """
+    computes the tangent of the slope of every cell from central differences
+
+    Parameters
+    ----------
+    elevation: np.ndarray : 2d grid of elevations, nan for cells without data
+
+    resolution: float : cell size
+
+    Returns: a 2d array of tan(slope)
+    -------
+
+    """
+    if min(elevation.shape) < 2:
+        return np.zeros(elevation.shape)
+    dz_dy, dz_dx = np.gradient(elevation, resolution)
+    return np.hypot(dz_dx, dz_dy)
+
+def steepest_descent(elevation: np.ndarray, resolution: float) -> tuple:
+    """
+    finds the steepest downslope neighbour of every cell
+
+    Parameters
+    ----------
+    elevation: np.ndarray : 2d grid of elevations, nan for cells without data
+
+    resolution: float : cell size
+
+    Returns: a tuple of form (drop, receivers), drop being the 2d grid of the tangent of the
+            steepest downslope direction (0 for pits) and receivers the flat index of the
+            neighbour in that direction (-1 for pits)
+    -------
+
+    """
+    steepest = np.zeros(elevation.shape)
+    receivers = np.full(elevation.shape, -1, dtype=np.int64)
+
+    for offset in NEIGHBOURS:
+        distance = resolution * math.hypot(*offset)
+        drop = (elevation - _neighbour(elevation, offset)) / distance
+        steeper = drop > steepest
+        steepest = np.where(steeper, drop, steepest)
+        receivers = np.where(steeper, _neighbour_index(elevation.shape, offset), receivers)
+
+    return steepest, receivers
+
+def d8_flow_direction(elevation: np.ndarray, resolution: float) -> tuple:
+    """
+    sends the flow of every cell to its steepest downslope neighbour
+
+    Parameters
+    ----------
+    elevation: np.ndarray : 2d grid of elevations, nan for cells without data
+
+    resolution: float : cell size
+
+    Returns: a tuple of form (receivers, weights), receivers being an (n, 1) array with the
+            flat index of the cell every cell drains to (-1 for pits and edges) and weights
+            the fraction of the flow sent to it
+    -------
+
+    """
+    _, receivers = steepest_descent(elevation, resolution)
+    receivers = receivers.reshape(-1, 1)
+    return receivers, (receivers >= 0).astype(np.float64)
+
+def dinf_flow_direction(elevation: np.ndarray, resolution: float) -> tuple:
+    """
+    splits the flow of every cell between the two neighbours bounding its steepest downslope
+    direction, using the triangular facets of Tarboton's d-infinity method
+
+    Parameters
+    ----------
+    elevation: np.ndarray : 2d grid of elevations, nan for cells without data
+
+    resolution: float : cell size
+
+    Returns: a tuple of form (receivers, weights) of (n, 2) arrays, see d8_flow_direction
+    -------
+
+    """
+    shape = elevation.shape
+    steepest = np.zeros(shape)
+    receivers = np.full(shape + (2,), -1, dtype=np.int64)
+    weights = np.zeros(shape + (2,))
+    max_angle = math.pi / 4
+
+    for cardinal, diagonal in FACETS:
+        e1 = _neighbour(elevation, cardinal)
+        e2 = _neighbour(elevation, diagonal)
+        s1 = (elevation - e1) / resolution
+        s2 = (e1 - e2) / resolution
+        angle = np.arctan2(s2, s1)
+        facet_slope = np.hypot(s1, s2)
+        # directions outside the facet are snapped to its edges
+        below = angle < 0
+        above = angle > max_angle
+        angle = np.clip(angle, 0, max_angle)
+        facet_slope = np.where(below, s1, facet_slope)
+        facet_slope = np.where(above, (elevation - e2) / (resolution * math.sqrt(2)), facet_slope)
+
+        steeper = np.nan_to_num(facet_slope, nan=0.0) > steepest
+        steepest = np.where(steeper, facet_slope, steepest)
+        share = angle / max_angle
+        cardinal_index = _neighbour_index(shape, cardinal)
+        diagonal_index = _neighbour_index(shape, diagonal)
+        receivers[..., 0] = np.where(steeper, cardinal_index, receivers[..., 0])
+        receivers[..., 1] = np.where(steeper, diagonal_index, receivers[..., 1])
+        weights[..., 0] = np.where(steeper, 1 - share, weights[..., 0])
+        weights[..., 1] = np.where(steeper, share, weights[..., 1])
+
+    receivers = receivers.reshape(-1, 2)
+    weights = weights.reshape(-1, 2)
+    # a receiver without data or without any share of the flow is dropped
+    flat = elevation.ravel()
+    unused = (receivers < 0) | (weights <= 0)
+    unused |= np.isnan(flat[np.where(receivers < 0, 0, receivers)])
+    receivers[unused] = -1
+    weights[unused] = 0
+    return receivers, weights
+
+def flow_accumulation(receivers: np.ndarray, weights: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    counts the number of cells draining through every cell, including the cell itself.
+
+    cells are processed in topological order: every round takes all the cells whose upslope
+    cells are done and pushes their accumulation to their receivers at once, so the work is
+    a handful of numpy calls per round instead of a recursion per cell
+
+    Parameters
+    ----------
+    receivers: np.ndarray : (n, k) flat indices of the cells every cell drains to, -1 for none
+
+    weights: np.ndarray : (n, k) fraction of the flow sent to each receiver
+
+    valid: np.ndarray : (n,) boolean mask of the cells with data
+
+    Returns: a 1d array of the accumulation of every cell, 0 for cells without data
+    -------
+
+    """
+    n = len(valid)
+    accumulation = valid.astype(np.float64)
+    draining = (receivers >= 0) & (weights > 0)
+    indegree = np.bincount(receivers[draining], minlength=n)
+    frontier = np.flatnonzero(valid & (indegree == 0))
+
+    while frontier.size:
+        targets = receivers[frontier]
+        sends = draining[frontier]
+        flow = (accumulation[frontier, np.newaxis] * weights[frontier])[sends]
+        cells, position = np.unique(targets[sends], return_inverse=True)
+        accumulation[cells] += np.bincount(position, weights=flow, minlength=len(cells))
+        indegree[cells] -= np.bincount(position, minlength=len(cells))
+        frontier = cells[indegree[cells] == 0]
+
+    return accumulation
+
+def twi(grid: np.ndarray, resolution: float, nodata: float = -9999, method: str = "d8",
+        min_slope: float = 1e-3) -> np.ndarray:
+    """
+    computes the topographic wetness index ln(a / tan(b)) of every cell of an elevation grid,
+    a being the upslope area draining through the cell per unit contour width and b the
+    cell's slope
+
+    Parameters
+    ----------
+    grid: np.ndarray : 2d grid of elevations
+
+    resolution: float : cell size
+
+    nodata: float : value of the cells without data
+         (Default value = -9999)
+
+    method: str : "d8" or "dinf", how the flow of a cell is routed to its neighbours
+         (Default value = "d8")
+
+    min_slope: float : lower bound of tan(b) so that flat cells get a finite index
+         (Default value = 1e-3)
+
+    Returns: a 2d grid aligned to the input with nodata where the input has no data
+    -------
+
+    """
+    if method not in FLOW_METHODS:
+        raise ValueError(f"Unrecognised method {method}, expected one of {FLOW_METHODS}")
+
+    elevation = np.asarray(grid, dtype=np.float64)
+    missing = np.isnan(elevation)
+    if nodata is not None and not np.isnan(nodata):
+        missing |= elevation == nodata
+    elevation = np.where(missing, np.nan, elevation)
+
+    drop, steepest_receivers = steepest_descent(elevation, resolution)
+    if method == "d8":
+        receivers = steepest_receivers.reshape(-1, 1)
+        weights = (receivers >= 0).astype(np.float64)
+    else:
+        receivers, weights = dinf_flow_direction(elevation, resolution)
+
+    accumulation = flow_accumulation(receivers, weights, ~missing.ravel()).reshape(grid.shape)
+    # central differences are undefined next to cells without data, the steepest descent
+    # towards the neighbours that have data is used there instead
+    tan_slope = slope(elevation, resolution)
+    undefined = np.isnan(tan_slope)
+    tan_slope[undefined] = drop[undefined]
+    tan_slope = np.maximum(tan_slope, min_slope)
+    index = np.log(accumulation * resolution / tan_slope, where=~missing,
+                   out=np.full(grid.shape, float(np.nan if nodata is None else nodata)))
+    return index
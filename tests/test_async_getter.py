@@ -0,0 +1,115 @@
+import sys
+import json
+import time
+import asyncio
+import threading
+import unittest
+import geopandas as gpd
+from pathlib import Path
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from src.lidarToGeo.catalog import Catalog
+from src.lidarToGeo.ept_info import Info
+
+try:
+    from src.lidarToGeo import async_getter
+    from src.lidarToGeo.async_getter import AsyncRasterGetter
+    from src.lidarToGeo.get_data import RasterGetter
+except ImportError:
+    # pdal and gdal are not installed
+    async_getter = None
+
+BOUNDS = "([-10425171.940, -10423171.940], [5164494.710, 5166494.710])"
+REGIONS = ["A_2017/", "B_2018/", "C_2019/"]
+
+class StubProcessRegion(object):
+    """
+    stands in for get_data._process_region, every region sleeps for its delay and sets the
+    shared getter's gdf like the real one does
+    """
+    def __init__(self, delays: dict) -> None:
+        self.delays = delays
+        self.started = []
+        self.lock = threading.Lock()
+
+    def __call__(self, raster_getter, region: str, save_png: bool, resolution: int,
+                 in_memory: bool = False, vectorize: str = "points") -> gpd.GeoDataFrame:
+        with self.lock:
+            self.started.append(region)
+        time.sleep(self.delays.get(region, 0))
+        gdf = gpd.GeoDataFrame({"region": [region]}, geometry=gpd.points_from_xy([0], [0]))
+        raster_getter.gdf = gdf
+        return gdf
+
+@unittest.skipIf(async_getter is None, "pdal and gdal are not installed")
+class TestAsyncRasterGetter(unittest.TestCase):
+    """
+        A class for unit-testing function in the async_getter.py file offline,
+        _process_region is stubbed
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        ept = json.dumps({"points": 10, "bounds": [-10430000, 5160000, 0, -10420000, 5170000, 500]})
+        getter = RasterGetter(BOUNDS, 3857, catalog=Catalog({region: Info(ept) for region in REGIONS}))
+        getter.regions = REGIONS
+        self.executor = ThreadPoolExecutor(max_workers=len(REGIONS))
+        self.getter = AsyncRasterGetter(getter, self.executor)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def region_gdf_dict(self, stub, **kwargs) -> dict:
+        with mock.patch.object(async_getter, "_process_region", stub):
+            return asyncio.run(self.getter.region_gdf_dict(False, **kwargs))
+
+    def test_result_order(self):
+        # the first region finishes last
+        stub = StubProcessRegion({"A_2017/": 0.3, "B_2018/": 0.1})
+        region_gdf = self.region_gdf_dict(stub)
+        self.assertEqual(list(region_gdf), ["2017", "2018", "2019"])
+        for year, region in zip(region_gdf, REGIONS):
+            self.assertEqual(region_gdf[year]["region"].tolist(), [region])
+        # the shared getter is left with the last region's gdf, not the last to finish
+        self.assertIs(self.getter.getter.gdf, region_gdf["2019"])
+
+    def test_region_timeout(self):
+        stub = StubProcessRegion({"B_2018/": 0.5})
+        region_gdf = self.region_gdf_dict(stub, region_timeout=0.2)
+        self.assertEqual(list(region_gdf), ["2017", "2019"])
+
+    def test_timeout(self):
+        stub = StubProcessRegion({"B_2018/": 0.5})
+        with self.assertRaises(asyncio.TimeoutError):
+            self.region_gdf_dict(stub, timeout=0.1)
+
+    def test_cancel(self):
+        # one worker, the regions queued behind the first never start once cancelled
+        self.executor.shutdown()
+        self.executor = self.getter.executor = ThreadPoolExecutor(max_workers=1)
+        stub = StubProcessRegion({"A_2017/": 0.3})
+
+        async def main():
+            task = asyncio.ensure_future(self.getter.region_gdf_dict(False))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with mock.patch.object(async_getter, "_process_region", stub):
+            asyncio.run(main())
+            self.executor.shutdown()
+        self.assertEqual(stub.started, ["A_2017/"])
+
+
+if __name__ == '__main__':
+    unittest.main()
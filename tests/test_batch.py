@@ -0,0 +1,119 @@
+import sys
+import json
+import unittest
+import numpy as np
+import geopandas as gpd
+from pathlib import Path
+from unittest import mock
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from src.lidarToGeo.catalog import Catalog
+from src.lidarToGeo.ept_info import Info
+from src.lidarToGeo.region_index import parse_bounds
+
+try:
+    from src.lidarToGeo.batch import BatchRasterGetter, clip_geodataframe
+    from src.lidarToGeo.get_data import RasterGetter
+except ImportError:
+    # pdal and gdal are not installed
+    BatchRasterGetter = None
+
+def ept(bounds):
+    return json.dumps({"points": 10, "bounds": bounds})
+
+class StubInMemory(object):
+    """
+    stands in for RasterGetter.get_geodataframe_in_memory, returns a point every unit of
+    the getter's bounds whose elevation is x + y, and records the getters it was called on
+    """
+    def __init__(self) -> None:
+        self.calls = []
+
+    def __call__(self, getter, region: str, save_png: bool, resolution: int) -> gpd.GeoDataFrame:
+        self.calls.append((getter, region, getter.bounds, list(getter.regions)))
+        if region == "C_2021/":
+            raise RuntimeError("no points in the bounds")
+        xmin, ymin, xmax, ymax = parse_bounds(getter.bounds)
+        x, y = np.meshgrid(np.arange(xmin, xmax + 1), np.arange(ymin, ymax + 1))
+        x, y = x.ravel(), y.ravel()
+        return gpd.GeoDataFrame({"elevation": x + y}, geometry=gpd.points_from_xy(x, y))
+
+@unittest.skipIf(BatchRasterGetter is None, "pdal and gdal are not installed")
+class TestBatchRasterGetter(unittest.TestCase):
+    """
+        A class for unit-testing function in the batch.py file offline,
+        get_geodataframe_in_memory is stubbed
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.catalog = Catalog({"A_2019/": Info(ept([0, 0, 0, 100, 100, 10])),
+                                "B_2020/": Info(ept([200, 0, 0, 300, 100, 10])),
+                                "C_2021/": Info(ept([400, 0, 0, 500, 100, 10]))})
+        self.boxes = [(10, 10, 20, 20), (15, 15, 30, 30), (60, 60, 70, 70), (210, 10, 220, 20),
+                      (410, 10, 420, 20), (900, 900, 910, 910)]
+        self.batch = BatchRasterGetter(self.boxes, 3857, catalog=self.catalog)
+
+    def test_empty_bounds(self):
+        with self.assertRaises(ValueError):
+            BatchRasterGetter([], 3857, catalog=self.catalog)
+
+    def test_reads(self):
+        self.assertEqual(self.batch.reads(), [
+            ("A_2019/", (10, 10, 30, 30), [0, 1]),
+            ("A_2019/", (60, 60, 70, 70), [2]),
+            ("B_2020/", (210, 10, 220, 20), [3]),
+            ("C_2021/", (410, 10, 420, 20), [4]),
+        ])
+
+    def test_region_gdf_dicts(self):
+        stub = StubInMemory()
+        with mock.patch.object(RasterGetter, "get_geodataframe_in_memory", autospec=True, side_effect=stub):
+            results = self.batch.region_gdf_dicts(resolution=1)
+
+        self.assertEqual([list(result) for result in results],
+                         [["2019"], ["2019"], ["2019"], ["2020"], [], []])
+        # every request gets the merged read clipped to its own bounds
+        for box, result in zip(self.boxes, results):
+            for gdf in result.values():
+                x, y = gdf.geometry.x.to_numpy(), gdf.geometry.y.to_numpy()
+                self.assertEqual(len(gdf), (box[2] - box[0] + 1) * (box[3] - box[1] + 1))
+                self.assertTrue(((x >= box[0]) & (x <= box[2]) & (y >= box[1]) & (y <= box[3])).all())
+                np.testing.assert_array_equal(gdf["elevation"].to_numpy(), x + y)
+        # the first two bounds are served by one read
+        self.assertIsNot(results[0]["2019"], results[1]["2019"])
+
+        # every read is made by its own copy of the batch's getter, on the merged bounds
+        getters = [call[0] for call in stub.calls]
+        self.assertEqual(len(set(map(id, getters))), 4)
+        self.assertNotIn(self.batch.getter, getters)
+        self.assertEqual([call[2] for call in stub.calls],
+                         ["([10.0, 30.0], [10.0, 30.0])", "([60.0, 70.0], [60.0, 70.0])",
+                          "([210.0, 220.0], [10.0, 20.0])", "([410.0, 420.0], [10.0, 20.0])"])
+        self.assertEqual([call[3] for call in stub.calls],
+                         [["A_2019/"], ["A_2019/"], ["B_2020/"], ["C_2021/"]])
+        self.assertEqual(self.batch.getter.bounds, "([10.0, 20.0], [10.0, 20.0])")
+        # the copies share the batch's metrics and catalog, and never queried the regions
+        for getter in getters:
+            self.assertIs(getter.metrics, self.batch.getter.metrics)
+            self.assertIs(getter.catalog, self.catalog)
+        self.assertIsNone(self.batch.getter._regions)
+
+    def test_clip_geodataframe(self):
+        gdf = gpd.GeoDataFrame({"elevation": [1.0, 2.0, 3.0]},
+                               geometry=gpd.points_from_xy([0, 5, 10], [0, 5, 11]), index=[4, 5, 6])
+        clipped = clip_geodataframe(gdf, (0, 0, 10, 10))
+        # points on the edges are kept
+        self.assertEqual(clipped["elevation"].tolist(), [1.0, 2.0])
+        self.assertEqual(list(clipped.index), [0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import sys
+import json
+import asyncio
+import pickle
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from src.lidarToGeo import catalog as catalog_module
+from src.lidarToGeo.catalog import Catalog
+from src.lidarToGeo.catalog_cache import CatalogCache
+from src.lidarToGeo.ept_info import Info
+
+def ept(bounds):
+    return json.dumps({"points": 10, "bounds": bounds})
+
+class TestCatalog(unittest.TestCase):
+    """
+        A class for unit-testing function in the catalog.py file
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = CatalogCache("bucket", cache_dir=self.tmp.name)
+        self.cache.write({
+            "A/": {"etag": '"a"', "last_modified": None, "ept": ept([0, 0, 0, 10, 10, 1])},
+            "B/": {"etag": '"b"', "last_modified": None, "ept": ept([5, 5, 0, 25, 15, 1])},
+        })
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_import_creates_no_client(self):
+        # in a fresh interpreter, the other tests of this process may have created the client
+        code = ("import sys; import src.lidarToGeo.catalog, src.lidarToGeo.load_data as load_data; "
+                "sys.exit(load_data._s3 is not None)")
+        result = subprocess.run([sys.executable, "-c", code], cwd=str(parent_dir),
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_lazy_load(self):
+        catalog = Catalog(cache=self.cache)
+        self.assertFalse(catalog.loaded())
+        self.assertEqual(catalog.query("([6, 8], [6, 8])"), ["A/", "B/"])
+        self.assertTrue(catalog.loaded())
+        self.assertEqual(catalog.info("B/").bounds, [5, 5, 0, 25, 15, 1])
+
+    def test_concurrent_load(self):
+        catalog = Catalog(cache=self.cache)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            indexes = list(executor.map(lambda _: catalog.index, range(16)))
+        self.assertTrue(all(index is indexes[0] for index in indexes))
+
+    def test_concurrent_load_async(self):
+        calls = []
+
+        async def load_ept_json_async(use_cache, refresh, cache, config, stats):
+            calls.append(refresh)
+            await asyncio.sleep(0.05)
+            stats["bytes_fetched"] = 100
+            return {"C/": Info(ept([0, 0, 0, 1, 1, 1]))}
+
+        async def main(catalog):
+            await asyncio.gather(*[catalog.load_async() for _ in range(8)])
+
+        catalog = Catalog(cache=self.cache)
+        with mock.patch.object(catalog_module, "load_ept_json_async", load_ept_json_async):
+            asyncio.run(main(catalog))
+            # a new event loop gets its own lock
+            asyncio.run(catalog.load_async(refresh=True))
+        self.assertEqual(calls, [False, True])
+        self.assertEqual(catalog.bytes_fetched, 200)
+        self.assertEqual(list(pickle.loads(pickle.dumps(catalog)).region_ept_info), ["C/"])
+
+    def test_injected(self):
+        catalog = Catalog({"C/": Info(ept([0, 0, 0, 1, 1, 1]))})
+        self.assertTrue(catalog.loaded())
+        self.assertEqual(catalog.query_many(["([0, 1], [0, 1])", "([2, 3], [2, 3])"]), [["C/"], []])
+
+    def test_subset_pickles(self):
+        catalog = Catalog(cache=self.cache)
+        subset = pickle.loads(pickle.dumps(catalog.subset(["B/"])))
+        self.assertEqual(list(subset.region_ept_info), ["B/"])
+        self.assertEqual(subset.query("([20, 21], [10, 11])"), ["B/"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from src.lidarToGeo.catalog_cache import CatalogCache
+
+class TestCatalogCache(unittest.TestCase):
+    """
+        A class for unit-testing function in the catalog_cache.py file
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = CatalogCache("usgs-lidar-public", cache_dir=self.tmp_dir.name, ttl=60)
+        self.regions = {"IA_FullState/": {"etag": '"abc"', "last_modified": None,
+                                          "ept": json.dumps({"points": 10})}}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_read_missing(self):
+        catalog = self.cache.read()
+        self.assertEqual(catalog["regions"], {})
+        self.assertFalse(self.cache.is_fresh(catalog))
+
+    def test_write_read(self):
+        self.cache.write(self.regions)
+        catalog = self.cache.read()
+        self.assertEqual(catalog["regions"], self.regions)
+        self.assertTrue(self.cache.is_fresh(catalog))
+
+    def test_expired(self):
+        self.cache.ttl = 0
+        self.cache.write(self.regions)
+        self.assertFalse(self.cache.is_fresh(self.cache.read()))
+
+    def test_other_version_ignored(self):
+        self.cache.write(self.regions)
+        with open(self.cache.filename, "r") as cache_file:
+            catalog = json.load(cache_file)
+        catalog["format_version"] = -1
+        with open(self.cache.filename, "w") as cache_file:
+            json.dump(catalog, cache_file)
+        self.assertEqual(self.cache.read()["regions"], {})
+
+    def test_clear(self):
+        self.cache.write(self.regions)
+        self.cache.clear()
+        self.assertFalse(os.path.exists(self.cache.filename))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,37 @@
 import unittest
 import sys
-import os
+import json
+import pickle
 import requests
+from pathlib import Path
+from unittest import mock
+from pyproj import CRS
 
-sys.path.append(os.path.abspath(os.path.join('../')))
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
 
-from ept_info import Info
+import src.lidarToGeo.ept_info as ept_info
+from src.lidarToGeo.ept_info import Info, srs_identifier
+
+EPT = json.dumps({
+    "bounds": [-11752672, 4740364, -68269, -11610700, 4882336, 73703],
+    "boundsConforming": [-11752670, 4750545, 1136, -11610701, 4872154, 4297],
+    "dataType": "laszip",
+    "hierarchyType": "json",
+    "points": 33711288742,
+    "schema": [
+        {"name": "X", "type": "signed", "size": 4, "scale": 0.01, "offset": -11681686},
+        {"name": "Y", "type": "signed", "size": 4, "scale": 0.01, "offset": 4811350},
+        {"name": "Z", "type": "signed", "size": 4, "scale": 0.01, "offset": 2717},
+        {"name": "Intensity", "type": "unsigned", "size": 2},
+        {"name": "Classification", "type": "unsigned", "size": 1},
+        {"name": "GpsTime", "type": "float", "size": 8}
+    ],
+    "span": 256,
+    "srs": {"authority": "EPSG", "horizontal": "3857", "wkt": CRS.from_epsg(3857).to_wkt()},
+    "version": "1.1.0"
+})
 
 url = "https://s3-us-west-2.amazonaws.com/usgs-lidar-public/USGS_LPC_CO_SoPlatteRiver_Lot5_2013_LAS_2015/ept.json"
 
@@ -66,6 +92,64 @@ class TestInfo(unittest.TestCase):
         self.assertEqual(self.ept.get_hierarchytype(), actual_hierarchy)
 
 
+class TestInfoOffline(unittest.TestCase):
+    """
+        A class for unit-testing function in the ept_info.py file on a literal
+        ept.json, nothing is downloaded
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.ept = Info(EPT)
+
+    def test_summary_fields(self):
+        self.assertEqual(self.ept.summary(), {
+            "bounds": [-11752672, 4740364, -68269, -11610700, 4882336, 73703],
+            "points": 33711288742,
+            "srs_id": "EPSG:3857"
+        })
+        self.assertEqual(self.ept.length(), 33711288742)
+        self.assertEqual(self.ept.srs_id, "EPSG:3857")
+        self.assertIsNone(srs_identifier({"wkt": ""}))
+
+    def test_fields(self):
+        self.assertEqual(self.ept.span, 256)
+        self.assertEqual(self.ept.version, "1.1.0")
+        self.assertEqual(self.ept.conforming, [-11752670, 4750545, 1136, -11610701, 4872154, 4297])
+        self.assertEqual(self.ept.datatype, "laszip")
+        self.assertEqual(self.ept.hierarchytype, "json")
+        self.assertEqual(self.ept.dtype.names, ("X", "Y", "Z", "Intensity", "Classification", "GpsTime"))
+        self.assertEqual(self.ept.srs.to_epsg(), 3857)
+
+    def test_parsing_deferred_and_cached(self):
+        with mock.patch.object(ept_info.json, "loads", wraps=json.loads) as loads:
+            info = Info(EPT, **self.ept.summary())
+            self.assertEqual(info.bounds, self.ept.bounds)
+            # the summary fields are read without parsing the json
+            self.assertEqual(loads.call_count, 0)
+            info.span, info.version, info.schema, info.datatype
+            info.span
+            self.assertEqual(loads.call_count, 1)
+
+    def test_derived_objects_cached(self):
+        self.assertIs(self.ept.schema, self.ept.schema)
+        self.assertIs(self.ept.dtype, self.ept.dtype)
+        self.assertIs(self.ept.srs, self.ept.srs)
+
+    def test_slots(self):
+        self.assertFalse(hasattr(self.ept, "__dict__"))
+        with self.assertRaises(AttributeError):
+            self.ept.extra = 1
+        # the parsed json and derived objects are kept when it is sent to a worker
+        self.ept.schema
+        copied = pickle.loads(pickle.dumps(self.ept))
+        self.assertEqual(copied.summary(), self.ept.summary())
+        self.assertEqual(copied.dtype, self.ept.dtype)
+
+
 if __name__ == '__main__':
 	unittest.main()
-    
\ No newline at end of file
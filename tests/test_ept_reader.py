@@ -0,0 +1,140 @@
+import sys
+import json
+import asyncio
+import unittest
+import threading
+import numpy as np
+from pathlib import Path
+from unittest import mock
+from aiohttp import web
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from src.lidarToGeo.ept_info import Info
+from src.lidarToGeo.ept_reader import EptReader, node_bounds
+from src.lidarToGeo.load_data import FetchConfig
+
+SCHEMA = [
+    {"name": "X", "type": "signed", "size": 4, "scale": 0.01, "offset": 0},
+    {"name": "Y", "type": "signed", "size": 4, "scale": 0.01, "offset": 0},
+    {"name": "Z", "type": "signed", "size": 4, "scale": 0.01, "offset": 0},
+    {"name": "Classification", "type": "unsigned", "size": 1},
+]
+
+def make_dataset() -> dict:
+    """
+    builds a two level binary ept dataset over the cube [0, 100] whose depth 1 nodes are
+    in a separate hierarchy file, returns a dictionary of form {path: content}
+    """
+    info = Info(json.dumps({"bounds": [0, 0, 0, 100, 100, 100], "points": 0, "span": 4,
+                            "dataType": "binary", "hierarchyType": "json", "schema": SCHEMA}))
+    files = {"ept-hierarchy/0-0-0-0.json": json.dumps({"0-0-0-0": 2, "1-0-0-0": -1,
+                                                       "1-1-0-0": -1})}
+    files["ept-hierarchy/1-0-0-0.json"] = json.dumps({"1-0-0-0": 2})
+    files["ept-hierarchy/1-1-0-0.json"] = json.dumps({"1-1-0-0": 2})
+    points = {"0-0-0-0": [(10, 10, 1), (90, 10, 1)],
+              "1-0-0-0": [(20, 20, 2), (40, 30, 2)],
+              "1-1-0-0": [(60, 20, 3), (80, 40, 3)]}
+    for key, rows in points.items():
+        data = np.zeros(len(rows), dtype=info.dtype)
+        for i, (x, y, z) in enumerate(rows):
+            data[i] = (x * 100, y * 100, z * 100, 2)
+        files[f"ept-data/{key}.bin"] = data.tobytes()
+    return info, files
+
+class TestEptReader(unittest.TestCase):
+    """
+        A class for unit-testing function in the ept_reader.py file against
+        a local http server
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.info, self.files = make_dataset()
+        self.requested = []
+
+    async def handler(self, request):
+        path = request.match_info["path"]
+        self.requested.append(path)
+        if path not in self.files:
+            return web.Response(status=404)
+        return web.Response(body=self.files[path])
+
+    def read(self, bounds, **kwargs):
+        async def start():
+            app = web.Application()
+            app.router.add_get("/{path:.*}", self.handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            return runner, site._server.sockets[0].getsockname()[1]
+
+        loop = asyncio.new_event_loop()
+        runner, port = loop.run_until_complete(start())
+        reader = EptReader(self.info, f"http://127.0.0.1:{port}/",
+                           FetchConfig(concurrency=4, retries=0))
+        try:
+            # the reader runs its own event loop, the server's loop runs in a thread
+            thread = threading.Thread(target=loop.run_forever)
+            thread.start()
+            return reader, reader.read(bounds, **kwargs)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.run_until_complete(runner.cleanup())
+            loop.close()
+
+    def test_node_bounds(self):
+        self.assertEqual(node_bounds("1-1-0-1", [0, 0, 0, 100, 100, 100]),
+                         (50.0, 0.0, 50.0, 100.0, 50.0, 100.0))
+
+    def test_depth_for_resolution(self):
+        reader = EptReader(self.info, "http://localhost/")
+        self.assertEqual(reader.depth_for_resolution(25), 0)
+        self.assertEqual(reader.depth_for_resolution(12.5), 1)
+
+    def test_decode_projection(self):
+        reader = EptReader(self.info, "http://localhost/", dimensions=["Z", "X"])
+        points = reader.decode(self.files["ept-data/1-0-0-0.bin"])
+        self.assertEqual(points.dtype.names, ("Z", "X"))
+        np.testing.assert_allclose(points["X"], [20, 40])
+        np.testing.assert_allclose(points["Z"], [2, 2])
+
+    def test_datatype_checked(self):
+        data = json.loads(self.info.raw)
+        zstandard_info = Info(json.dumps(dict(data, dataType="zstandard")))
+        # None in sys.modules makes the import fail whether zstandard is installed or not
+        with mock.patch.dict(sys.modules, {"zstandard": None}):
+            with self.assertRaisesRegex(ImportError, "install the zstandard package"):
+                EptReader(zstandard_info, "http://localhost/")
+        with self.assertRaises(ValueError):
+            EptReader(Info(json.dumps(dict(data, dataType="brotli"))), "http://localhost/")
+
+    def test_read_all(self):
+        reader, points = self.read((0, 0, 100, 100))
+        self.assertEqual(len(points), 6)
+        self.assertEqual(points["Z"].dtype, np.float64)
+
+    def test_read_bounds(self):
+        reader, points = self.read((30, 0, 70, 100))
+        np.testing.assert_allclose(sorted(points["X"]), [40, 60])
+        self.assertNotIn("ept-hierarchy/0-0-0-0.json", self.requested[1:])
+
+    def test_read_depth(self):
+        reader, points = self.read((0, 0, 40, 100), depth=0)
+        np.testing.assert_allclose(points["X"], [10])
+        self.assertEqual([p for p in self.requested if p.startswith("ept-data")],
+                         ["ept-data/0-0-0-0.bin"])
+        self.assertEqual([p for p in self.requested if p.startswith("ept-hierarchy")],
+                         ["ept-hierarchy/0-0-0-0.json"])
+
+
+if __name__ == '__main__':
+    unittest.main()
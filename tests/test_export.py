@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+import geopandas as gpd
+from pathlib import Path
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from src.lidarToGeo.export import points_to_wkb, points_to_geoparquet, points_to_feather
+
+class TestExport(unittest.TestCase):
+    """
+        A class for unit-testing function in the export.py file
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.x = np.array([1.5, 2.5, 3.5])
+        self.y = np.array([10.0, 20.0, 30.0])
+        self.columns = {"elevation": np.array([100.0, 200.0, 300.0])}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_points_to_wkb(self):
+        wkb = points_to_wkb(self.x, self.y)
+        expected = gpd.GeoSeries(gpd.points_from_xy(self.x, self.y)).to_wkb()
+        self.assertEqual(wkb.to_pylist(), list(expected))
+
+    def test_points_to_wkb_chunks(self):
+        x = np.arange(7, dtype=np.float64)
+        wkb = points_to_wkb(x, -x, chunk_size=3)
+        self.assertEqual([len(chunk) for chunk in wkb.chunks], [3, 3, 1])
+        self.assertEqual(wkb.to_pylist(), list(gpd.GeoSeries(gpd.points_from_xy(x, -x)).to_wkb()))
+        with self.assertRaises(ValueError):
+            points_to_wkb(x, x, chunk_size=2 ** 31)
+
+    def test_geoparquet_round_trip(self):
+        filename = os.path.join(self.tmp_dir.name, "points.parquet")
+        points_to_geoparquet(self.x, self.y, self.columns, 3857, filename)
+        gdf = gpd.read_parquet(filename)
+        self.assertEqual(gdf.crs.to_epsg(), 3857)
+        np.testing.assert_array_equal(gdf.geometry.x, self.x)
+        np.testing.assert_array_equal(gdf["elevation"], self.columns["elevation"])
+
+    def test_feather_round_trip(self):
+        filename = os.path.join(self.tmp_dir.name, "points.feather")
+        points_to_feather(self.x, self.y, self.columns, "EPSG:3857", filename)
+        gdf = gpd.read_feather(filename)
+        np.testing.assert_array_equal(gdf.geometry.y, self.y)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,92 @@
+import os
 import unittest
 import sys
+import json
+import tempfile
+import pickle
+import numpy as np
 import geopandas as gpd
 from pathlib import Path
+from unittest import mock
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 test_file = Path(__file__).resolve()
 parent_dir = test_file.parents[1]
 sys.path.append(str(parent_dir))
 
-from get_data import RasterGetter
+from src.lidarToGeo.catalog import Catalog
+from src.lidarToGeo.ept_info import Info
+from src.lidarToGeo.point_filter import PointFilter
+from src.lidarToGeo.result_cache import ResultCache, request_key
+from src.lidarToGeo.region_index import parse_bounds
+from src.lidarToGeo.tiling import split_bounds
 
+try:
+    from src.lidarToGeo import get_data
+    from src.lidarToGeo.get_data import RasterGetter
+    from src.lidarToGeo import raster
+    from src.lidarToGeo.raster import CogOptions
+except ImportError:
+    # pdal and gdal are not installed
+    get_data = None
+
+BOUNDS = "([-10425171.940, -10423171.940], [5164494.710, 5166494.710])"
+SCHEMA = [
+    {"name": "X", "type": "signed", "size": 4, "scale": 0.01, "offset": 0},
+    {"name": "Y", "type": "signed", "size": 4, "scale": 0.01, "offset": 0},
+    {"name": "Z", "type": "signed", "size": 4, "scale": 0.01, "offset": 0},
+    {"name": "Intensity", "type": "unsigned", "size": 2},
+    {"name": "Classification", "type": "unsigned", "size": 1},
+]
+
+def offline_catalog(regions: list) -> Catalog:
+    """
+    returns a catalog of regions that cover the bounds, nothing is downloaded
+    """
+    ept = json.dumps({"points": 10, "bounds": [-10430000, 5160000, 0, -10420000, 5170000, 500],
+                      "srs": {"authority": "EPSG", "horizontal": "3857"}, "schema": SCHEMA})
+    return Catalog({region: Info(ept) for region in regions})
+
+def stub_process_region(raster_getter, region: str, save_png: bool, resolution: int,
+                        in_memory: bool = False, vectorize: str = "points") -> gpd.GeoDataFrame:
+    """
+    stands in for get_data._process_region, fails like a worker would for some regions
+    """
+    if region == "B/":
+        raise ValueError("no points in the bounds")
+    if region == "C/":
+        raise pickle.PicklingError("the geodataframe cannot be pickled")
+    return gpd.GeoDataFrame({"elevation": [float(resolution)]}, geometry=gpd.points_from_xy([0], [0]))
+
+class FakePipeline(object):
+    """
+    stands in for pdal.Pipeline, its iterator yields the points in chunks typed like the
+    arrays pdal returns, every dimension of the schema with X, Y and Z as float64
+    """
+    points = None
+    created = []
+
+    def __init__(self, pipeline: str) -> None:
+        self.pipeline = json.loads(pipeline)
+        self.chunk_sizes = []
+        FakePipeline.created.append(self)
+
+    def iterator(self, chunk_size: int = 10000):
+        self.chunk_sizes.append(chunk_size)
+        for start in range(0, len(self.points), chunk_size):
+            yield self.points[start:start + chunk_size]
+
+class BrokenExecutor(Executor):
+    """
+    an executor whose futures fail like those of a process pool whose worker died
+    """
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("a worker process terminated abruptly"))
+        return future
+
+@unittest.skipIf(get_data is None, "pdal and gdal are not installed")
 class TestRasterGetter(unittest.TestCase):
     """
         A class for unit-testing function in the ept_info.py file
@@ -34,3 +112,255 @@ class TestRasterGetter(unittest.TestCase):
 
     def test_region_gdf_dict(self):
         self.assertIsInstance(self.raster.region_gdf_dict(False, 5), dict)
+
+
+@unittest.skipIf(get_data is None, "pdal and gdal are not installed")
+class TestParallelRegions(unittest.TestCase):
+    """
+        A class for unit-testing the parallel region_gdf_dict of the get_data.py file
+        offline, _process_region is stubbed and the regions run in threads
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.regions = ["A/", "B/", "C/", "D/"]
+        self.raster = RasterGetter(BOUNDS, 3857, catalog=offline_catalog(self.regions))
+
+    def test_failing_regions_isolated(self):
+        with mock.patch.object(get_data, "_process_region", stub_process_region), \
+                ThreadPoolExecutor(max_workers=2) as executor:
+            region_gdf = self.raster._parallel_region_gdf_dict(self.regions, False, 5, 2, True,
+                                                               "points", executor)
+        self.assertEqual(list(region_gdf), ["A/", "D/"])
+        self.assertEqual(region_gdf["D/"]["elevation"].tolist(), [5.0])
+
+    def test_broken_pool(self):
+        region_gdf = self.raster._parallel_region_gdf_dict(self.regions, False, 5, 2, True,
+                                                           "points", BrokenExecutor())
+        self.assertEqual(region_gdf, {})
+
+    def test_shut_down_executor(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        executor.shutdown()
+        region_gdf = self.raster._parallel_region_gdf_dict(self.regions, False, 5, 2, True,
+                                                           "points", executor)
+        self.assertEqual(region_gdf, {})
+
+
+@unittest.skipIf(get_data is None, "pdal and gdal are not installed")
+class TestIterPoints(unittest.TestCase):
+    """
+        A class for unit-testing RasterGetter.iter_points of the get_data.py file
+        offline, pdal's streaming pipeline is stubbed
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.raster = RasterGetter(BOUNDS, 3857, catalog=offline_catalog(["A/"]))
+        points = np.zeros(2500, dtype=[("X", "f8"), ("Y", "f8"), ("Z", "f8"), ("Intensity", "u2"),
+                                       ("ReturnNumber", "u1"), ("Classification", "u1")])
+        points["X"] = np.arange(2500)
+        points["Classification"] = np.arange(2500) % 10
+        FakePipeline.points = points
+        FakePipeline.created = []
+
+    def iter_points(self, **kwargs) -> list:
+        with mock.patch.object(get_data.pdal, "Pipeline", FakePipeline):
+            return list(self.raster.iter_points("A/", **kwargs))
+
+    def test_chunk_sizes(self):
+        chunks = self.iter_points(chunk_size=1000)
+        self.assertEqual([len(chunk) for chunk in chunks], [1000, 1000, 500])
+        self.assertEqual(FakePipeline.created[0].chunk_sizes, [1000])
+        np.testing.assert_array_equal(np.concatenate(chunks)["X"], np.arange(2500))
+        self.assertEqual(self.raster.metrics.counters["points_read"], 2500)
+        # the points pipeline reads the region's ept and writes no file
+        stages = [stage["type"] for stage in FakePipeline.created[0].pipeline]
+        self.assertEqual(stages[0], "readers.ept")
+        self.assertFalse([stage for stage in stages if stage.startswith("writers.")])
+
+    def test_dtype(self):
+        schema = self.raster.catalog.info("A/").schema
+        for chunk in self.iter_points(chunk_size=1000):
+            # the schema's types projected on point_dimensions, scaled dimensions as float64
+            self.assertEqual(chunk.dtype, schema.projection(self.raster.point_dimensions)[1])
+            self.assertEqual(chunk.dtype.names, ("X", "Y", "Z", "Classification"))
+            self.assertEqual(chunk.dtype["Classification"], np.uint8)
+
+        self.raster.point_dimensions = None
+        chunk = self.iter_points(chunk_size=1000)[0]
+        # every dimension of the schema, ReturnNumber is not in it
+        self.assertEqual(chunk.dtype, schema.scaled_dtype)
+
+    def test_incomplete_point_store_rewritten(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.raster.point_store_dir = tmp
+            with mock.patch.object(get_data.pdal, "Pipeline", FakePipeline):
+                store = self.raster.get_point_store("A/")
+                meta_filename = os.path.join(store.directory, "meta.json")
+                with open(meta_filename) as meta_file:
+                    meta = json.load(meta_file)
+                del meta["columns"]
+                with open(meta_filename, "w") as meta_file:
+                    json.dump(meta, meta_file)
+
+                store = self.raster.get_point_store("A/")
+            self.assertEqual(len(FakePipeline.created), 2)
+            self.assertEqual(len(store), 2500)
+            np.testing.assert_allclose(store["X"], np.arange(2500))
+
+    def test_point_filter(self):
+        self.raster.point_filter = PointFilter(classes=[2])
+        chunks = self.iter_points(chunk_size=1000)
+        self.assertEqual([len(chunk) for chunk in chunks], [100, 100, 50])
+        self.assertTrue(all((chunk["Classification"] == 2).all() for chunk in chunks))
+
+
+@unittest.skipIf(get_data is None, "pdal and gdal are not installed")
+class TestResultCacheOutputs(unittest.TestCase):
+    """
+        A class for unit-testing that region_gdf_dict's result cache keeps the files of
+        a pdal run, _process_region is stubbed
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.raster = RasterGetter(BOUNDS, 3857, catalog=offline_catalog(["A_2019/"]))
+        self.raster.regions = ["A_2019/"]
+        self.raster.path = self.tmp.name
+        self.raster.result_cache = ResultCache(os.path.join(self.tmp.name, "results"))
+        self.raster.cog_options = CogOptions()
+        self.processed = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def process_region(self, raster_getter, region: str, save_png: bool, resolution: int,
+                       in_memory: bool = False, vectorize: str = "points") -> gpd.GeoDataFrame:
+        self.processed.append(region)
+        for filename in raster_getter.region_outputs(region, in_memory).values():
+            with open(filename, "w") as output_file:
+                output_file.write(os.path.basename(filename))
+        return gpd.GeoDataFrame({"elevation": [1.0]}, geometry=gpd.points_from_xy([0], [0]))
+
+    def region_gdf_dict(self) -> dict:
+        with mock.patch.object(get_data, "_process_region", self.process_region):
+            return self.raster.region_gdf_dict(False, 5)
+
+    def test_outputs(self):
+        outputs = self.raster.region_outputs("A_2019/", False)
+        self.assertEqual(sorted(outputs), ["cog_idw", "laz", "tif"])
+        self.assertEqual(outputs["laz"], os.path.join(self.tmp.name, "A_2019.laz"))
+        self.assertEqual(self.raster.region_outputs("A_2019/", True), {})
+
+    def test_request_keys_the_run(self):
+        request = self.raster.result_request("A_2019/", 5, False, "points")
+        self.raster.tile_size = 1000
+        self.assertNotEqual(self.raster.result_request("A_2019/", 5, False, "points"), request)
+        tiled = self.raster.result_request("A_2019/", 5, False, "points")
+        self.raster.tile_overlap = 10
+        self.assertNotEqual(self.raster.result_request("A_2019/", 5, False, "points"), tiled)
+        self.raster.cog_options = None
+        self.assertNotEqual(self.raster.result_request("A_2019/", 5, False, "points")["cog_options"],
+                            tiled["cog_options"])
+        self.raster.pipeline_template = self.raster.pipeline_template.without("las_writer")
+        self.assertFalse(self.raster.result_request("A_2019/", 5, False, "points")["las_writer"])
+        # the in memory path writes none of the files
+        self.assertEqual(self.raster.result_request("A_2019/", 5, True, "points")["tile_size"], None)
+
+    def test_hit_restores_outputs(self):
+        self.region_gdf_dict()
+        outputs = self.raster.region_outputs("A_2019/", False)
+        for filename in outputs.values():
+            os.remove(filename)
+
+        self.assertEqual(list(self.region_gdf_dict()), ["2019"])
+        self.assertEqual(self.processed, ["A_2019/"])
+        for filename in outputs.values():
+            with open(filename) as output_file:
+                self.assertEqual(output_file.read(), os.path.basename(filename))
+
+    def test_entry_without_outputs_is_a_miss(self):
+        self.region_gdf_dict()
+        entry = os.path.join(self.raster.result_cache.cache_dir,
+                             request_key(self.raster.result_request("A_2019/", 5, False, "points")))
+        # an entry stored before the laz was kept
+        with open(os.path.join(entry, "meta.json")) as meta_file:
+            meta = json.load(meta_file)
+        meta["files"].remove("laz")
+        with open(os.path.join(entry, "meta.json"), "w") as meta_file:
+            json.dump(meta, meta_file)
+
+        self.region_gdf_dict()
+        self.assertEqual(self.processed, ["A_2019/", "A_2019/"])
+
+
+@unittest.skipIf(get_data is None, "pdal and gdal are not installed")
+class TestTiledGrid(unittest.TestCase):
+    """
+        A class for unit-testing that the tiled and untiled runs of get_data.py write their
+        tifs on the same grid, gdal is mocked in mosaic_tifs
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.raster = RasterGetter(BOUNDS, 3857, catalog=offline_catalog(["A_2019/"]))
+        self.raster.regions = ["A_2019/"]
+        self.raster.tile_size = 700
+        self.raster.tile_overlap = 20
+        # 2000 is not a whole number of cells
+        self.resolution = 3
+        self.box = parse_bounds(BOUNDS)
+
+    def untiled_geotransform(self) -> tuple:
+        grid = self.raster.pipeline_params("A_2019/", self.resolution)[self.raster.pipeline_template.grid_stage()]
+        top = grid["origin_y"] + grid["height"] * grid["resolution"]
+        return (grid["origin_x"], grid["resolution"], 0, top, 0, -grid["resolution"]), (grid["width"], grid["height"])
+
+    def mosaic_geotransform(self) -> tuple:
+        tiles = split_bounds(self.box, self.raster.tile_size, self.raster.tile_overlap, self.resolution)
+        with mock.patch.object(raster, "gdal") as gdal:
+            raster.mosaic_tifs([(f"{i}.tif", core) for i, (core, read) in enumerate(tiles)], "mosaic.tif",
+                               (self.box[0], self.box[1]), self.resolution)
+        # the vrt of the mosaic is the union of the tiles' windows
+        windows = np.array([kwargs["projWin"] for _, kwargs in gdal.Translate.call_args_list
+                            if "projWin" in kwargs])
+        left, top = windows[:, 0].min(), windows[:, 1].max()
+        right, bottom = windows[:, 2].max(), windows[:, 3].min()
+        size = (int(round((right - left) / self.resolution)), int(round((top - bottom) / self.resolution)))
+        return (left, self.resolution, 0, top, 0, -self.resolution), size
+
+    def test_grids_match(self):
+        (untiled, untiled_size), (mosaic, mosaic_size) = self.untiled_geotransform(), self.mosaic_geotransform()
+        np.testing.assert_allclose(untiled, mosaic)
+        self.assertEqual(untiled_size, mosaic_size)
+        self.assertEqual(untiled_size, (667, 667))
+
+    def test_tiles_on_the_grid(self):
+        tiles = split_bounds(self.box, self.raster.tile_size, self.raster.tile_overlap, self.resolution)
+        for core, read in tiles:
+            stages = json.loads(self.raster.tile_pipeline("A_2019/", core, read, self.resolution, "a.laz", "a.tif"))
+            grid = [stage for stage in stages if isinstance(stage, dict) and "origin_x" in stage][0]
+            cells = np.array([grid["origin_x"] - self.box[0], grid["origin_y"] - self.box[1]]) / self.resolution
+            np.testing.assert_allclose(cells, np.round(cells))
+
+
+if __name__ == '__main__':
+    unittest.main()
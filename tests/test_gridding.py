@@ -0,0 +1,68 @@
+import sys
+import unittest
+import numpy as np
+from pathlib import Path
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from src.lidarToGeo.gridding import grid_elevation, grid_to_points, geotransform
+
+class TestGridding(unittest.TestCase):
+    """
+        A class for unit-testing function in the gridding.py file
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.box = (0.0, 0.0, 20.0, 10.0)
+        self.x = np.array([1.0, 2.0, 12.5, 17.5])
+        self.y = np.array([8.0, 9.0, 2.5, 7.5])
+        self.z = np.array([10.0, 20.0, 30.0, 40.0])
+
+    def test_geotransform(self):
+        self.assertEqual(geotransform(self.box, 5), (0.0, 5, 0.0, 10.0, 0.0, -5))
+
+    def test_mean(self):
+        grid, _ = grid_elevation(self.x, self.y, self.z, self.box, 5, "mean")
+        expected = np.array([[15, -9999, -9999, 40], [-9999, -9999, 30, -9999]], dtype=float)
+        np.testing.assert_array_equal(grid, expected)
+
+    def test_min_max_count(self):
+        low, _ = grid_elevation(self.x, self.y, self.z, self.box, 5, "min")
+        high, _ = grid_elevation(self.x, self.y, self.z, self.box, 5, "max")
+        count, _ = grid_elevation(self.x, self.y, self.z, self.box, 5, "count")
+        self.assertEqual(low[0, 0], 10)
+        self.assertEqual(high[0, 0], 20)
+        self.assertEqual(count.sum(), 4)
+
+    def test_idw(self):
+        grid, _ = grid_elevation(self.x, self.y, self.z, self.box, 5, "idw")
+        # points at the center of a cell take its value
+        self.assertEqual(grid[1, 2], 30)
+        self.assertEqual(grid[0, 3], 40)
+        self.assertTrue(10 < grid[0, 0] < 20)
+
+    def test_window_fill(self):
+        grid, _ = grid_elevation(self.x, self.y, self.z, self.box, 5, "mean", window_size=1)
+        self.assertNotEqual(grid[1, 1], -9999)
+        self.assertEqual(grid[0, 0], 15)
+
+    def test_grid_to_points(self):
+        grid, transform = grid_elevation(self.x, self.y, self.z, self.box, 5, "mean")
+        x, y, z = grid_to_points(grid, transform)
+        np.testing.assert_array_equal(x, [2.5, 17.5, 12.5])
+        np.testing.assert_array_equal(y, [7.5, 7.5, 2.5])
+        np.testing.assert_array_equal(z, [15, 40, 30])
+
+    def test_unknown_output_type(self):
+        self.assertRaises(ValueError, grid_elevation, self.x, self.y, self.z, self.box, 5, "tin")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import sys
+import json
+import asyncio
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+from aiohttp import web, ClientSession
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+import src.lidarToGeo.load_data as load_data
+from src.lidarToGeo.load_data import fetch, FetchConfig, load_ept_json, load_ept_json_async
+from src.lidarToGeo.catalog_cache import CatalogCache
+
+EPT = json.dumps({"points": 10, "bounds": [0, 0, 0, 1, 1, 1]})
+
+class TestFetch(unittest.TestCase):
+    """
+        A class for unit-testing the fetch function in the load_data.py file
+        against a local http server
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.calls = {}
+        self.config = FetchConfig(concurrency=4, timeout=5, retries=2, backoff=0.01)
+
+    async def handler(self, request):
+        name = request.match_info["name"]
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if name == "flaky" and self.calls[name] < 3:
+            return web.Response(status=503)
+        if name == "missing":
+            return web.Response(status=404)
+        if name == "down":
+            return web.Response(status=500)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(text=EPT, headers={"ETag": '"v1"'})
+
+    def fetch_all(self, requests):
+        async def main():
+            app = web.Application()
+            app.router.add_get("/{name}", self.handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            try:
+                async with ClientSession() as session:
+                    return [await fetch(name, f"http://127.0.0.1:{port}/{name}", session,
+                                        cached, config=self.config)
+                            for name, cached in requests]
+            finally:
+                await runner.cleanup()
+
+        return asyncio.run(main())
+
+    def test_fetch(self):
+        (region, entry), = self.fetch_all([("ok", None)])
+        self.assertEqual(region, "ok")
+        self.assertEqual(entry["etag"], '"v1"')
+        self.assertEqual(entry["ept"], EPT)
+
+    def test_not_modified_keeps_cached_entry(self):
+        cached = {"etag": '"v1"', "last_modified": None, "ept": "cached"}
+        (region, entry), = self.fetch_all([("ok", cached)])
+        self.assertIs(entry, cached)
+
+    def test_retries_server_errors(self):
+        (region, entry), = self.fetch_all([("flaky", None)])
+        self.assertEqual(self.calls["flaky"], 3)
+        self.assertEqual(entry["ept"], EPT)
+
+    def test_gives_up(self):
+        cached = {"etag": None, "last_modified": None, "ept": "cached"}
+        (region, entry), (_, missing) = self.fetch_all([("down", cached), ("missing", None)])
+        self.assertEqual(self.calls["down"], self.config.retries + 1)
+        self.assertIs(entry, cached)
+        self.assertEqual(self.calls["missing"], 1)
+        self.assertIsNone(missing)
+
+    def test_invalid_config(self):
+        self.assertRaises(ValueError, FetchConfig, retries=-1)
+        self.assertRaises(ValueError, FetchConfig, concurrency=0)
+        self.assertEqual(FetchConfig(retries=0).retries, 0)
+
+
+class TestLoadEptJson(unittest.TestCase):
+    """
+        A class for unit-testing the load_ept_json functions in the load_data.py file
+        with a fresh catalog cache, so nothing is downloaded
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = CatalogCache("bucket", cache_dir=self.tmp.name)
+        self.cache.write({"IA_FullState/": {"etag": '"v1"', "last_modified": None, "ept": EPT}})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_load_ept_json(self):
+        region_ept_info = load_ept_json(cache=self.cache)
+        self.assertEqual(list(region_ept_info), ["IA_FullState/"])
+        self.assertEqual(region_ept_info["IA_FullState/"].length(), 10)
+
+    def test_load_ept_json_async(self):
+        region_ept_info = asyncio.run(load_ept_json_async(cache=self.cache))
+        self.assertEqual(region_ept_info["IA_FullState/"].bounds, [0, 0, 0, 1, 1, 1])
+
+    def test_failed_region_not_cached_as_fresh(self):
+        down = {"status": 500}
+
+        async def handler(request):
+            if request.match_info["name"] == "down/" and down["status"] != 200:
+                return web.Response(status=down["status"])
+            return web.Response(text=EPT, headers={"ETag": '"v1"'})
+
+        async def main():
+            app = web.Application()
+            app.router.add_get("/{name:.*}ept.json", handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            try:
+                with mock.patch.object(load_data, "bucket_url", f"http://127.0.0.1:{port}/"), \
+                        mock.patch.object(load_data, "get_s3_client", lambda: None), \
+                        mock.patch.object(load_data, "list_folders", lambda client, name: ["ok/", "down/"]):
+                    config = FetchConfig(retries=1, backoff=0.01)
+                    first = await load_ept_json_async(refresh=True, cache=self.cache, config=config,
+                                                      stats=stats)
+                    down["status"] = 200
+                    second = await load_ept_json_async(cache=self.cache, config=config)
+                    return first, second
+            finally:
+                await runner.cleanup()
+
+        stats = {}
+        first, second = asyncio.run(main())
+        self.assertEqual(list(first), ["ok/"])
+        self.assertEqual(stats, {"files_fetched": 1, "bytes_fetched": len(EPT.encode())})
+        # the failed region is fetched again on the next load instead of waiting for the ttl
+        self.assertEqual(list(second), ["ok/", "down/"])
+        self.assertTrue(self.cache.is_fresh(self.cache.read()))
+
+    def test_running_loop(self):
+        async def main():
+            load_ept_json(cache=self.cache)
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(main())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import sys
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from src.lidarToGeo.metrics import Metrics
+
+class TestMetrics(unittest.TestCase):
+    """
+        A class for unit-testing function in the metrics.py file
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.metrics = Metrics()
+        for _ in range(2):
+            with self.metrics.stage("twi", region="A/"):
+                sum(range(10000))
+        self.metrics.add("points_read", 10)
+        self.metrics.add("points_read", 5)
+
+    def test_stage(self):
+        self.assertEqual(len(self.metrics.stages), 2)
+        record = self.metrics.stages[0]
+        self.assertEqual(record["stage"], "twi")
+        self.assertEqual(record["region"], "A/")
+        self.assertGreaterEqual(record["wall"], 0)
+        self.assertGreaterEqual(record["cpu"], 0)
+
+    def test_stage_recorded_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with self.metrics.stage("pdal_execute"):
+                raise RuntimeError("no points")
+        self.assertIn("pdal_execute", self.metrics.summary())
+
+    def test_summary(self):
+        summary = self.metrics.summary()
+        self.assertEqual(summary["twi"]["count"], 2)
+        self.assertEqual(self.metrics.to_dict()["counters"], {"points_read": 15})
+
+    def test_merge(self):
+        worker = pickle.loads(pickle.dumps(self.metrics))
+        self.metrics.merge(worker)
+        self.assertEqual(self.metrics.summary()["twi"]["count"], 4)
+        self.assertEqual(self.metrics.counters["points_read"], 30)
+
+    def test_prometheus(self):
+        text = self.metrics.to_prometheus()
+        self.assertIn('lidartogeo_stage_runs_total{stage="twi"} 2', text)
+        self.assertIn("lidartogeo_points_read_total 15", text)
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "lidartogeo.prom")
+            self.metrics.write_prometheus(filename)
+            with open(filename) as prom_file:
+                self.assertEqual(prom_file.read(), text)
+            self.assertEqual(os.listdir(tmp), ["lidartogeo.prom"])
+            self.assertEqual(os.stat(filename).st_mode & 0o777, 0o644)
+
+    def test_prometheus_label_escaped(self):
+        with self.metrics.stage('a "b"\\c\nd'):
+            pass
+        self.assertIn('{stage="a \\"b\\"\\\\c\\nd"}', self.metrics.to_prometheus())
+
+
+if __name__ == '__main__':
+    unittest.main()
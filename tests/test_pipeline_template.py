@@ -0,0 +1,122 @@
+import sys
+import json
+import unittest
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from src.lidarToGeo.pipeline_template import PipelineTemplate, raster_template, output_types, elevation_type
+
+class TestPipelineTemplate(unittest.TestCase):
+    """
+        A class for unit-testing function in the pipeline_template.py file
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.template = raster_template()
+        self.params = {
+            "reader": {"bounds": "([0, 1], [0, 1])", "filename": "ept.json"},
+            "reprojection": {"in_srs": "EPSG:3857", "out_srs": "EPSG:26915"},
+            "las_writer": {"filename": "a.laz"},
+            "tif_writer": {"filename": "a.tif"}
+        }
+
+    def test_bind(self):
+        stages = json.loads(self.template.bind(self.params))
+        self.assertEqual([stage["type"] for stage in stages],
+                         ["readers.ept", "filters.range", "filters.reprojection",
+                          "writers.las", "writers.gdal"])
+        self.assertEqual(stages[0]["filename"], "ept.json")
+        self.assertEqual(stages[2]["out_srs"], "EPSG:26915")
+        # binding never changes the template
+        self.assertEqual(self.template.stage("reader")["filename"], "")
+
+    def test_bind_concurrently(self):
+        def bind(i):
+            params = dict(self.params, reader={"bounds": f"([{i}, 1], [0, 1])", "filename": "e"})
+            return json.loads(self.template.bind(params))[0]["bounds"]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            bounds = list(executor.map(bind, range(64)))
+        self.assertEqual(bounds, [f"([{i}, 1], [0, 1])" for i in range(64)])
+
+    def test_without_las_writer(self):
+        template = self.template.without("las_writer")
+        stages = json.loads(template.bind(self.params))
+        self.assertEqual(len(stages), 4)
+        self.assertEqual(stages[-1]["inputs"], ["reprojectUTM"])
+
+    def test_noop_reprojection(self):
+        params = dict(self.params, reprojection={"in_srs": "EPSG:3857", "out_srs": "EPSG:3857"})
+        stages = json.loads(self.template.bind(params, "EPSG:3857"))
+        self.assertEqual([stage["type"] for stage in stages],
+                         ["readers.ept", "filters.range", "writers.las", "writers.gdal"])
+        self.assertEqual(stages[2]["inputs"], ["nonoise"])
+        # the template keeps the stage for the calls that do reproject
+        self.assertIn("reprojection", self.template)
+
+    def test_reprojection_assigning_srs(self):
+        # the same in_srs and out_srs still assign an srs other than the reader's
+        params = dict(self.params, reprojection={"in_srs": "EPSG:26915", "out_srs": "EPSG:26915"})
+        for source_srs in ("EPSG:3857", None):
+            stages = json.loads(self.template.bind(params, source_srs))
+            self.assertIn("filters.reprojection", [stage["type"] for stage in stages])
+            self.assertEqual(stages[2]["out_srs"], "EPSG:26915")
+
+    def test_output_type(self):
+        template = self.template.with_output_type("max")
+        self.assertEqual(template.raster_options()["output_type"], "max")
+        self.assertEqual(self.template.raster_options()["output_type"], "idw")
+        with self.assertRaises(ValueError):
+            self.template.with_output_type("median")
+        with self.assertRaises(ValueError):
+            self.template.with_options("tif_writer", output_type="median")
+
+    def test_tin(self):
+        template = self.template.with_output_type("tin")
+        stages = json.loads(template.bind(self.params))
+        self.assertEqual([stage["type"] for stage in stages[3:]],
+                         ["writers.las", "filters.delaunay", "filters.faceraster", "writers.raster"])
+        self.assertEqual(stages[-1]["filename"], "a.tif")
+        self.assertEqual(template.raster_options()["resolution"], 5)
+        self.assertEqual(template.with_output_type("idw"), self.template.with_options(
+            "tif_writer", window_size=0))
+
+    def test_points_template(self):
+        template = self.template.points_template()
+        self.assertEqual(template.names(), ["reader", "classification", "reprojection"])
+        self.assertEqual(self.template.points_tag(), "reprojectUTM")
+
+    def test_several_output_types(self):
+        template = self.template.with_output_type("count, idw,min")
+        stages = json.loads(template.bind(self.params))
+        self.assertEqual(stages[-1]["output_type"], "min,idw,count")
+        self.assertEqual(stages[-1]["gdalopts"], "TILED=YES,COMPRESS=DEFLATE")
+        # writers.gdal writes the bands in its own order
+        self.assertEqual(template.bands(), ["min", "idw", "count"])
+        self.assertEqual(template.elevation_band(), 2)
+        self.assertEqual(self.template.with_output_type("tin").bands(), ["tin"])
+        with self.assertRaises(ValueError):
+            self.template.with_output_type("idw,median")
+
+    def test_elevation_type(self):
+        self.assertEqual(output_types("all"), ["min", "max", "mean", "idw", "count", "stdev"])
+        self.assertEqual(elevation_type("all"), "idw")
+        self.assertEqual(elevation_type("max,min"), "max")
+        self.assertEqual(elevation_type("tin"), "tin")
+
+    def test_invalid_inputs(self):
+        with self.assertRaises(ValueError):
+            PipelineTemplate([("writer", {"type": "writers.las", "inputs": ["missing"]})])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from pathlib import Path
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from src.lidarToGeo.point_filter import PointFilter, classification_mask, get_transformer, reproject, NOISE_CLASSES
+
+class TestPointFilter(unittest.TestCase):
+    """
+        A class for unit-testing function in the point_filter.py file
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.points = np.zeros(6, dtype=[("X", "f8"), ("Y", "f8"), ("Z", "f8"), ("Classification", "u1")])
+        self.points["X"] = np.linspace(-10425171.94, -10423171.94, 6)
+        self.points["Y"] = np.linspace(5164494.71, 5166494.71, 6)
+        self.points["Z"] = 300.0
+        self.points["Classification"] = [1, 2, 2, 7, 9, 18]
+
+    def test_classification_mask(self):
+        classification = self.points["Classification"]
+        np.testing.assert_array_equal(classification_mask(classification, [2, 9]),
+                                      [False, True, True, False, True, False])
+        np.testing.assert_array_equal(classification_mask(classification, exclude=NOISE_CLASSES),
+                                      [True, True, True, False, True, False])
+        self.assertTrue(classification_mask(classification).all())
+
+    def test_transformer_cached(self):
+        self.assertIs(get_transformer("EPSG:3857", "EPSG:4326"), get_transformer("EPSG:3857", "EPSG:4326"))
+
+    def test_transformer_per_thread(self):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other = executor.submit(get_transformer, "EPSG:3857", "EPSG:4326").result()
+        self.assertIsNot(other, get_transformer("EPSG:3857", "EPSG:4326"))
+
+    def test_reproject_batches(self):
+        expected = self.points.copy()
+        reproject(expected, "EPSG:3857", "EPSG:4326")
+        # x, y order whatever the axis order of the crs
+        self.assertTrue((expected["X"] < -93).all() and (expected["X"] > -94).all())
+        self.assertTrue((expected["Y"] > 41).all() and (expected["Y"] < 43).all())
+        batched = self.points.copy()
+        reproject(batched, "EPSG:3857", "EPSG:4326", batch_size=4)
+        np.testing.assert_allclose(batched["X"], expected["X"])
+        np.testing.assert_allclose(batched["Y"], expected["Y"])
+
+    def test_apply(self):
+        point_filter = PointFilter(classes=[2], in_srs="EPSG:3857", out_srs="EPSG:4326")
+        points = point_filter.apply(self.points)
+        self.assertEqual(len(points), 2)
+        self.assertTrue((points["X"] > -94).all())
+        # the input is left unchanged
+        self.assertEqual(self.points["X"][1], np.linspace(-10425171.94, -10423171.94, 6)[1])
+
+    def test_noop(self):
+        point_filter = PointFilter(in_srs="EPSG:3857", out_srs="EPSG:3857")
+        self.assertFalse(point_filter.reprojects())
+        np.testing.assert_array_equal(point_filter.apply(self.points), self.points)
+        with self.assertRaises(ValueError):
+            PointFilter(classes=[2]).apply(self.points[["X", "Y"]])
+
+if __name__ == '__main__':
+    unittest.main()
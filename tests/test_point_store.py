@@ -0,0 +1,95 @@
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+from pathlib import Path
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from src.lidarToGeo.schema import Schema
+from src.lidarToGeo.point_store import PointStore, PointStoreWriter, write_point_store
+
+class TestPointStore(unittest.TestCase):
+    """
+        A class for unit-testing function in the point_store.py file
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.schema = Schema([
+            {"name": "X", "size": 4, "type": "signed", "scale": 0.01, "offset": 1000},
+            {"name": "Y", "size": 4, "type": "signed", "scale": 0.01, "offset": 2000},
+            {"name": "Z", "size": 4, "type": "signed", "scale": 0.01, "offset": 0},
+            {"name": "Classification", "size": 1, "type": "unsigned"}
+        ])
+        rng = np.random.default_rng(0)
+        count = 1000
+        self.points = np.empty(count, dtype=self.schema.scaled_dtype)
+        self.points["X"] = np.round(1000 + rng.uniform(0, 100, count), 2)
+        self.points["Y"] = np.round(2000 + rng.uniform(0, 100, count), 2)
+        self.points["Z"] = np.round(rng.uniform(50, 60, count), 2)
+        self.points["Classification"] = rng.integers(1, 8, count)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, "store")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        store = write_point_store(self.directory, [self.points[:300], self.points[300:]], self.schema,
+                                  {"region": "A/"})
+        self.assertEqual(len(store), 1000)
+        self.assertEqual(store.meta, {"region": "A/"})
+        np.testing.assert_allclose(store["X"], self.points["X"])
+        np.testing.assert_array_equal(store["Classification"], self.points["Classification"])
+        # the scaled dimensions keep the schema's integers on disk
+        self.assertEqual(store.raw("Z").dtype, np.int32)
+        self.assertIsInstance(store.raw("Classification"), np.memmap)
+
+    def test_points_and_chunks(self):
+        store = write_point_store(self.directory, self.points, self.schema)
+        mask = np.isin(store["Classification"], [2])
+        ground = store.points(["X", "Z"], mask)
+        np.testing.assert_allclose(ground["Z"], self.points["Z"][mask])
+        chunks = list(store.chunks(400))
+        self.assertEqual([len(chunk) for chunk in chunks], [400, 400, 200])
+        np.testing.assert_allclose(np.concatenate(chunks)["Y"], self.points["Y"])
+
+    def test_grid(self):
+        store = write_point_store(self.directory, self.points, self.schema)
+        grid, transform = store.grid((1000.0, 2000.0, 1100.0, 2100.0), 10, output_type="max")
+        self.assertEqual(grid.shape, (10, 10))
+        self.assertAlmostEqual(grid.max(), self.points["Z"].max())
+        coarse, _ = store.grid((1000.0, 2000.0, 1100.0, 2100.0), 50, output_type="max")
+        self.assertEqual(coarse.shape, (2, 2))
+
+    def test_not_quantized(self):
+        points = self.points.copy()
+        points["X"] += 1e8
+        with self.assertRaises(ValueError):
+            write_point_store(self.directory, points, self.schema)
+        self.assertFalse(os.path.exists(self.directory))
+        store = write_point_store(self.directory, points, self.schema, quantize=False)
+        np.testing.assert_array_equal(store["X"], points["X"])
+
+    def test_abort(self):
+        with PointStoreWriter(self.directory, self.schema) as writer:
+            writer.write(self.points)
+        self.assertEqual(len(PointStore(self.directory)), 1000)
+        with self.assertRaises(ValueError):
+            with PointStoreWriter(self.directory, self.schema) as writer:
+                writer.write(self.points[["X", "Y"]])
+                writer.write(self.points)
+        # the previous store is left untouched
+        self.assertEqual(len(PointStore(self.directory)), 1000)
+        self.assertEqual(os.listdir(self.tmp.name), ["store"])
+
+if __name__ == '__main__':
+    unittest.main()
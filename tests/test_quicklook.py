@@ -0,0 +1,85 @@
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+from pathlib import Path
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from src.lidarToGeo.quicklook import downsample, hillshade, render, points_to_grid, tile_pyramid
+
+class TestQuicklook(unittest.TestCase):
+    """
+        A class for unit-testing function in the quicklook.py file
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        y, x = np.mgrid[0:50, 0:60]
+        self.grid = (100 + x + 2 * y).astype(np.float64)
+        self.grid[:5, :5] = -9999
+
+    def test_downsample(self):
+        small, factor = downsample(self.grid, 20)
+        self.assertEqual(factor, 3)
+        self.assertEqual(small.shape, (17, 20))
+        # the block with only nodata cells stays empty, the partially empty one is averaged
+        self.assertTrue(np.isnan(small[0, 0]))
+        self.assertAlmostEqual(small[1, 1], np.mean(self.grid[3:6, 3:6][self.grid[3:6, 3:6] != -9999]))
+
+    def test_hillshade_orientation(self):
+        # the light comes from the north west
+        y, x = np.mgrid[0:10, 0:10].astype(np.float64)
+        facing_west = hillshade(x, 1.0)
+        facing_east = hillshade(-x, 1.0)
+        self.assertGreater(facing_west[5, 5], facing_east[5, 5])
+        facing_north = hillshade(y, 1.0)
+        facing_south = hillshade(-y, 1.0)
+        self.assertGreater(facing_north[5, 5], facing_south[5, 5])
+
+    def test_render(self):
+        image = render(self.grid, 5.0, max_size=1024)
+        self.assertEqual(image.shape, (50, 60, 4))
+        self.assertEqual(image.dtype, np.uint8)
+        self.assertTrue((image[:5, :5, 3] == 0).all())
+        self.assertTrue((image[5:, 5:, 3] == 255).all())
+
+    def test_points_to_grid(self):
+        gt = (1000.0, 5.0, 0.0, 2000.0, 0.0, -5.0)
+        rows, columns = np.nonzero(self.grid != -9999)
+        x = gt[0] + (columns + 0.5) * gt[1]
+        y = gt[3] + (rows + 0.5) * gt[5]
+        grid, transform = points_to_grid(x, y, self.grid[rows, columns], 5.0)
+        np.testing.assert_array_equal(grid, self.grid)
+        self.assertEqual(transform, gt)
+
+    def test_points_to_grid_polygon_centroids(self):
+        # the centroids of polygonized cells are irregular, the grid follows the given resolution
+        rng = np.random.default_rng(0)
+        x = rng.uniform(0, 400, 2000)
+        y = rng.uniform(0, 400, 2000)
+        grid, transform = points_to_grid(x, y, rng.uniform(100, 200, 2000), 5.0)
+        self.assertLessEqual(max(grid.shape), 81)
+        self.assertEqual(transform[1], 5.0)
+        self.assertTrue(((grid == -9999) | ((grid >= 100) & (grid <= 200))).all())
+        with self.assertRaises(ValueError):
+            points_to_grid(x, y, x, 0)
+
+    def test_tile_pyramid(self):
+        gt = (-1000.0, 10.0, 0.0, 1000.0, 0.0, -10.0)
+        with tempfile.TemporaryDirectory() as directory:
+            written = tile_pyramid(self.grid, gt, directory, min_zoom=10, max_zoom=12)
+            tiles = [os.path.join(root, name) for root, _, names in os.walk(directory) for name in names]
+            self.assertEqual(written, len(tiles))
+            self.assertTrue(os.path.isfile(os.path.join(directory, "10", "511", "511.png")))
+            self.assertTrue(all(tile.endswith(".png") for tile in tiles))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+from pathlib import Path
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+try:
+    from osgeo import gdal
+    from src.lidarToGeo.raster import CogOptions, raster_to_points, validate_cog, write_cog, write_cogs
+except ImportError:
+    # gdal is not installed
+    gdal = None
+
+def write_tif(filename: str, bands: list, transform: tuple = (0, 1, 0, 0, 0, -1),
+              nodata: float = -9999, options: list = ()) -> None:
+    """
+    writes 2d float32 arrays as the bands of a geotiff, gdal's default geotiff is striped
+    """
+    height, width = bands[0].shape
+    ds = gdal.GetDriverByName("GTiff").Create(filename, width, height, len(bands), gdal.GDT_Float32,
+                                              options=list(options))
+    ds.SetGeoTransform(transform)
+    for i, values in enumerate(bands):
+        band = ds.GetRasterBand(i + 1)
+        band.SetNoDataValue(nodata)
+        band.WriteArray(values)
+    ds = None
+
+@unittest.skipIf(gdal is None, "gdal is not installed")
+class TestRaster(unittest.TestCase):
+    """
+        A class for unit-testing function in the raster.py file
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tif = os.path.join(self.tmp.name, "a.tif")
+        # a width that is not a multiple of 16, so the strips cannot pass as tiles
+        elevation = np.random.default_rng(0).random((1000, 1100), dtype=np.float32) * 100
+        write_tif(self.tif, [elevation, elevation * 2])
+        self.options = CogOptions(blocksize=256)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_cog_options(self):
+        self.assertIn("BLOCKSIZE=256", self.options.creation_options())
+        self.assertNotIn("PREDICTOR=YES", CogOptions(compression="none").creation_options())
+        with self.assertRaises(ValueError):
+            CogOptions(blocksize=100)
+
+    def test_valid_cog(self):
+        cog = os.path.join(self.tmp.name, "a.cog.tif")
+        write_cog(self.tif, cog, 1, self.options)
+        self.assertEqual(validate_cog(cog), [])
+        self.assertEqual(validate_cog(cog, self.options), [])
+        # the blocks are checked against the options
+        self.assertEqual(len(validate_cog(cog, CogOptions(blocksize=512))), 1)
+
+    def test_striped_tif(self):
+        problems = validate_cog(self.tif)
+        self.assertIn("the header, overviews and image data are not laid out as a cog", problems)
+        self.assertIn("the raster is not tiled", problems)
+
+    def test_write_cogs(self):
+        cogs = {band: os.path.join(self.tmp.name, f"a_{band}.cog.tif") for band in (1, 2)}
+        self.assertEqual(write_cogs(self.tif, cogs, self.options), cogs)
+        for band, cog in cogs.items():
+            ds = gdal.Open(cog)
+            self.assertEqual(ds.RasterCount, 1)
+            self.assertEqual(ds.GetRasterBand(1).GetBlockSize(), [256, 256])
+            ds = None
+
+    def test_raster_to_points(self):
+        tif = os.path.join(self.tmp.name, "small.tif")
+        elevation = np.arange(12, dtype=np.float32).reshape(3, 4)
+        elevation[1, 2] = -9999
+        write_tif(tif, [elevation, elevation + 100], transform=(100, 5, 0, 200, 0, -5))
+
+        x, y, values, transform = raster_to_points(tif)
+        self.assertEqual(tuple(transform), (100, 5, 0, 200, 0, -5))
+        self.assertEqual(len(values), 11)
+        # the cell centers of the filled cells, row by row from the top
+        np.testing.assert_allclose(x[:4], [102.5, 107.5, 112.5, 117.5])
+        np.testing.assert_allclose(y[:4], [197.5] * 4)
+        np.testing.assert_allclose(y[-1], 187.5)
+        np.testing.assert_array_equal(values, np.delete(elevation.ravel(), 6))
+        self.assertFalse(((x == 112.5) & (y == 192.5)).any())
+
+        _, _, values, _ = raster_to_points(tif, band=2)
+        # -9999 + 100 is not nodata, every cell of band 2 is filled
+        self.assertEqual(len(values), 12)
+        np.testing.assert_array_equal(values, (elevation + 100).ravel())
+
+
+if __name__ == '__main__':
+    unittest.main()
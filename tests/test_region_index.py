@@ -0,0 +1,65 @@
+import sys
+import unittest
+from pathlib import Path
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from src.lidarToGeo.region_index import RegionIndex, parse_bounds
+
+class FakeInfo(object):
+    def __init__(self, bounds):
+        self.bounds = bounds
+
+class TestRegionIndex(unittest.TestCase):
+    """
+        A class for unit-testing function in the region_index.py file
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.catalog = {
+            "C/": FakeInfo([20, 0, 0, 30, 10, 1]),
+            "A/": FakeInfo([0, 0, 0, 10, 10, 1]),
+            "B/": FakeInfo([5, 5, 0, 25, 15, 1]),
+        }
+        self.index = RegionIndex(self.catalog)
+
+    def linear_contains(self, box):
+        xmin, ymin, xmax, ymax = box
+        return [k for k, v in self.catalog.items()
+                if v.bounds[0] <= xmin and v.bounds[1] <= ymin and
+                v.bounds[3] >= xmax and v.bounds[4] >= ymax]
+
+    def test_parse_bounds(self):
+        self.assertEqual(parse_bounds("([1, 2], [3, 4])"), (1.0, 3.0, 2.0, 4.0))
+
+    def test_length(self):
+        self.assertEqual(self.index.length(), 3)
+
+    def test_contains_matches_linear_scan(self):
+        for box in [(6, 6, 9, 9), (21, 1, 24, 9), (1, 1, 2, 2), (8, 1, 22, 2), (40, 40, 41, 41)]:
+            self.assertEqual(self.index.query(box), self.linear_contains(box))
+
+    def test_intersects(self):
+        self.assertEqual(self.index.query((8, 1, 22, 2), "intersects"), ["C/", "A/"])
+        self.assertEqual(self.index.query((8, 1, 22, 2)), [])
+
+    def test_query_many(self):
+        boxes = [(6, 6, 9, 9), (8, 1, 22, 2), (40, 40, 41, 41)]
+        self.assertEqual(self.index.query_many(boxes, chunk_size=2),
+                         [self.index.query(b) for b in boxes])
+        self.assertEqual(self.index.query_many(boxes, "intersects"),
+                         [self.index.query(b, "intersects") for b in boxes])
+
+    def test_unknown_predicate(self):
+        self.assertRaises(ValueError, self.index.query, (0, 0, 1, 1), "within")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import sys
+import tempfile
+import unittest
+import geopandas as gpd
+from pathlib import Path
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from src.lidarToGeo.result_cache import ResultCache, request_key
+
+class TestResultCache(unittest.TestCase):
+    """
+        A class for unit-testing function in the result_cache.py file
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(os.path.join(self.tmp_dir.name, "results"))
+        self.request = {"region": "IA_FullState/", "bounds": [0, 0, 10, 10], "crs": 3857,
+                        "resolution": 5}
+        self.gdf = gpd.GeoDataFrame({"elevation": [1.0, 2.0]},
+                                    geometry=gpd.points_from_xy([0, 1], [0, 1]), crs="EPSG:3857")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_request_key_is_canonical(self):
+        reordered = dict(reversed(list(self.request.items())))
+        self.assertEqual(request_key(self.request), request_key(reordered))
+        self.assertNotEqual(request_key(self.request), request_key({**self.request, "crs": 4326}))
+
+    def test_miss_then_hit(self):
+        self.assertIsNone(self.cache.get(self.request, "v1"))
+        self.cache.put(self.request, "v1", self.gdf)
+        cached = self.cache.get(self.request, "v1")
+        self.assertEqual(list(cached["elevation"]), [1.0, 2.0])
+        self.assertEqual(cached.crs, self.gdf.crs)
+
+    def test_new_version_invalidates(self):
+        self.cache.put(self.request, "v1", self.gdf)
+        self.assertIsNone(self.cache.get(self.request, "v2"))
+        self.assertIsNone(self.cache.get(self.request, "v1"))
+
+    def test_tif_is_restored(self):
+        tif = os.path.join(self.tmp_dir.name, "region.tif")
+        with open(tif, "wb") as tif_file:
+            tif_file.write(b"tif")
+        self.cache.put(self.request, "v1", self.gdf, tif)
+        os.remove(tif)
+        self.cache.get(self.request, "v1", tif)
+        with open(tif, "rb") as tif_file:
+            self.assertEqual(tif_file.read(), b"tif")
+
+    def test_side_files_restored(self):
+        files = {name: os.path.join(self.tmp_dir.name, filename) for name, filename in
+                 (("tif", "region.tif"), ("laz", "region.laz"), ("cog_idw", "region_idw.cog.tif"))}
+        for name, filename in files.items():
+            with open(filename, "w") as side_file:
+                side_file.write(name)
+        self.cache.put(self.request, "v1", self.gdf, files=files)
+        for filename in files.values():
+            os.remove(filename)
+
+        self.assertIsNotNone(self.cache.get(self.request, "v1", files=files))
+        for name, filename in files.items():
+            with open(filename) as side_file:
+                self.assertEqual(side_file.read(), name)
+
+    def test_missing_side_file_is_a_miss(self):
+        tif = os.path.join(self.tmp_dir.name, "region.tif")
+        with open(tif, "wb") as tif_file:
+            tif_file.write(b"tif")
+        # the laz was not written, e.g the template had no las writer
+        laz = os.path.join(self.tmp_dir.name, "region.laz")
+        self.cache.put(self.request, "v1", self.gdf, tif)
+        self.assertIsNone(self.cache.get(self.request, "v1", tif, {"laz": laz}))
+        self.assertIsNotNone(self.cache.get(self.request, "v1", tif))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,14 @@
 import unittest
 import sys
-import os
 import requests
 import numpy as np
+from pathlib import Path
 
-sys.path.append(os.path.abspath(os.path.join('../')))
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
 
-from schema import Schema
+from src.lidarToGeo.schema import Schema
 
 
 url = "https://s3-us-west-2.amazonaws.com/usgs-lidar-public/USGS_LPC_CO_SoPlatteRiver_Lot5_2013_LAS_2015/ept.json"
@@ -51,6 +53,71 @@ class TestSchema(unittest.TestCase):
         """
         self.assertRaises(TypeError, self.schema_obj.get_dtype, True)
 
+class TestCompiledSchema(unittest.TestCase):
+    """
+        A class for unit-testing the dtypes and projections of the Schema class
+        without downloading an ept.json
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.data = [
+            {"name": "X", "type": "signed", "size": 4, "scale": 0.01, "offset": 500},
+            {"name": "Y", "type": "signed", "size": 4, "scale": 0.01, "offset": 0},
+            {"name": "Z", "type": "signed", "size": 4, "scale": 0.001, "offset": 0},
+            {"name": "Intensity", "type": "unsigned", "size": 2},
+            {"name": "Classification", "type": "unsigned", "size": 1},
+            {"name": "GpsTime", "type": "float", "size": 8}
+        ]
+        self.schema = Schema(self.data)
+        self.raw = np.zeros(3, dtype=self.schema.dtype)
+        self.raw["X"] = [100, 200, 300]
+        self.raw["Z"] = [1500, 2500, 3500]
+        self.raw["Classification"] = [2, 6, 2]
+
+    def test_input_not_modified(self):
+        self.assertNotIn("dtype", self.data[0])
+        self.assertEqual(self.schema.dimesions["X"]["dtype"], "i4")
+
+    def test_dtype_cached(self):
+        self.assertIs(self.schema.dtype, self.schema.dtype)
+        self.assertEqual(self.schema.dtype.itemsize, 23)
+        self.assertEqual(self.schema.scaled_dtype["X"], np.float64)
+
+    def test_invalid(self):
+        with self.assertRaises(TypeError):
+            Schema([{"name": "X", "type": "double", "size": 8}])
+        with self.assertRaises(ValueError):
+            Schema([{"name": "X", "type": "float", "size": 2}])
+        with self.assertRaises(ValueError):
+            Schema([{"name": "X", "type": "float", "size": 8}] * 2)
+        with self.assertRaises(KeyError):
+            self.schema.projection(["X", "Red"])
+
+    def test_view(self):
+        view = self.schema.view(self.raw.tobytes(), ["X", "Classification"])
+        self.assertEqual(view.dtype.names, ("X", "Classification"))
+        np.testing.assert_array_equal(view["Classification"], [2, 6, 2])
+        # the view shares the buffer's memory
+        self.assertFalse(view.flags.owndata)
+
+    def test_decode(self):
+        points = self.schema.decode(self.raw.tobytes(), ["X", "Z", "Classification"])
+        self.assertEqual(points.dtype.itemsize, 17)
+        np.testing.assert_allclose(points["X"], [501, 502, 503])
+        np.testing.assert_allclose(points["Z"], [1.5, 2.5, 3.5])
+        self.assertEqual(len(self.schema.decode(self.raw.tobytes())), 3)
+
+    def test_select(self):
+        points = self.schema.decode(self.raw.tobytes())
+        selected = self.schema.select(points, ["Z", "Red", "Classification"])
+        self.assertEqual(selected.dtype.names, ("Z", "Classification"))
+        np.testing.assert_array_equal(selected["Classification"], [2, 6, 2])
+
 if __name__ == '__main__':
 	unittest.main()
 
@@ -0,0 +1,58 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from src.lidarToGeo.tile_cache import TileCache
+
+class TestTileCache(unittest.TestCase):
+    """
+        A class for unit-testing function in the tile_cache.py file
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = TileCache(self.tmp_dir.name, max_bytes=1000)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_miss_then_hit(self):
+        self.assertIsNone(self.cache.get("IA_FullState/", "0-0-0-0"))
+        self.cache.put("IA_FullState/", "0-0-0-0", b"node")
+        self.assertEqual(self.cache.get("IA_FullState/", "0-0-0-0"), b"node")
+        self.assertIsNone(self.cache.get("other/", "0-0-0-0"))
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+    def test_shared_between_objects(self):
+        self.cache.put("IA_FullState/", "1-0-0-0", b"node")
+        other = TileCache(self.tmp_dir.name, max_bytes=1000)
+        self.assertEqual(other.get("IA_FullState/", "1-0-0-0"), b"node")
+
+    def test_lru_eviction(self):
+        for i in range(3):
+            self.cache.put("r/", f"{i}", b"x" * 100)
+            os.utime(self.cache.path("r/", f"{i}"), (i, i))
+        # reading node 0 makes node 1 the least recently used
+        self.cache.get("r/", "0")
+        self.cache.max_bytes = 250
+        self.cache.evict()
+        self.assertIsNone(self.cache.get("r/", "1"))
+        self.assertIsNotNone(self.cache.get("r/", "0"))
+        self.assertIsNotNone(self.cache.get("r/", "2"))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import sys
+import unittest
+from pathlib import Path
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from src.lidarToGeo.tiling import split_bounds, format_bounds, bounds_to_boxes, merge_boxes, grid_size
+from src.lidarToGeo.region_index import parse_bounds
+
+class TestTiling(unittest.TestCase):
+    """
+        A class for unit-testing function in the tiling.py file
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        self.box = (100.0, 200.0, 325.0, 410.0)
+
+    def test_format_bounds(self):
+        self.assertEqual(parse_bounds(format_bounds(self.box)), self.box)
+
+    def test_cores_cover_bounds(self):
+        tiles = split_bounds(self.box, 100, 10, 5)
+        self.assertEqual(len(tiles), 9)
+        area = sum((c[2] - c[0]) * (c[3] - c[1]) for c, _ in tiles)
+        self.assertAlmostEqual(area, (325 - 100) * (410 - 200))
+        self.assertEqual(max(c[2] for c, _ in tiles), 325)
+        self.assertEqual(max(c[3] for c, _ in tiles), 410)
+
+    def test_read_bounds_overlap_and_align(self):
+        for core, read in split_bounds(self.box, 98, 7, 5):
+            self.assertEqual(read[0], core[0] - 10)
+            self.assertEqual(read[1], core[1] - 10)
+            for value, start in zip(read, (100, 200, 100, 200)):
+                self.assertEqual((value - start) % 5, 0)
+
+    def test_single_tile(self):
+        (core, read), = split_bounds(self.box, 1000)
+        self.assertEqual(core, self.box)
+
+    def test_grid_size(self):
+        self.assertEqual(grid_size((0, 0, 2000, 1000), 3), (667, 334))
+        # a whole number of cells, with the error of the float division
+        self.assertEqual(grid_size((0, 0, 0.3, 0.6), 0.1), (3, 6))
+
+    def test_invalid_tile_size(self):
+        self.assertRaises(ValueError, split_bounds, self.box, 0)
+
+
+    def test_bounds_to_boxes(self):
+        self.assertEqual(bounds_to_boxes([format_bounds(self.box), [0, 1, 2, 3]]),
+                         [self.box, (0.0, 1.0, 2.0, 3.0)])
+
+    def test_merge_boxes(self):
+        boxes = [(0, 0, 10, 10), (50, 50, 60, 60), (10, 0, 20, 10), (15, 5, 55, 55), (100, 0, 110, 10)]
+        merged = merge_boxes(boxes)
+        self.assertEqual(merged, [((0, 0, 60, 60), [0, 1, 2, 3]), ((100, 0, 110, 10), [4])])
+
+    def test_merge_boxes_gap_and_max_size(self):
+        boxes = [(0, 0, 10, 10), (15, 0, 25, 10)]
+        self.assertEqual(len(merge_boxes(boxes)), 2)
+        self.assertEqual(merge_boxes(boxes, gap=5), [((0, 0, 25, 10), [0, 1])])
+        self.assertEqual(len(merge_boxes(boxes, gap=5, max_size=20)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
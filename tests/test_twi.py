@@ -0,0 +1,66 @@
+import sys
+import unittest
+import numpy as np
+from pathlib import Path
+
+test_file = Path(__file__).resolve()
+parent_dir = test_file.parents[1]
+sys.path.append(str(parent_dir))
+
+from src.lidarToGeo.twi import twi, slope, d8_flow_direction, dinf_flow_direction, flow_accumulation
+
+class TestTWI(unittest.TestCase):
+    """
+        A class for unit-testing function in the twi.py file
+
+        Args:
+        -----
+            unittest.TestCase this allows the new class to inherit
+            from the unittest module
+    """
+
+    def setUp(self):
+        # a plane dropping 1 per cell towards the east
+        self.plane = np.tile(np.arange(5, 0, -1, dtype=float), (3, 1))
+        # a cone whose lowest point is the center cell
+        yy, xx = np.mgrid[-2:3, -2:3]
+        self.valley = np.hypot(yy, xx)
+
+    def test_slope(self):
+        np.testing.assert_allclose(slope(self.plane, 2.0), 0.5)
+
+    def test_d8_accumulation(self):
+        receivers, weights = d8_flow_direction(self.plane, 1.0)
+        accumulation = flow_accumulation(receivers, weights, np.ones(self.plane.size, bool))
+        np.testing.assert_array_equal(accumulation.reshape(self.plane.shape),
+                                      np.tile(np.arange(1, 6), (3, 1)))
+
+    def test_dinf_conserves_flow(self):
+        receivers, weights = dinf_flow_direction(self.valley, 1.0)
+        accumulation = flow_accumulation(receivers, weights, np.ones(self.valley.size, bool))
+        self.assertAlmostEqual(accumulation.reshape(self.valley.shape)[2, 2], self.valley.size)
+
+    def test_d8_valley(self):
+        receivers, weights = d8_flow_direction(self.valley, 1.0)
+        accumulation = flow_accumulation(receivers, weights, np.ones(self.valley.size, bool))
+        self.assertEqual(accumulation.reshape(self.valley.shape)[2, 2], self.valley.size)
+
+    def test_twi(self):
+        index = twi(self.plane, 1.0)
+        np.testing.assert_allclose(index, np.log(np.tile(np.arange(1, 6), (3, 1)) / 1.0))
+        np.testing.assert_allclose(twi(self.plane, 1.0, method="dinf"), index)
+
+    def test_nodata(self):
+        grid = self.plane.copy()
+        grid[1, 2] = -9999
+        index = twi(grid, 1.0)
+        self.assertEqual(index[1, 2], -9999)
+        self.assertTrue(np.isfinite(index).all())
+        self.assertEqual(index[1, 3], np.log(1 / 1.0))
+
+    def test_unknown_method(self):
+        self.assertRaises(ValueError, twi, self.plane, 1.0, method="mfd")
+
+
+if __name__ == '__main__':
+    unittest.main()